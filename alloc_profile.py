@@ -0,0 +1,262 @@
+"""
+Where the engine allocates memory as it plays, turn by turn, so that the steady-state turn can
+be driven towards allocating nothing and kept there (see benchmarks/allocations.py).
+
+    profile = profile_game(seed=7, num_players=4, buy_decision_algorithm=BuyEverything)
+    profile.print_summary()
+
+A game is played a turn at a time (see `Game.turns`) with two instruments on:
+
+- a profile hook that reads the interpreter's count of allocated blocks
+  (`sys.getallocatedblocks`) at every call and return, Python or C, and puts whatever the
+  count grew by since the last one down to the engine function that was running, or to the
+  closest one up the stack if it was in the standard library. The C function is noted where
+  the blocks were allocated inside one (`print`, `list`, ...). Blocks allocated and freed
+  between two calls cancel out, so these are lower bounds; objects reused from a free list
+  (small tuples, floats...) were never allocated. What the hook itself costs, like the frame
+  objects it makes the interpreter create, is measured once and taken off.
+- tracemalloc, for the most the turn had allocated at once above what it started with (its
+  peak), and, over the steady state, what stayed allocated, by line of the engine.
+
+The first `warmup` turns are left out of the steady state: they fill the caches.
+"""
+import os
+import random
+import sys
+import tracemalloc
+from collections import Counter, defaultdict
+from contextlib import redirect_stdout
+from os import devnull
+from typing import Dict, List, Optional
+
+import buy_decision_algos
+import editions
+import exceptions
+import liquidation
+import monopoly.core
+from monopoly import Game
+
+ENGINE_MODULES = (monopoly.core, liquidation, buy_decision_algos, editions, exceptions)
+ROOT = os.path.dirname(os.path.abspath(__file__))
+WARMUP = 50
+TRACEBACK_LIMIT = 8
+CALIBRATION_CALLS = 1_000
+
+
+def get_site_name(code, callee=None) -> str:
+    name = f"{os.path.relpath(code.co_filename, ROOT)}:{code.co_name}"
+    return f"{name} -> {callee}" if callee else name
+
+
+def calibration_callee():
+    pass
+
+
+class TurnAllocations:
+    def __init__(self, turn: int, seat: int, blocks: int, peak_bytes: int):
+        self.turn = turn
+        self.seat = seat
+        self.blocks = blocks
+        self.peak_bytes = peak_bytes
+
+    def __repr__(self):
+        return (
+            f"<{self.__class__.__name__} turn={self.turn} seat={self.seat} "
+            f"blocks={self.blocks} peak_bytes={self.peak_bytes}>"
+        )
+
+
+class AllocationHook:
+    """
+    the profile hook: blocks allocated, by engine function and C function called
+    """
+
+    def __init__(self):
+        self.engine_files = {
+            os.path.abspath(module.__file__) for module in ENGINE_MODULES
+        }
+        # code -> callee (None for the function's own code) -> blocks
+        self.sites: Dict[object, Dict[Optional[str], int]] = defaultdict(Counter)
+        self.blocks = 0
+        self.last = 0
+        self.call_cost = 0
+        self.c_call_cost = 0
+        self.calibrate()
+
+    def get_engine_code(self, frame):
+        while frame is not None:
+            code = frame.f_code
+            if code.co_filename in self.engine_files:
+                return code
+            frame = frame.f_back
+        return None
+
+    def __call__(self, frame, event, arg):
+        grown = sys.getallocatedblocks() - self.last
+        if event == "call":
+            grown -= self.call_cost
+            frame = frame.f_back
+        elif event == "c_call":
+            grown -= self.c_call_cost
+        if grown > 0:
+            code = self.get_engine_code(frame)
+            if code is not None:
+                self.add(code, event, arg, grown)
+        self.last = sys.getallocatedblocks()
+
+    def add(self, code, event, arg, blocks: int):
+        # the C function's name is made afresh, so it has to be freed before the hook counts
+        # the blocks again, or it hides one of the next event's
+        callee = None
+        if event not in ("call", "c_call", "return"):
+            callee = getattr(arg, "__qualname__", None)
+        self.sites[code][callee] += blocks
+        self.blocks += blocks
+
+    def start(self):
+        self.last = sys.getallocatedblocks()
+        sys.setprofile(self)
+
+    @staticmethod
+    def stop():
+        sys.setprofile(None)
+
+    def calibrate(self):
+        """
+        what the hook makes a Python call and a C call allocate, which a plain call doesn't
+        """
+        calls = Counter()
+
+        def hook(frame, event, arg):
+            grown = sys.getallocatedblocks() - hook.last
+            if grown > 0 and (event == "call" and frame.f_code is callee_code):
+                calls["call"] += grown
+            if grown > 0 and event == "c_call" and frame.f_code is caller_code:
+                calls["c_call"] += grown
+            hook.last = sys.getallocatedblocks()
+
+        def caller():
+            for _ in range(CALIBRATION_CALLS):
+                calibration_callee()
+                len(())
+
+        callee_code, caller_code = calibration_callee.__code__, caller.__code__
+        hook.last = sys.getallocatedblocks()
+        sys.setprofile(hook)
+        caller()
+        sys.setprofile(None)
+        self.call_cost = round(calls["call"] / CALIBRATION_CALLS)
+        self.c_call_cost = round(calls["c_call"] / CALIBRATION_CALLS)
+
+
+class AllocationProfile:
+    def __init__(self, turns: List[TurnAllocations], warmup: int, sites, retained):
+        self.turns = turns
+        self.warmup = warmup
+        # site name -> blocks allocated over the steady state
+        self.sites: Counter = sites
+        # tracemalloc statistics of what the steady state left allocated in the engine
+        self.retained = retained
+
+    @property
+    def steady_turns(self) -> List[TurnAllocations]:
+        return self.turns[self.warmup :]
+
+    @property
+    def blocks_per_turn(self) -> float:
+        turns = self.steady_turns
+        return sum(turn.blocks for turn in turns) / len(turns) if turns else 0.0
+
+    @property
+    def peak_bytes_per_turn(self) -> float:
+        turns = self.steady_turns
+        return sum(turn.peak_bytes for turn in turns) / len(turns) if turns else 0.0
+
+    def get_sites_per_turn(self, limit=None) -> List[tuple]:
+        """
+        (site name, blocks it allocates per turn), the most first
+        """
+        num_turns = len(self.steady_turns) or 1
+        return [
+            (site, blocks / num_turns) for site, blocks in self.sites.most_common(limit)
+        ]
+
+    def print_summary(self, limit=15):
+        print(
+            f"{len(self.steady_turns)} turns after {self.warmup} of warmup: "
+            f"{self.blocks_per_turn:.1f} blocks allocated and a peak of "
+            f"{self.peak_bytes_per_turn:.0f} bytes per turn"
+        )
+        for site, blocks in self.get_sites_per_turn(limit):
+            print(f"  {blocks:8.2f}  {site}")
+        if self.retained:
+            print("left allocated:")
+            for statistic in self.retained[:limit]:
+                print(f"  {statistic}")
+
+
+def profile_game(
+    seed: int,
+    num_players: int,
+    buy_decision_algorithm,
+    max_rounds=monopoly.core.MAX_ROUNDS,
+    warmup=WARMUP,
+    max_turns=None,
+) -> AllocationProfile:
+    random.seed(seed)
+    hook = AllocationHook()
+    turns = []
+    sites = Counter()
+    tracemalloc.start(TRACEBACK_LIMIT)
+    steady_state = None
+    try:
+        with open(devnull, "w") as null, redirect_stdout(null):
+            game = Game(
+                num_players,
+                buy_decision_algorithm,
+                max_rounds=max_rounds,
+                autostart=False,
+            )
+            game.activate()
+            playing = game.turns()
+            while max_turns is None or len(turns) < max_turns:
+                if len(turns) == warmup:
+                    steady_state = tracemalloc.take_snapshot()
+                hook.blocks = 0
+                started, _ = tracemalloc.get_traced_memory()
+                tracemalloc.reset_peak()
+                hook.start()
+                player = next(playing, None)
+                hook.stop()
+                _, peak = tracemalloc.get_traced_memory()
+                if player is None:
+                    break
+                turns.append(
+                    TurnAllocations(
+                        len(turns), player.seat, hook.blocks, peak - started
+                    )
+                )
+                if len(turns) == warmup:
+                    hook.sites.clear()
+            for code, callees in hook.sites.items():
+                for callee, blocks in callees.items():
+                    sites[get_site_name(code, callee)] += blocks
+            retained = []
+            if steady_state is not None:
+                engine_files = [
+                    tracemalloc.Filter(True, module.__file__)
+                    for module in ENGINE_MODULES
+                ]
+                retained = (
+                    tracemalloc.take_snapshot()
+                    .filter_traces(engine_files)
+                    .compare_to(steady_state.filter_traces(engine_files), "lineno")
+                )
+                retained = [
+                    statistic for statistic in retained if statistic.size_diff > 0
+                ]
+            game.end()
+    finally:
+        hook.stop()
+        tracemalloc.stop()
+    return AllocationProfile(turns, warmup, sites, retained)
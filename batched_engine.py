@@ -0,0 +1,557 @@
+"""
+Whole games, played thousands at a time: the state of N games is held in NumPy arrays (positions,
+cash, bankruptcies per player; owner, building level and mortgage per space) and every step plays
+one turn in every game that isn't over, with each rule applied across all of them at once.
+
+    games = BatchedGames(100_000, 4, BuyEverything, max_rounds=1_000).run()
+    games.get_rounds_played_per_player(), games.winner
+
+It plays by the rules of `Game`, quirks included (`rounds` counts players' turns, landing on
+the last space counts as passing Go, bankrupt players keep their properties...), so that the
+distributions of outcomes match; the games themselves aren't the same, since the dice come from
+NumPy. The board, its prices and rent tables come from the compiled edition (see editions.py).
+
+Buying uses a vectorized form of the buy decision algorithm (see `BUY_RULES`), which exists for
+every algorithm in buy_decision_algos that only looks at the board. Buildings are bought for a
+player's monopolies in the order of the board rather than the order they were completed in,
+which only matters when a player can't afford to build on all of them.
+
+Paying works the way `Player.pay` does: a player who can't pay raises the money by selling
+buildings and mortgaging (with the solver in liquidation.py, a game at a time, since it's rare)
+and goes bankrupt if that isn't enough. Mortgages are paid off before building, as in `Game`.
+"""
+from types import SimpleNamespace
+
+import numpy as np
+
+import buy_decision_algos
+from editions import COLUMN, COLUMNS, KINDS, RENT_COLUMN
+from exceptions import Argument
+from liquidation import HOTEL_LEVEL, get_group_options, solve
+from monopoly import (
+    AdvanceThreeSpacesCard,
+    Board,
+    BuildingAndLoanMaturesCard,
+    ChanceDeck,
+    CommunityChestDeck,
+    ElectedPresidentCard,
+    GetOutOfJailFreeCard,
+    GoToBernPlaceFederaleCard,
+    GoToClosestRailroadCard,
+    GoToJailCard,
+    MAX_ROUNDS,
+    RepairPropertyCard,
+    SpeedingCard,
+    get_space_index,
+)
+
+KIND = {kind: index for index, kind in enumerate(KINDS)}
+PROPERTY_KINDS = [KIND["BuildableProperty"], KIND["Railroad"], KIND["Utility"]]
+TAX_KINDS = [KIND["IncomeTax"], KIND["LuxuryTax"]]
+DECKS = {KIND["Chance"]: ChanceDeck, KIND["CommunityChest"]: CommunityChestDeck}
+CARD_EFFECTS = (
+    AdvanceThreeSpacesCard,
+    ElectedPresidentCard,
+    BuildingAndLoanMaturesCard,
+    GoToBernPlaceFederaleCard,
+    GoToJailCard,
+    SpeedingCard,
+    GoToClosestRailroadCard,
+    GetOutOfJailFreeCard,
+    RepairPropertyCard,
+)
+START_MONEY = 1_500
+GO_MONEY = 200
+BANK = -1
+NO_ROLL = -1
+
+
+def buy_everything(features, _):
+    return np.ones(len(features.money), dtype=bool)
+
+
+def buy_if_have_three_times_price(features, _):
+    return features.money >= features.cost * 3
+
+
+def buy_if_dont_have_two_partial_monopolies(features, _):
+    return features.partial_monopolies < 3
+
+
+def buy_if_own_fewer_than_five(features, _):
+    return (features.num_owned < 5) | (features.owned_of_type > 0)
+
+
+def buy_if_no_one_owns_type(features, _):
+    return features.nobody_owns_type | (features.owned_of_type > 0)
+
+
+def buy_parametric(features, algorithm):
+    multiple = np.where(
+        features.railroad_or_utility,
+        algorithm.utility_multiple,
+        algorithm.cash_multiple,
+    )
+    multiple = np.where(
+        features.owned_of_type > 0,
+        multiple * (1 - algorithm.same_type_discount),
+        multiple,
+    )
+    return (features.money >= features.cost) & (
+        (features.num_owned < algorithm.always_buy_below)
+        | (
+            (features.money - features.cost >= algorithm.reserve)
+            & (features.money >= features.cost * multiple)
+        )
+    )
+
+
+BUY_RULES = {
+    buy_decision_algos.BuyEverything: buy_everything,
+    buy_decision_algos.BuyIfHaveThreeTimesPrice: buy_if_have_three_times_price,
+    buy_decision_algos.BuyIfDontHaveTwoPartialMonopoliesOfOtherColors: (
+        buy_if_dont_have_two_partial_monopolies
+    ),
+    buy_decision_algos.BuyIfOwnFewerThanFivePropertiesOrHaveOneOfThisColor: (
+        buy_if_own_fewer_than_five
+    ),
+    buy_decision_algos.BuyIfNoOneOwnsTypeAndIsOfTheOneTypeOwned: buy_if_no_one_owns_type,
+    buy_decision_algos.ParametricBuyDecision: buy_parametric,
+}
+
+
+class BatchedGames:
+    def __init__(
+        self,
+        num_games,
+        num_players,
+        buy_decision_algorithm,
+        max_rounds=MAX_ROUNDS,
+        seed=None,
+        edition=None,
+    ):
+        if isinstance(buy_decision_algorithm, type):
+            buy_decision_algorithm = buy_decision_algorithm()
+        if type(buy_decision_algorithm) not in BUY_RULES:
+            raise Argument(
+                f"{type(buy_decision_algorithm).__name__} has no batched form"
+            )
+        self.buy_decision_algorithm = buy_decision_algorithm
+        self.buy_rule = BUY_RULES[type(buy_decision_algorithm)]
+        self.num_games = num_games
+        self.num_players = num_players
+        self.max_rounds = max_rounds
+        self.rng = np.random.default_rng(seed)
+        if edition is not None:
+            Board.use_edition(edition)
+        self.load_board()
+
+        self.position = np.zeros((num_games, num_players), dtype=np.int64)
+        self.money = np.full((num_games, num_players), START_MONEY, dtype=np.int64)
+        self.bankrupt = np.zeros((num_games, num_players), dtype=bool)
+        self.owner = np.full((num_games, self.num_spaces), BANK, dtype=np.int8)
+        self.level = np.zeros((num_games, self.num_spaces), dtype=np.int8)
+        self.mortgaged = np.zeros((num_games, self.num_spaces), dtype=bool)
+        self.slot = np.zeros(num_games, dtype=np.int64)
+        self.rounds = np.zeros(num_games, dtype=np.int64)
+        self.over = np.zeros(num_games, dtype=bool)
+        self.update_over(np.arange(num_games))
+        # every game's decks in the order they'll be drawn in, as indices into CARD_EFFECTS
+        self.decks = {}
+        self.next_card = {}
+        for kind, effects in self.deck_effects.items():
+            order = np.argsort(self.rng.random((num_games, len(effects))), axis=1)
+            self.decks[kind] = effects[order]
+            self.next_card[kind] = np.zeros(num_games, dtype=np.int64)
+
+    def load_board(self):
+        compiled = Board.get_compiled()
+        self.num_spaces = compiled.num_spaces
+        table = np.frombuffer(compiled.table, dtype=np.int32)
+        table = table.reshape(self.num_spaces, len(COLUMNS)).astype(np.int64)
+        self.kind = table[:, COLUMN["kind"]]
+        self.group = table[:, COLUMN["group"]]
+        self.cost = table[:, COLUMN["cost"]]
+        self.house_cost = table[:, COLUMN["house_and_hotel_cost"]]
+        self.mortgage_cost = table[:, COLUMN["mortgage_cost"]]
+        self.unmortgage_cost = table[:, COLUMN["unmortgage_cost"]]
+        self.amount = table[:, COLUMN["amount"]]
+        self.rent = table[:, RENT_COLUMN:]
+        self.is_property = np.isin(self.kind, PROPERTY_KINDS)
+        self.groups = [
+            np.flatnonzero(self.group == group) for group in range(compiled.num_groups)
+        ]
+        self.buildable_groups = [
+            members
+            for members in self.groups
+            if self.kind[members[0]] == KIND["BuildableProperty"]
+        ]
+        self.group_size = np.array(compiled.group_sizes)
+        self.next_railroad = np.array(
+            [
+                compiled.next_of_kind("Railroad", space)
+                for space in range(self.num_spaces)
+            ]
+        )
+        self.jail = compiled.next_of_kind("Jail", 0)
+        self.bern = get_space_index(GoToBernPlaceFederaleCard.kwarg["space_index"])
+        self.deck_effects = {
+            kind: np.array([CARD_EFFECTS.index(card) for card in deck.cards])
+            for kind, deck in DECKS.items()
+        }
+
+    def update_over(self, rows):
+        active = (~self.bankrupt[rows]).sum(axis=1)
+        self.over[rows] = (active <= 1) | (self.rounds[rows] >= self.max_rounds)
+
+    def run(self) -> "BatchedGames":
+        while self.step():
+            pass
+        return self
+
+    def step(self) -> bool:
+        """
+        a turn in every game that isn't over; False once they all are
+        """
+        rows = np.flatnonzero(~self.over)
+        if not rows.size:
+            return False
+        players = self.slot[rows]
+        self.pay_off_mortgages(rows, players)
+        self.buy_buildings(rows, players)
+        dice = self.rng.integers(1, 7, size=(2, rows.size))
+        total = dice.sum(axis=0)
+        go_again = dice[0] == dice[1]
+        self.move(rows, players, self.position[rows, players] + total, pass_go=True)
+        self.land(rows, players, total)
+
+        # the next player's turn, skipping (and counting) bankrupt ones the way `Game` does
+        done = rows[~go_again | self.bankrupt[rows, players]]
+        for _ in range(self.num_players):
+            self.rounds[done] += 1
+            self.slot[done] = (self.slot[done] + 1) % self.num_players
+            self.update_over(done)
+            done = done[~self.over[done] & self.bankrupt[done, self.slot[done]]]
+            if not done.size:
+                break
+        return True
+
+    def move(self, rows, players, new_positions, pass_go):
+        if pass_go:
+            wrapped = new_positions >= self.num_spaces - 1
+            passed = wrapped | (self.position[rows, players] > new_positions)
+            self.money[rows[passed], players[passed]] += GO_MONEY
+            new_positions = np.where(
+                wrapped, new_positions - self.num_spaces, new_positions
+            )
+        self.position[rows, players] = new_positions
+
+    def land(self, rows, players, last_roll):
+        """
+        does what the spaces the players landed on do, including moving them on (cards)
+        """
+        while rows.size:
+            spaces = self.position[rows, players] % self.num_spaces
+            kinds = self.kind[spaces]
+            on = self.is_property[spaces]
+            self.land_on_property(rows[on], players[on], spaces[on], last_roll[on])
+            on = np.isin(kinds, TAX_KINDS)
+            self.pay(rows[on], players[on], BANK, self.amount[spaces[on]])
+            moved_on = []
+            for kind in DECKS:
+                on = kinds == kind
+                if on.any():
+                    moved_on.append(self.draw_card(kind, rows[on], players[on]))
+            if not moved_on:
+                break
+            rows, players, last_roll = (
+                np.concatenate(parts) for parts in zip(*moved_on)
+            )
+
+    def land_on_property(self, rows, players, spaces, last_roll):
+        owners = self.owner[rows, spaces].astype(np.int64)
+        unowned = owners == BANK
+        buyers = unowned.copy()
+        buyers[unowned] = self.wants_to_buy(
+            rows[unowned], players[unowned], spaces[unowned]
+        )
+        buyers &= self.money[rows, players] >= self.cost[spaces]
+        self.money[rows[buyers], players[buyers]] -= self.cost[spaces[buyers]]
+        self.owner[rows[buyers], spaces[buyers]] = players[buyers]
+
+        pays = ~unowned & (owners != players) & ~self.mortgaged[rows, spaces]
+        rows, players, owners = rows[pays], players[pays], owners[pays]
+        rent = self.get_rent(rows, owners, spaces[pays], last_roll[pays])
+        self.pay(rows, players, owners, rent)
+
+    def count_owned_in_group(self, rows, players, spaces):
+        same_group = self.group[None, :] == self.group[spaces][:, None]
+        return ((self.owner[rows] == players[:, None]) & same_group).sum(axis=1)
+
+    def get_rent(self, rows, owners, spaces, last_roll):
+        kinds = self.kind[spaces]
+        owned = self.count_owned_in_group(rows, owners, spaces)
+        levels = self.level[rows, spaces].astype(np.int64)
+        monopoly = owned == self.group_size[self.group[spaces]]
+        # buildable: "0", "monopoly", then 1 to 4 houses and the hotel; the others by number owned
+        column = np.where(
+            kinds == KIND["BuildableProperty"],
+            np.where(levels > 0, levels + 1, monopoly.astype(np.int64)),
+            owned - 1,
+        )
+        rent = self.rent[spaces, column]
+        utility = kinds == KIND["Utility"]
+        if utility.any():
+            rolled = last_roll[utility]
+            # `Utility.calculate_rent` without a roll: ten times a new one
+            reroll = self.rng.integers(1, 7, size=(2, rolled.size)).sum(axis=0)
+            rent[utility] = np.where(
+                rolled == NO_ROLL, 10 * reroll, rent[utility] * rolled
+            )
+        return rent
+
+    def wants_to_buy(self, rows, players, spaces):
+        owner = self.owner[rows]
+        owned = owner == players[:, None]
+        same_group = self.group[None, :] == self.group[spaces][:, None]
+        partial_monopolies = np.zeros(rows.size, dtype=np.int64)
+        for members in self.buildable_groups:
+            partial_monopolies += owned[:, members].sum(axis=1) == 3
+        features = SimpleNamespace(
+            money=self.money[rows, players],
+            cost=self.cost[spaces],
+            num_owned=owned.sum(axis=1),
+            owned_of_type=(owned & same_group).sum(axis=1),
+            nobody_owns_type=~((owner != BANK) & same_group).any(axis=1),
+            partial_monopolies=partial_monopolies,
+            railroad_or_utility=self.kind[spaces] != KIND["BuildableProperty"],
+        )
+        return self.buy_rule(features, self.buy_decision_algorithm)
+
+    def pay_off_mortgages(self, rows, players):
+        """
+        the way `Player.pay_off_mortgages` does: those of whole color groups first, in the order
+        of the board, while there's the cash
+        """
+        mortgaged = self.mortgaged[rows] & (self.owner[rows] == players[:, None])
+        some = mortgaged.any(axis=1)
+        if not some.any():
+            return
+        rows, players, mortgaged = rows[some], players[some], mortgaged[some]
+        owned = self.owner[rows] == players[:, None]
+        first = np.zeros_like(mortgaged)
+        for members in self.buildable_groups:
+            first[:, members] = owned[:, members].all(axis=1)[:, None]
+        for spaces in (mortgaged & first, mortgaged & ~first):
+            for space in np.flatnonzero(spaces.any(axis=0)):
+                paying = spaces[:, space] & (
+                    self.money[rows, players] >= self.unmortgage_cost[space]
+                )
+                self.money[rows[paying], players[paying]] -= self.unmortgage_cost[space]
+                self.mortgaged[rows[paying], space] = False
+
+    def buy_buildings(self, rows, players):
+        owned = self.owner[rows] == players[:, None]
+        mortgaged = self.mortgaged[rows]
+        for members in self.buildable_groups:
+            owns_all = owned[:, members].all(axis=1) & ~mortgaged[:, members].any(
+                axis=1
+            )
+            if not owns_all.any():
+                continue
+            group_rows, group_players = rows[owns_all], players[owns_all]
+            cost = self.house_cost[members[0]]
+            levels = np.minimum(
+                self.money[group_rows, group_players] // cost,
+                HOTEL_LEVEL - self.level[group_rows, members[0]],
+            )
+            self.money[group_rows, group_players] -= levels * cost
+            self.level[group_rows[:, None], members[None, :]] += levels[:, None].astype(
+                np.int8
+            )
+
+    def pay(self, rows, payers, payees, amounts):
+        """
+        `payees` are players, or BANK; players who can't pay go bankrupt
+        """
+        payees = np.broadcast_to(payees, rows.shape)
+        short = np.flatnonzero(self.money[rows, payers] < amounts)
+        if short.size:
+            # only solve for the players who could cover it by selling everything
+            can_cover = (
+                self.money[rows[short], payers[short]]
+                + self.get_liquidation_value(rows[short], payers[short])
+                >= amounts[short]
+            )
+            for i in short[can_cover]:
+                self.raise_funds(rows[i], payers[i], amounts[i])
+        paid = self.money[rows, payers] >= amounts
+        self.money[rows[paid], payers[paid]] -= amounts[paid]
+        to_player = paid & (payees != BANK)
+        self.money[rows[to_player], payees[to_player]] += amounts[to_player]
+        self.bankrupt[rows[~paid], payers[~paid]] = True
+        return paid
+
+    def get_liquidation_value(self, rows, players):
+        """
+        the cash from selling every building and mortgaging every property
+        """
+        owned = self.owner[rows] == players[:, None]
+        mortgages = np.where(owned & ~self.mortgaged[rows], self.mortgage_cost, 0)
+        buildings = self.level[rows] * (self.house_cost // 2)
+        return mortgages.sum(axis=1) + np.where(owned, buildings, 0).sum(axis=1)
+
+    def raise_funds(self, row, player, amount):
+        """
+        `liquidation.raise_funds`, for one player of one game
+        """
+        items = []
+        groups_seen = set()
+        for space in np.flatnonzero(self.owner[row] == player):
+            members = self.groups[self.group[space]]
+            if (
+                self.kind[space] == KIND["BuildableProperty"]
+                and (self.owner[row, members] == player).all()
+            ):
+                if self.group[space] in groups_seen:
+                    continue
+                groups_seen.add(self.group[space])
+                properties = [
+                    SimpleNamespace(
+                        space=member,
+                        building_level=self.level[row, member],
+                        house_and_hotel_cost=self.house_cost[member],
+                        mortgaged=self.mortgaged[row, member],
+                        mortgage_cost=self.mortgage_cost[member],
+                        unmortgage_cost=self.unmortgage_cost[member],
+                    )
+                    for member in members
+                ]
+                items.append((members, get_group_options(properties)))
+            elif not self.mortgaged[row, space]:
+                mortgage = SimpleNamespace(space=space)
+                items.append(
+                    (
+                        None,
+                        [
+                            (0, (), 0, 0),
+                            (
+                                0,
+                                (mortgage,),
+                                self.mortgage_cost[space],
+                                self.unmortgage_cost[space] - self.mortgage_cost[space],
+                            ),
+                        ],
+                    )
+                )
+        choices = solve(
+            tuple(
+                tuple((int(cash), int(loss)) for _, _, cash, loss in options)
+                for _, options in items
+            ),
+            int(amount - self.money[row, player]),
+        )
+        if choices is None:
+            return
+        for (members, options), index in zip(items, choices):
+            levels, to_mortgage, _, _ = options[index]
+            if levels:
+                self.level[row, members] -= levels
+                self.money[row, player] += levels * (self.house_cost[members[0]] // 2)
+            for property_ in to_mortgage:
+                self.mortgaged[row, property_.space] = True
+                self.money[row, player] += self.mortgage_cost[property_.space]
+
+    def draw_card(self, kind, rows, players):
+        """
+        the players who moved on to another space, and the dice they count as having rolled
+        """
+        deck = self.decks[kind]
+        cards = deck[rows, self.next_card[kind][rows] % deck.shape[1]]
+        self.next_card[kind][rows] += 1
+        moved_on = ([], [], [])
+
+        def drew(card):
+            mask = cards == CARD_EFFECTS.index(card)
+            return rows[mask], players[mask]
+
+        card_rows, card_players = drew(AdvanceThreeSpacesCard)
+        self.move(
+            card_rows, card_players, self.position[card_rows, card_players] + 3, True
+        )
+        moved_on[0].append(card_rows)
+        moved_on[1].append(card_players)
+        moved_on[2].append(np.full(card_rows.size, 3))
+
+        card_rows, card_players = drew(GoToBernPlaceFederaleCard)
+        self.move(card_rows, card_players, np.full(card_rows.size, self.bern), True)
+        moved_on[0].append(card_rows)
+        moved_on[1].append(card_players)
+        moved_on[2].append(np.full(card_rows.size, NO_ROLL))
+
+        card_rows, card_players = drew(GoToClosestRailroadCard)
+        spaces = self.position[card_rows, card_players] % self.num_spaces
+        self.move(card_rows, card_players, self.next_railroad[spaces], True)
+        moved_on[0].append(card_rows)
+        moved_on[1].append(card_players)
+        moved_on[2].append(np.full(card_rows.size, NO_ROLL))
+
+        # to the Jail space, but not to jail (see `GoToJailCard`)
+        card_rows, card_players = drew(GoToJailCard)
+        self.move(card_rows, card_players, np.full(card_rows.size, self.jail), False)
+
+        card_rows, card_players = drew(BuildingAndLoanMaturesCard)
+        self.money[card_rows, card_players] += 150
+
+        card_rows, card_players = drew(SpeedingCard)
+        self.pay(card_rows, card_players, BANK, np.full(card_rows.size, 15))
+
+        card_rows, card_players = drew(RepairPropertyCard)
+        if card_rows.size:
+            owned = self.owner[card_rows] == card_players[:, None]
+            levels = np.where(owned, self.level[card_rows], 0)
+            houses = np.where(levels < HOTEL_LEVEL, levels, 0).sum(axis=1)
+            hotels = (levels == HOTEL_LEVEL).sum(axis=1)
+            self.pay(card_rows, card_players, BANK, houses * 25 + hotels * 100)
+
+        card_rows, card_players = drew(ElectedPresidentCard)
+        if card_rows.size:
+            # everyone who was still in the game when the card was drawn, in turn
+            active = ~self.bankrupt[card_rows]
+            for seat in range(self.num_players):
+                pays = (
+                    active[:, seat]
+                    & (card_players != seat)
+                    & ~self.bankrupt[card_rows, card_players]
+                )
+                self.pay(
+                    card_rows[pays],
+                    card_players[pays],
+                    np.full(pays.sum(), seat),
+                    np.full(pays.sum(), 50),
+                )
+        return tuple(np.concatenate(parts).astype(np.int64) for parts in moved_on)
+
+    @property
+    def assets(self):
+        """
+        like `Player.assets`: cash plus the mortgage value of everything owned
+        """
+        assets = self.money.copy()
+        for player in range(self.num_players):
+            assets[:, player] += np.where(
+                self.owner == player, self.mortgage_cost[None, :], 0
+            ).sum(axis=1)
+        return assets
+
+    @property
+    def winner(self):
+        """
+        each game's winner (the seat), as in `Game.winner`
+        """
+        return np.argmax(
+            np.where(self.bankrupt, np.iinfo(np.int64).min, self.assets), axis=1
+        )
+
+    def get_rounds_played_per_player(self):
+        return self.rounds / self.num_players
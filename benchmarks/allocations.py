@@ -0,0 +1,48 @@
+"""
+How many memory blocks the engine allocates per turn once a game has warmed up, and where (see
+alloc_profile.py); exits with 1 over the budget, to keep the turn loop from allocating again.
+
+    python -m benchmarks.allocations [--games 4] [--budget 40] [--max-turns 600]
+"""
+import argparse
+import sys
+from contextlib import redirect_stdout
+
+from alloc_profile import profile_game
+from buy_decision_algos import BuyEverything, BuyIfNoOneOwnsTypeAndIsOfTheOneTypeOwned
+from simulate import silence
+
+NUM_PLAYERS = 4
+ALGORITHMS = (BuyEverything, BuyIfNoOneOwnsTypeAndIsOfTheOneTypeOwned)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=4)
+    parser.add_argument("--budget", type=float, default=40.0)
+    parser.add_argument("--max-turns", type=int, default=600)
+    parser.add_argument("--sites", type=int, default=10)
+    args = parser.parse_args()
+    silence()
+    out = sys.__stdout__
+    over = []
+    for algorithm in ALGORITHMS:
+        for seed in range(args.games):
+            profile = profile_game(
+                seed, NUM_PLAYERS, algorithm, max_turns=args.max_turns
+            )
+            print(f"{algorithm.__name__}, seed {seed}:", file=out)
+            with redirect_stdout(out):
+                profile.print_summary(args.sites)
+            if profile.blocks_per_turn > args.budget:
+                over.append((algorithm.__name__, seed, profile.blocks_per_turn))
+    for name, seed, blocks in over:
+        print(
+            f"{name}, seed {seed}: {blocks:.1f} blocks per turn, over {args.budget}",
+            file=out,
+        )
+    sys.exit(1 if over else 0)
+
+
+if __name__ == "__main__":
+    main()
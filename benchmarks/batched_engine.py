@@ -0,0 +1,47 @@
+"""
+Games per second of batched_engine.py against `Game`.
+
+    python -m benchmarks.batched_engine [--games 100000] [--players 4] [--max-rounds 400]
+"""
+import argparse
+import random
+import sys
+from time import perf_counter
+
+from batched_engine import BatchedGames
+from buy_decision_algos import BuyIfHaveThreeTimesPrice
+from monopoly import Game
+from simulate import silence
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=100_000)
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--max-rounds", type=int, default=400)
+    args = parser.parse_args()
+    silence()
+    out = sys.__stdout__
+
+    num_reference_games = 200
+    started = perf_counter()
+    for seed in range(num_reference_games):
+        random.seed(seed)
+        Game(args.players, BuyIfHaveThreeTimesPrice, max_rounds=args.max_rounds).end()
+    reference = num_reference_games / (perf_counter() - started)
+    print(f"Game: {reference:.0f} games/s", file=out)
+
+    started = perf_counter()
+    games = BatchedGames(
+        args.games, args.players, BuyIfHaveThreeTimesPrice, max_rounds=args.max_rounds
+    ).run()
+    batched = args.games / (perf_counter() - started)
+    print(
+        f"BatchedGames: {batched:.0f} games/s ({batched / reference:.0f}x), "
+        f"mean rounds per player {games.get_rounds_played_per_player().mean():.1f}",
+        file=out,
+    )
+
+
+if __name__ == "__main__":
+    main()
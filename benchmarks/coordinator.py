@@ -0,0 +1,58 @@
+"""
+Throughput of coordinator.py with 1, 2, 4 and 8 local workers standing in for machines, each
+playing the same sweep from scratch over TCP on localhost.
+
+    python -m benchmarks.coordinator [--workers 1 2 4 8] [--games 200] [--max-rounds 100]
+"""
+import argparse
+import os
+import sys
+import tempfile
+from time import perf_counter
+
+from buy_decision_algos import BuyEverything, BuyIfHaveThreeTimesPrice
+from coordinator import Coordinator
+from simulate import silence
+from sweep import Sweep
+
+NUM_PLAYERS = (2, 3, 4, 5)
+ALGORITHMS = (BuyEverything, BuyIfHaveThreeTimesPrice)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--chunk-size", type=int, default=10)
+    parser.add_argument("--max-rounds", type=int, default=100)
+    args = parser.parse_args()
+    silence()
+    out = sys.__stdout__
+    print(f"{os.cpu_count()} cpus", file=out)
+    num_games = args.games * len(NUM_PLAYERS) * len(ALGORITHMS)
+    for num_workers in args.workers:
+        with tempfile.TemporaryDirectory() as directory:
+            sweep = Sweep(
+                os.path.join(directory, "sweep.jsonl"),
+                chunk_size=args.chunk_size,
+                max_rounds=args.max_rounds,
+            )
+            coordinator = Coordinator(sweep)
+            started = perf_counter()
+            coordinator.run(
+                "tcp://127.0.0.1:0",
+                num_games=args.games,
+                num_players=NUM_PLAYERS,
+                buy_decision_algorithms=ALGORITHMS,
+                local_workers=num_workers,
+            )
+            elapsed = perf_counter() - started
+        print(
+            f"{num_workers} workers: {num_games / elapsed:.0f} games/s "
+            f"({coordinator.summary()})",
+            file=out,
+        )
+
+
+if __name__ == "__main__":
+    main()
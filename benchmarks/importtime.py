@@ -0,0 +1,73 @@
+"""
+What importing the engine and the modules workers start from costs, as `python -X importtime`
+reports it, since every spawned worker and every command pays it before playing a game.
+
+    python -m benchmarks.importtime [--runs 7] [--budget-ms 25]
+
+Every module is imported in a fresh interpreter `--runs` times, with the bytecode cached (in a
+temporary directory, whatever PYTHONDONTWRITEBYTECODE says) as it would be once installed; the
+median of the cumulative times is reported, with the imports that took longest in the last run.
+Exits with 1 if importing `monopoly` takes longer than `--budget-ms`.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+MODULES = ("monopoly", "buy_decision_algos", "simulate", "sweep")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_time(module: str, pycache: str) -> tuple:
+    """
+    the microseconds `module` took, with everything it imported; and every import's own time
+    """
+    env = {**os.environ, "PYTHONPYCACHEPREFIX": pycache}
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:") :].split("|")
+        imports.append((int(own), int(cumulative), name.strip()))
+    return imports[-1][1], imports
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--budget-ms", type=float, default=25.0)
+    args = parser.parse_args()
+    out = sys.__stdout__
+    times = {}
+    with tempfile.TemporaryDirectory() as pycache:
+        for module in MODULES:
+            # the first run writes the bytecode
+            import_time(module, pycache)
+            runs = [import_time(module, pycache) for _ in range(args.runs)]
+            times[module] = statistics.median(total for total, _ in runs) / 1000
+            slowest = sorted(runs[-1][1], reverse=True)[:5]
+            print(f"{module}: {times[module]:.1f}ms", file=out)
+            for own, _, name in slowest:
+                print(f"    {name:<28}{own / 1000:>6.1f}ms", file=out)
+    if times["monopoly"] > args.budget_ms:
+        print(
+            f"importing monopoly took {times['monopoly']:.1f}ms, over the "
+            f"{args.budget_ms:.0f}ms budget",
+            file=out,
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Load test for server.py: lots of concurrent games, each with one person (simulated here) and
+bots, reporting the latency of the person's actions, i.e. from sending a decision until the game
+has played on to their next one.
+
+    python -m benchmarks.loadtest_server [--games 1000 10000] [--http] [--max-rounds 100]
+        [--think-time 0]
+
+With no think time, every person answers the moment they're asked, which saturates the server:
+latency is then mostly queueing behind the other games. Give people some thinking time (in
+seconds, exponentially distributed) for a load the server can keep up with.
+
+By default the simulated people call the server in-process, which measures the server (the
+engine plus the scheduling of thousands of games) without the cost of the clients; `--http`
+sends every decision over a real keep-alive HTTP connection per game instead.
+"""
+import argparse
+import asyncio
+import json
+import random
+import resource
+import statistics
+import sys
+from time import perf_counter
+
+from server import GameServer
+from simulate import silence
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+async def think(rng, think_time):
+    if think_time:
+        await asyncio.sleep(rng.expovariate(1 / think_time))
+
+
+async def play_in_process(session, latencies, rng, think_time):
+    state = await session.wait_for_turn()
+    while not state["over"]:
+        await think(rng, think_time)
+        started = perf_counter()
+        state = await session.decide(0, rng.random() < 0.7)
+        latencies.append(perf_counter() - started)
+
+
+async def send(reader, writer, method, path, payload):
+    body = json.dumps(payload).encode()
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n".encode()
+        + body
+    )
+    await reader.readline()
+    length = 0
+    while (line := await reader.readline()) != b"\r\n":
+        name, _, value = line.decode().partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return json.loads(await reader.readexactly(length))
+
+
+async def play_over_http(port, max_rounds, latencies, rng, think_time, connections):
+    async with connections:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        state = await send(reader, writer, "POST", "/games", {"max_rounds": max_rounds})
+        path = f"/games/{state['id']}/decisions"
+        while not state["over"]:
+            await think(rng, think_time)
+            started = perf_counter()
+            state = await send(
+                reader, writer, "POST", path, {"seat": 0, "buy": rng.random() < 0.7}
+            )
+            latencies.append(perf_counter() - started)
+        writer.close()
+
+
+async def load_test(num_games, max_rounds, http, think_time):
+    server = GameServer()
+    rng = random.Random(num_games)
+    latencies = []
+    started = perf_counter()
+    if http:
+        listener = await server.serve(port=0)
+        port = listener.sockets[0].getsockname()[1]
+        # leave some file descriptors for everything else
+        limit = resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+        connections = asyncio.Semaphore(max(1, min(num_games, limit // 2 - 50)))
+        await asyncio.gather(
+            *(
+                play_over_http(port, max_rounds, latencies, rng, think_time, connections)
+                for _ in range(num_games)
+            )
+        )
+        listener.close()
+    else:
+        sessions = [server.create(max_rounds=max_rounds) for _ in range(num_games)]
+        await asyncio.gather(
+            *(play_in_process(s, latencies, rng, think_time) for s in sessions)
+        )
+    elapsed = perf_counter() - started
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {
+        "games": num_games,
+        "actions": len(latencies),
+        "actions_per_second": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 0.5) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "max_rss_mb": rss,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--max-rounds", type=int, default=100)
+    parser.add_argument("--http", action="store_true")
+    parser.add_argument("--think-time", type=float, default=0.0)
+    args = parser.parse_args()
+    silence()
+    for num_games in args.games:
+        result = asyncio.run(
+            load_test(num_games, args.max_rounds, args.http, args.think_time)
+        )
+        print(
+            f"{result['games']} games: {result['actions']} actions, "
+            f"{result['actions_per_second']:.0f}/s, p50 {result['p50_ms']:.2f}ms, "
+            f"p99 {result['p99_ms']:.2f}ms, max rss {result['max_rss_mb']:.0f}MB",
+            file=sys.__stdout__,
+        )
+
+
+if __name__ == "__main__":
+    main()
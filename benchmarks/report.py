@@ -0,0 +1,62 @@
+"""
+How long the report (see report.py) takes to bootstrap and compare the results of many games,
+on results drawn to look like the number of rounds games last and the money players end with;
+exits with 1 over the budget.
+
+    python -m benchmarks.report [--games 10000000] [--resamples 2000] [--budget-seconds 20]
+"""
+import argparse
+import sys
+from contextlib import redirect_stdout
+from time import perf_counter
+
+import numpy as np
+
+from report import Report
+from simulate import silence
+
+
+def get_results(rng, num_games, shift) -> dict:
+    rounds = rng.poisson(60, num_games)
+    return {
+        "rounds": rounds + rng.integers(0, shift + 1, num_games),
+        "money": rng.normal(1_000 + 10 * shift, 300, num_games),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=10_000_000)
+    parser.add_argument("--resamples", type=int, default=2_000)
+    parser.add_argument("--budget-seconds", type=float, default=20.0)
+    args = parser.parse_args()
+    silence()
+    out = sys.__stdout__
+    rng = np.random.default_rng(0)
+    report = Report(resamples=args.resamples)
+    for name, shift in (("baseline", 0), ("other", 2)):
+        report.add(name, 4, get_results(rng, args.games, shift))
+    timings = {}
+    for stage, run in (
+        ("summaries", report.get_summaries),
+        ("paired comparisons", report.get_comparisons),
+        ("unpaired comparisons", lambda: report.get_comparisons(paired=False)),
+    ):
+        started = perf_counter()
+        run()
+        timings[stage] = perf_counter() - started
+    with redirect_stdout(out):
+        report.print_tables()
+    print(file=out)
+    for stage, seconds in timings.items():
+        print(f"{stage}: {seconds:.2f}s", file=out)
+    total = sum(timings.values())
+    print(
+        f"{args.games:,} games a cell, {args.resamples} resamples: {total:.2f}s",
+        file=out,
+    )
+    sys.exit(1 if total > args.budget_seconds else 0)
+
+
+if __name__ == "__main__":
+    main()
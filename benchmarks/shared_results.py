@@ -0,0 +1,98 @@
+"""
+What it costs to get the per-game results of short games back from the workers: pickled lists
+against the shared memory buffers of shared_results.py, where only a notice comes back per unit.
+
+    python -m benchmarks.shared_results [--games 2000] [--processes 2] [--chunk-size 25]
+
+The transfer cost is what the messages the parent receives take to pickle and unpickle, and
+their size, per game; the wall clock time per game includes playing them.
+"""
+import argparse
+import pickle
+import sys
+from multiprocessing import Pool
+from time import perf_counter
+
+from buy_decision_algos import BuyEverything
+from result_cache import play
+from shared_results import play_shared
+from simulate import silence
+
+ATTRS = ("get_rounds_played_per_player", "rounds", "max_rounds")
+NUM_PLAYERS = 2
+
+
+def play_chunk(task):
+    first, last, max_rounds = task
+    return play(BuyEverything, NUM_PLAYERS, range(first, last), ATTRS, max_rounds)
+
+
+def get_transfer_cost(messages) -> tuple:
+    """
+    seconds and bytes to send `messages` through a queue
+    """
+    started = perf_counter()
+    size = 0
+    for message in messages:
+        data = pickle.dumps(message)
+        pickle.loads(data)
+        size += len(data)
+    return perf_counter() - started, size
+
+
+def pickled(num_games, processes, chunk_size, max_rounds):
+    tasks = [
+        (first, min(first + chunk_size, num_games), max_rounds)
+        for first in range(0, num_games, chunk_size)
+    ]
+    started = perf_counter()
+    with Pool(processes, initializer=silence) as pool:
+        messages = list(pool.imap_unordered(play_chunk, tasks))
+    return perf_counter() - started, messages
+
+
+def shared(num_games, processes, chunk_size, max_rounds):
+    started = perf_counter()
+    with play_shared(
+        BuyEverything,
+        NUM_PLAYERS,
+        range(num_games),
+        ATTRS,
+        max_rounds,
+        processes,
+        chunk_size,
+    ) as results:
+        results.get_summary()
+    seconds = perf_counter() - started
+    # all that came back: a range of games per unit
+    messages = [
+        (first, min(first + chunk_size, num_games))
+        for first in range(0, num_games, chunk_size)
+    ]
+    return seconds, messages
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=2_000)
+    parser.add_argument("--processes", type=int, default=2)
+    parser.add_argument("--chunk-size", type=int, default=25)
+    parser.add_argument("--max-rounds", type=int, default=100)
+    args = parser.parse_args()
+    silence()
+    out = sys.__stdout__
+    for name, run in (("pickled lists", pickled), ("shared memory", shared)):
+        seconds, messages = run(
+            args.games, args.processes, args.chunk_size, args.max_rounds
+        )
+        transfer, size = get_transfer_cost(messages)
+        print(
+            f"{name}: {seconds / args.games * 1e6:.0f}us per game, transfer "
+            f"{transfer / args.games * 1e6:.2f}us and {size / args.games:.1f} bytes "
+            f"per game",
+            file=out,
+        )
+
+
+if __name__ == "__main__":
+    main()
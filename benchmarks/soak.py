@@ -0,0 +1,83 @@
+"""
+Plays games one after another for a long time and checks that memory stays flat and that games
+don't affect each other: the resident set size and the number of objects the garbage collector
+tracks are sampled every `--every` games, and a reference game is replayed at every sample and
+must come out the same as the first time.
+
+    python -m benchmarks.soak [--games 10000000] [--every 100000] [--max-rounds 100]
+                              [--tolerance-mb 5]
+
+Exits with 1 if the RSS grew by more than `--tolerance-mb` after the first sample (which
+includes warming up), or if the reference game changed.
+"""
+import argparse
+import gc
+import os
+import random
+import resource
+import sys
+from time import perf_counter
+
+from buy_decision_algos import BuyEverything, BuyIfHaveThreeTimesPrice
+from monopoly import Game
+from simulate import silence
+
+ALGORITHMS = (BuyEverything, BuyIfHaveThreeTimesPrice)
+
+
+def get_rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        # the peak rather than the current size, which can only show growth too
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def play(seed: int, max_rounds: int) -> tuple:
+    random.seed(seed)
+    game = Game(2 + seed % 7, ALGORITHMS[seed % len(ALGORITHMS)], max_rounds=max_rounds)
+    result = game.rounds, game.winner.seat, [player.money for player in game._players]
+    game.end()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=10_000_000)
+    parser.add_argument("--every", type=int, default=100_000)
+    parser.add_argument("--max-rounds", type=int, default=100)
+    parser.add_argument("--tolerance-mb", type=float, default=5)
+    args = parser.parse_args()
+    silence()
+    out = sys.__stdout__
+
+    reference = play(0, args.max_rounds)
+    baseline_rss = None
+    failed = False
+    started = perf_counter()
+    for seed in range(1, args.games + 1):
+        play(seed, args.max_rounds)
+        if seed % args.every and seed != args.games:
+            continue
+        gc.collect()
+        rss = get_rss_mb()
+        if baseline_rss is None:
+            baseline_rss = rss
+        same = play(0, args.max_rounds) == reference
+        print(
+            f"{seed} games, {seed / (perf_counter() - started):.0f} games/s: "
+            f"RSS {rss:.1f}MB ({rss - baseline_rss:+.1f}), "
+            f"{len(gc.get_objects())} tracked objects, "
+            f"reference game {'unchanged' if same else 'CHANGED'}",
+            file=out,
+        )
+        if not same or rss - baseline_rss > args.tolerance_mb:
+            failed = True
+    print("FAILED" if failed else "OK", file=out)
+    sys.exit(failed)
+
+
+if __name__ == "__main__":
+    main()
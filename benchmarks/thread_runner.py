@@ -0,0 +1,100 @@
+"""
+How games scale with threads (see thread_runner.py) against processes (see shared_results.py),
+and what every worker costs in memory.
+
+    python -m benchmarks.thread_runner [--games 400] [--workers 1 2 4] [--max-rounds 100]
+
+Threads only play games in parallel on a free-threaded build; with the GIL on they're timed
+anyway, to show what the fallback to processes is for. A thread's memory is what its copy of
+the engine allocates (with tracemalloc); a process's is its peak resident set, a whole
+interpreter with the engine imported.
+"""
+import argparse
+import resource
+import sys
+import tracemalloc
+from multiprocessing import Pool
+from time import perf_counter
+
+from buy_decision_algos import BuyEverything
+from shared_results import play_shared
+from simulate import silence
+from thread_runner import Engine, ThreadRunner, is_free_threaded
+
+NUM_PLAYERS = 4
+
+
+def get_peak_rss(_) -> int:
+    # in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def time_threads(workers, num_games, max_rounds) -> float:
+    with ThreadRunner(workers) as runner:
+        # the threads load their engines on their first chunk; leave that out
+        runner.play(
+            BuyEverything, NUM_PLAYERS, range(workers), max_rounds=1, chunk_size=1
+        )
+        started = perf_counter()
+        runner.play(BuyEverything, NUM_PLAYERS, range(num_games), max_rounds=max_rounds)
+        return perf_counter() - started
+
+
+def time_processes(workers, num_games, max_rounds) -> float:
+    started = perf_counter()
+    with play_shared(
+        BuyEverything,
+        NUM_PLAYERS,
+        range(num_games),
+        max_rounds=max_rounds,
+        processes=workers,
+    ):
+        return perf_counter() - started
+
+
+def get_thread_memory() -> int:
+    tracemalloc.start()
+    engine = Engine()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del engine
+    return size
+
+
+def get_process_memory(workers) -> int:
+    with Pool(workers, initializer=silence) as pool:
+        return max(pool.map(get_peak_rss, range(workers)))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=400)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--max-rounds", type=int, default=100)
+    args = parser.parse_args()
+    silence()
+    out = sys.__stdout__
+    print(
+        f"Python {sys.version.split()[0]}, "
+        f"{'free-threaded' if is_free_threaded() else 'with the GIL'}",
+        file=out,
+    )
+    for name, run in (("threads", time_threads), ("processes", time_processes)):
+        baseline = None
+        for workers in args.workers:
+            seconds = run(workers, args.games, args.max_rounds)
+            baseline = baseline or seconds * workers
+            print(
+                f"{name} x{workers}: {seconds / args.games * 1e6:.0f}us per game, "
+                f"{baseline / seconds / workers:.0%} scaling efficiency",
+                file=out,
+            )
+    print(f"memory per thread: {get_thread_memory() / 1024:.0f} KB", file=out)
+    print(
+        f"memory per process: {get_process_memory(max(args.workers)) / 1024:.0f} KB",
+        file=out,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+What a short job costs with a fresh process pool against the warm pool of warm_pool.py, and the
+warm pool's dispatch latency (from sending a job to a worker starting on it).
+
+    python -m benchmarks.warm_pool [--jobs 1000] [--processes 2]
+"""
+import argparse
+import multiprocessing
+import statistics
+import sys
+from time import perf_counter
+
+from buy_decision_algos import BuyEverything
+from result_cache import play
+from simulate import silence
+from warm_pool import WarmPool
+
+ATTRS = ("get_rounds_played_per_player",)
+
+
+def play_one(seed):
+    return play(BuyEverything, 2, range(seed, seed + 1), ATTRS, 20)
+
+
+def cold(num_jobs, processes):
+    """
+    a new pool per job, the way a one-off cell is usually run
+    """
+    started = perf_counter()
+    for seed in range(num_jobs):
+        with multiprocessing.get_context("spawn").Pool(processes, silence) as pool:
+            pool.map(play_one, [seed])
+    return (perf_counter() - started) / num_jobs
+
+
+def warm(num_jobs, processes):
+    with WarmPool(processes) as pool:
+        pings = [pool.ping() for _ in range(num_jobs)]
+        started = perf_counter()
+        for seed in range(num_jobs):
+            pool.play(BuyEverything, 2, range(seed, seed + 1), max_rounds=20)
+        per_job = (perf_counter() - started) / num_jobs
+        return per_job, statistics.median(pings), pool.summary()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=1_000)
+    parser.add_argument("--processes", type=int, default=2)
+    args = parser.parse_args()
+    silence()
+    out = sys.__stdout__
+    cold_jobs = max(1, args.jobs // 100)
+    print(
+        f"fresh pool: {cold(cold_jobs, args.processes) * 1000:.1f}ms per job", file=out
+    )
+    per_job, ping, summary = warm(args.jobs, args.processes)
+    print(
+        f"warm pool: {per_job * 1000:.2f}ms per job, ping {ping * 1e6:.0f}us", file=out
+    )
+    print(f"warm pool: {summary}", file=out)
+
+
+if __name__ == "__main__":
+    main()
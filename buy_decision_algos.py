@@ -10,7 +10,6 @@ players. Sneaky, huh?'
 'utilities are completely pointless.'
 """
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING
 
 from monopoly import Property, Player
 
@@ -26,6 +25,17 @@ class BuyEverything(BuyDecision):
         return True
 
 
+class AskThePlayer(BuyDecision):
+    """
+    for seats played by a person: the game waits for them to make up their mind
+    """
+
+    def __call__(self, property_: "Property", player: "Player"):
+        from monopoly.interactive import PendingBuyDecision
+
+        return PendingBuyDecision(property_, player)
+
+
 class BuyIfHaveThreeTimesPrice(BuyDecision):
     def __call__(self, property_: "Property", player: "Player"):
         return player.money >= property_.cost * 3
@@ -86,3 +96,65 @@ If this player owns any of this type fo property, buy it.
         if player.properties and property_.type in players_property_types:
             return True
         return False
+
+
+class ParametricBuyDecision(BuyDecision):
+    """
+ALGORITHM
+---------
+Never buy what you can't afford.
+If you own fewer than `always_buy_below` properties, buy it.
+Otherwise buy it if you'd have `reserve` left afterwards and have `cash_multiple` times its
+price (`utility_multiple` times for utilities and railroads), with the multiple cut by
+`same_type_discount` if you already own one of this type.
+
+The defaults are `BuyIfHaveThreeTimesPrice`'s factor of 3 and
+`BuyIfOwnFewerThanFivePropertiesOrHaveOneOfThisColor`'s cutoff of 5.
+    """
+
+    # name, lower bound, upper bound, default
+    parameters = (
+        ("cash_multiple", 0.0, 6.0, 3.0),
+        ("reserve", 0.0, 500.0, 0.0),
+        ("always_buy_below", 0.0, 10.0, 5.0),
+        ("same_type_discount", 0.0, 1.0, 0.0),
+        ("utility_multiple", 0.0, 6.0, 3.0),
+    )
+
+    def __init__(self, **params):
+        for name, _, _, default in self.parameters:
+            setattr(self, name, params.pop(name, default))
+        if params:
+            raise TypeError(f"unknown parameters: {', '.join(params)}")
+
+    def __repr__(self):
+        params = ", ".join(f"{name}={getattr(self, name):.3g}" for name in self.names())
+        return f"{self.__class__.__name__}({params})"
+
+    @classmethod
+    def names(cls):
+        return [name for name, _, _, _ in cls.parameters]
+
+    @classmethod
+    def from_vector(cls, vector):
+        return cls(**dict(zip(cls.names(), vector)))
+
+    @property
+    def vector(self):
+        return tuple(getattr(self, name) for name in self.names())
+
+    def __call__(self, property_, player):
+        if player.money < property_.cost:
+            return False
+        if len(player.properties) < self.always_buy_below:
+            return True
+        if property_.type in ("railroad", "utility"):
+            multiple = self.utility_multiple
+        else:
+            multiple = self.cash_multiple
+        if player.owns_x_of_type(property_.type):
+            multiple *= 1 - self.same_type_discount
+        return (
+            player.money - property_.cost >= self.reserve
+            and player.money >= property_.cost * multiple
+        )
@@ -0,0 +1,343 @@
+"""
+Run a sweep (see sweep.py) on workers on other machines: a coordinator hands out the sweep's work
+units over TCP or a Unix socket, and records what comes back in the sweep's checkpoint.
+
+    python coordinator.py serve tcp://0.0.0.0:7000 sweep.jsonl --games 1000
+    python coordinator.py work tcp://coordinator-host:7000       # on every worker machine
+
+Workers pull: a worker asks for a unit when it has nothing to do, so faster machines take on
+more of the work without the coordinator knowing anything about them. Once there are no units
+left to hand out, a worker that asks steals a copy of the unit that's been running the longest;
+whichever copy finishes first is recorded, and units are small enough that this costs little
+but saves waiting for a straggler at the end.
+
+Workers send a heartbeat every `HEARTBEAT_INTERVAL` seconds while they play. A worker that
+disconnects, or hasn't been heard from for `heartbeat_timeout` seconds, is dropped and its unit
+goes back to the front of the queue.
+
+Each unit comes back as its aggregates (count, sum and sum of squares per attribute), which the
+sweep merges into its cells and checkpoints, so the coordinator can be restarted too.
+
+Messages are JSON, each preceded by its length as 4 bytes.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import socket
+import struct
+import threading
+from collections import deque
+from time import monotonic
+from typing import Dict, List, Optional
+
+import buy_decision_algos
+from metrics import SweepMetrics
+from simulate import silence
+from sweep import Sweep, play_unit
+
+HEARTBEAT_INTERVAL = 1.0
+HEARTBEAT_TIMEOUT = 10.0
+LENGTH = struct.Struct("!I")
+
+
+def parse_address(address: str):
+    """
+    tcp://host:port or unix:path -> (socket family, address)
+    """
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[len("unix:") :]
+    if address.startswith("tcp://"):
+        host, _, port = address[len("tcp://") :].rpartition(":")
+        return socket.AF_INET, (host, int(port))
+    raise ValueError(f"the address must be tcp://host:port or unix:path, not {address}")
+
+
+def encode(message: dict) -> bytes:
+    data = json.dumps(message).encode()
+    return LENGTH.pack(len(data)) + data
+
+
+def get_key(task) -> tuple:
+    _, algorithm_name, num_players, chunk, *_ = task
+    return algorithm_name, num_players, chunk
+
+
+class WorkerConnection:
+    def __init__(self, task, writer):
+        # the task handling the connection
+        self.task = task
+        self.writer = writer
+        self.key = None
+
+    def send(self, message: dict):
+        self.writer.write(encode(message))
+
+
+class Coordinator:
+    def __init__(self, sweep: Sweep, heartbeat_timeout=HEARTBEAT_TIMEOUT):
+        self.sweep = sweep
+        self.heartbeat_timeout = heartbeat_timeout
+        self.queue = deque()
+        # key -> [task, workers running it, when the first one started]
+        self.in_flight: Dict[tuple, list] = {}
+        self.workers: List[WorkerConnection] = []
+        self.changed = asyncio.Event()
+        self.finished = asyncio.Event()
+        self.dispatched = 0
+        self.stolen = 0
+        self.redispatched = 0
+        self.dead_workers = 0
+        if sweep.metrics is not None:
+            sweep.metrics.coordinator = self
+
+    def refresh_metrics(self):
+        if self.sweep.metrics is not None:
+            self.sweep.metrics.render()
+
+    def notify(self):
+        self.changed.set()
+        self.changed = asyncio.Event()
+        if not self.queue and not self.in_flight:
+            self.finished.set()
+
+    def steal(self) -> Optional[list]:
+        """
+        the longest running unit that only one worker has
+        """
+        running = [unit for unit in self.in_flight.values() if len(unit[1]) == 1]
+        if not running:
+            return None
+        self.stolen += 1
+        return min(running, key=lambda unit: unit[2])
+
+    async def assign(self, worker: WorkerConnection) -> bool:
+        """
+        gives the worker a unit, waiting for one if need be; False once the sweep is done
+        """
+        while True:
+            if self.queue:
+                task = self.queue.popleft()
+                unit = self.in_flight[get_key(task)] = [task, set(), monotonic()]
+                break
+            if not self.in_flight:
+                worker.send({"type": "done"})
+                return False
+            unit = self.steal()
+            if unit is not None:
+                break
+            await self.changed.wait()
+        unit[1].add(worker)
+        worker.key = get_key(unit[0])
+        self.dispatched += 1
+        worker.send({"type": "task", "task": unit[0]})
+        return True
+
+    def complete(self, worker: WorkerConnection, message: dict):
+        algorithm_name, num_players, chunk = message["key"]
+        key = (algorithm_name, num_players, chunk)
+        worker.key = None
+        unit = self.in_flight.pop(key, None)
+        if unit is not None:
+            for other in unit[1] - {worker}:
+                other.key = None
+        self.sweep.record((algorithm_name, num_players), chunk, message["aggregates"])
+        self.notify()
+
+    def drop(self, worker: WorkerConnection):
+        if self.finished.is_set():
+            return
+        self.dead_workers += 1
+        unit = self.in_flight.get(worker.key)
+        if unit is not None:
+            unit[1].discard(worker)
+            if not unit[1]:
+                del self.in_flight[worker.key]
+                self.queue.appendleft(unit[0])
+                self.redispatched += 1
+        self.notify()
+        self.refresh_metrics()
+
+    async def read_message(self, reader) -> dict:
+        (length,) = LENGTH.unpack(await reader.readexactly(LENGTH.size))
+        return json.loads(await reader.readexactly(length))
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        worker = WorkerConnection(asyncio.current_task(), writer)
+        self.workers.append(worker)
+        self.refresh_metrics()
+        try:
+            while True:
+                message = await asyncio.wait_for(
+                    self.read_message(reader), self.heartbeat_timeout
+                )
+                if message["type"] == "result":
+                    self.complete(worker, message)
+                if message["type"] in ("ready", "result"):
+                    if not await self.assign(worker):
+                        await writer.drain()
+                        break
+                    await writer.drain()
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            self.drop(worker)
+        finally:
+            self.workers.remove(worker)
+            writer.close()
+
+    async def serve(self, address: str):
+        family, where = parse_address(address)
+        if family == socket.AF_UNIX:
+            return await asyncio.start_unix_server(self.handle, where)
+        return await asyncio.start_server(self.handle, *where)
+
+    async def run_async(
+        self,
+        address: str,
+        num_games=200,
+        num_players=range(2, 9),
+        buy_decision_algorithms=(
+            buy_decision_algos.BuyIfNoOneOwnsTypeAndIsOfTheOneTypeOwned,
+        ),
+        local_workers=0,
+    ):
+        """
+        serves the sweep's pending units until they're all done, optionally with some workers
+        on this machine
+        """
+        self.queue.extend(
+            self.sweep.get_pending(num_games, num_players, buy_decision_algorithms)
+        )
+        self.notify()
+        server = await self.serve(address)
+        if address.startswith("tcp://"):
+            host, port = server.sockets[0].getsockname()[:2]
+            address = f"tcp://{host}:{port}"
+        processes = start_local_workers(address, local_workers)
+        try:
+            await self.finished.wait()
+        finally:
+            server.close()
+            # workers still connected are either stealing copies that aren't needed any more,
+            # or stuck
+            handlers = [worker.task for worker in self.workers]
+            for worker in self.workers:
+                worker.writer.close()
+            await asyncio.gather(*handlers, return_exceptions=True)
+            for process in processes:
+                # in a thread: the workers need the loop to be told they're done
+                await asyncio.to_thread(process.join)
+        self.sweep.compact()
+        return self.sweep.results()
+
+    def run(self, address: str, *args, **kwargs):
+        return asyncio.run(self.run_async(address, *args, **kwargs))
+
+    def summary(self) -> str:
+        return (
+            f"{self.dispatched} units dispatched, {self.stolen} stolen, "
+            f"{self.redispatched} redispatched, {self.dead_workers} workers lost"
+        )
+
+
+def receive(connection: socket.socket) -> Optional[dict]:
+    header = connection.recv(LENGTH.size, socket.MSG_WAITALL)
+    if len(header) < LENGTH.size:
+        return None
+    (length,) = LENGTH.unpack(header)
+    return json.loads(connection.recv(length, socket.MSG_WAITALL))
+
+
+def work(address: str, heartbeat_interval=HEARTBEAT_INTERVAL):
+    """
+    plays the units a coordinator hands out until it says it's done
+    """
+    silence()
+    family, where = parse_address(address)
+    connection = socket.socket(family, socket.SOCK_STREAM)
+    connection.connect(where)
+    sending = threading.Lock()
+    stopped = threading.Event()
+
+    def send(message):
+        with sending:
+            connection.sendall(encode(message))
+
+    def beat():
+        while not stopped.wait(heartbeat_interval):
+            try:
+                send({"type": "heartbeat"})
+            except OSError:
+                break
+
+    threading.Thread(target=beat, daemon=True).start()
+    try:
+        send({"type": "ready"})
+        while True:
+            message = receive(connection)
+            if message is None or message["type"] == "done":
+                break
+            cell, chunk, aggregates = play_unit(message["task"])
+            send({"type": "result", "key": [*cell, chunk], "aggregates": aggregates})
+    except OSError:
+        # the coordinator is gone, or finished while this was playing a stolen copy
+        pass
+    finally:
+        stopped.set()
+        connection.close()
+
+
+def start_local_workers(address: str, num_workers: int) -> list:
+    context = multiprocessing.get_context("fork")
+    processes = [
+        context.Process(target=work, args=(address,), daemon=True)
+        for _ in range(num_workers)
+    ]
+    for process in processes:
+        process.start()
+    return processes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve")
+    serve.add_argument("address")
+    serve.add_argument("checkpoint")
+    serve.add_argument("--games", type=int, default=200)
+    serve.add_argument("--players", type=int, nargs="+", default=list(range(2, 9)))
+    serve.add_argument(
+        "--algorithms",
+        nargs="+",
+        default=["BuyIfNoOneOwnsTypeAndIsOfTheOneTypeOwned"],
+    )
+    serve.add_argument("--seed", type=int, default=0)
+    serve.add_argument("--local-workers", type=int, default=0)
+    serve.add_argument("--metrics-port", type=int, help="serve live metrics on this port")
+    serve.add_argument("--metrics-snapshot", help="write the metrics to this JSON file")
+    worker = commands.add_parser("work")
+    worker.add_argument("address")
+    args = parser.parse_args()
+
+    if args.command == "work":
+        work(args.address)
+        return
+    metrics = SweepMetrics(snapshot_path=args.metrics_snapshot)
+    if args.metrics_port:
+        metrics.serve(args.metrics_port)
+    coordinator = Coordinator(Sweep(args.checkpoint, seed=args.seed, metrics=metrics))
+    coordinator.run(
+        args.address,
+        num_games=args.games,
+        num_players=args.players,
+        buy_decision_algorithms=[
+            getattr(buy_decision_algos, name) for name in args.algorithms
+        ],
+        local_workers=args.local_workers,
+    )
+    metrics.close()
+    coordinator.sweep.print_results()
+    print(coordinator.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,494 @@
+"""
+What a change to the board's rents, prices or taxes would have done, worked out from games
+already played instead of a sweep of new ones.
+
+A variant is an edition (see editions.py) with some of its rents, purchase prices or taxes
+changed:
+
+    variant = make_variant(rents={"Berne Place Fédérale": 1.1}, taxes={"LuxuryTax": 100})
+    report = reweight(record_games(range(1_000), 4, BuyEverything), variant)
+    report.print_summary()
+
+Every logged game (see event_log.py) is replayed with the variant's cash flows: each rent is
+looked up again in the variant's table, at the level the property was at when it was paid,
+and each tax and purchase price is swapped for the variant's, so every player's cash is known
+as it would have been all along. The game stays one the variant would have played for as long
+as nothing that was decided on the cash would have gone the other way: a purchase, a building
+bought or not, funds raised to pay a debt, a bankruptcy. The first decision that would have
+changed is a divergence, and the game's weight drops to 0.
+
+Purchases can be weighted instead, as if the players bought with a probability that rises with
+their cash around the price (a logistic of the difference, `temperature` wide): each game is
+weighted by how much likelier the variant's cash made its purchases, the usual importance
+weight. With `temperature=0` (the default) the weights are 1 or 0, and nothing is assumed about
+the players but the rules.
+
+The estimates only rest on the games that kept some weight, and those that diverged aren't a
+random sample of the rest. The report gives the effective sample size of the weights; once it
+falls below `min_ess_fraction` of the games, the variant needs games of its own
+(`needs_resimulation`), which `save_variant` makes possible with `Game(edition=...)`.
+"""
+import copy
+import json
+import math
+import statistics
+from collections import Counter
+from contextlib import redirect_stdout
+from os import devnull
+from typing import Dict, List, Optional, Sequence
+
+import editions
+from event_log import EventLog, record_game
+from exceptions import InvalidEdition
+from monopoly import (
+    BANK_SEAT,
+    BANKRUPT,
+    BUILD,
+    BUY,
+    CARD,
+    LANGUAGE,
+    MAX_ROUNDS,
+    MORTGAGE,
+    MOVE,
+    RENT,
+    ROLL,
+    TRANSFER,
+    TURN,
+    Board,
+)
+
+MIN_ESS_FRACTION = 0.5
+HOTEL_LEVEL = 5
+# what the variants may change; everything else must be as it was in the logged games
+VARIABLE_FIELDS = ("rent", "cost", "amount")
+# the cash a buy decision algorithm needs to buy a property, as a multiple of its price, for
+# the algorithms that decide on nothing else a variant changes
+CASH_MULTIPLES = {
+    "BuyEverything": 1,
+    "BuyIfHaveThreeTimesPrice": 3,
+    "BuyIfDontHaveTwoPartialMonopoliesOfOtherColors": 1,
+    "BuyIfOwnFewerThanFivePropertiesOrHaveOneOfThisColor": 1,
+    "BuyIfNoOneOwnsTypeAndIsOfTheOneTypeOwned": 1,
+}
+OUTCOMES = ("rent", "tax", "purchases")
+
+
+def get_space_indexes(spaces: List[dict]) -> Dict[str, int]:
+    """
+    name -> index, the spaces without a name going by their type
+    """
+    indexes = {}
+    for index, space in enumerate(spaces):
+        name = space.get("name")
+        if name:
+            indexes[name.get(LANGUAGE) or next(iter(name.values()))] = index
+        else:
+            indexes.setdefault(space["type"], index)
+    return indexes
+
+
+def make_variant(edition=None, rents=None, costs=None, taxes=None) -> dict:
+    """
+    a copy of `edition` (by default the board in use) with some spaces, given by name or index,
+    changed: `rents` maps them to a factor to scale their rents by or to a whole rent table,
+    `costs` to their price and `taxes` to the tax's amount
+    """
+    edition = edition or Board.edition
+    data = copy.deepcopy(editions.load(edition))
+    spaces = data["spaces"]
+    indexes = get_space_indexes(spaces)
+    for changes, field in ((rents, "rent"), (costs, "cost"), (taxes, "amount")):
+        for name, value in (changes or {}).items():
+            index = name if isinstance(name, int) else indexes.get(name)
+            if index is None or field not in spaces[index]:
+                raise InvalidEdition(f"{name!r} has no {field}")
+            space = spaces[index]
+            if field == "rent" and not isinstance(value, dict):
+                value = {
+                    key: round(rent * value) for key, rent in space["rent"].items()
+                }
+            space[field] = value
+    editions.validate(data)
+    data["name"] = f"a variant of {data.get('name', edition)}"
+    data["base"] = edition
+    return data
+
+
+def save_variant(variant: dict, name: str):
+    """
+    writes the variant among the editions, so that games can be played on it
+    """
+    with open(editions.get_path(name), "w") as f:
+        json.dump(variant, f, ensure_ascii=False)
+
+
+def record_games(
+    seeds: Sequence[int],
+    num_players: int,
+    buy_decision_algorithm,
+    max_rounds=MAX_ROUNDS,
+    edition=editions.DEFAULT_EDITION,
+) -> List[EventLog]:
+    logs = []
+    with open(devnull, "w") as null, redirect_stdout(null):
+        for seed in seeds:
+            _, log = record_game(
+                seed, num_players, buy_decision_algorithm, max_rounds, edition
+            )
+            logs.append(log)
+    return logs
+
+
+def logistic(x: float) -> float:
+    return 1 / (1 + math.exp(-max(-50.0, min(50.0, x))))
+
+
+class Trajectory:
+    """
+    a logged game replayed with a variant's cash flows; `outcomes` and `variant_outcomes` are
+    what happened to the money in the game and what would have with the variant, as far as
+    the game got before it diverged
+    """
+
+    def __init__(self, seed, weight: float, outcomes: dict, variant_outcomes: dict):
+        self.seed = seed
+        self.weight = weight
+        self.outcomes = outcomes
+        self.variant_outcomes = variant_outcomes
+        # (turn, why) of the first decision the variant would have made differently
+        self.divergence: Optional[tuple] = None
+
+    def __repr__(self):
+        diverged = f" diverged at turn {self.divergence[0]}" if self.divergence else ""
+        return (
+            f"<{self.__class__.__name__} seed={self.seed} weight={self.weight:.3g}"
+            f"{diverged}>"
+        )
+
+
+class Divergence(Exception):
+    pass
+
+
+class VariantReplay:
+    """
+    replays logged games, played on the variant's base edition, with the variant's cash flows
+    """
+
+    def __init__(self, variant: dict, temperature=0.0):
+        self.base = variant.get("base") or Board.edition
+        self.spaces = editions.load(self.base)["spaces"]
+        self.variant = variant["spaces"]
+        if len(self.variant) != len(self.spaces):
+            raise InvalidEdition("a variant must have the same spaces as its edition")
+        for index, (space, changed) in enumerate(zip(self.spaces, self.variant)):
+            for field in set(space) | set(changed):
+                if field not in VARIABLE_FIELDS and space.get(field) != changed.get(
+                    field
+                ):
+                    raise InvalidEdition(
+                        f"space {index}: a variant can't change {field}"
+                    )
+        self.temperature = temperature
+        # space -> the spaces of its group: its color, or all the railroads or utilities
+        groups = {}
+        for index, space in enumerate(self.spaces):
+            if space["type"] in editions.PROPERTY_KINDS:
+                groups.setdefault(space.get("color", space["type"]), []).append(index)
+        self.groups = {index: group for group in groups.values() for index in group}
+
+    def get_rent_key(self, space: int, owners: dict, levels: dict) -> str:
+        owner = owners[space]
+        owned = sum(owners.get(index) == owner for index in self.groups[space])
+        if self.spaces[space]["type"] != "BuildableProperty":
+            return str(owned)
+        level = levels.get(space, 0)
+        if level == HOTEL_LEVEL:
+            return "hotel"
+        if level:
+            return str(level)
+        return "monopoly" if owned == len(self.groups[space]) else "0"
+
+    def get_rent(self, space: int, amount: int, roll, owners, levels) -> int:
+        """
+        the variant's rent for what the logged game charged `amount` for
+        """
+        key = self.get_rent_key(space, owners, levels)
+        rent, variant_rent = self.spaces[space]["rent"], self.variant[space]["rent"]
+        if self.spaces[space]["type"] == "Utility":
+            if roll is not None and rent[key] * roll == amount:
+                return variant_rent[key] * roll
+            # sent there by a card, and charged on a roll of its own, not by the table
+            if rent == variant_rent:
+                return amount
+        elif rent[key] == amount:
+            return variant_rent[key]
+        raise Divergence("couldn't tell how a rent was worked out")
+
+    def weigh_purchase(
+        self, multiple, bought, money, variant_money, cost, variant_cost
+    ):
+        """
+        how much likelier the variant was to make the logged decision; 0 if it wouldn't have
+        """
+        if multiple is None:
+            return float(money == variant_money and cost == variant_cost)
+        threshold, variant_threshold = multiple * cost, multiple * variant_cost
+        if not bought and money >= threshold:
+            # turned down for something other than the cash, which the variant doesn't change
+            return 1.0
+        if not self.temperature:
+            return float((variant_money >= variant_threshold) == bought)
+        p = logistic((money - threshold) / self.temperature)
+        q = logistic((variant_money - variant_threshold) / self.temperature)
+        return q / p if bought else (1 - q) / (1 - p)
+
+    def check_build_phase(self, seat, money, variant_money, owners, levels, mortgaged):
+        """
+        the player stopped building; the variant's cash mustn't have been enough to go on, or to
+        pay off a mortgage the player couldn't
+        """
+        for index in mortgaged:
+            if (
+                owners.get(index) == seat
+                and money < self.spaces[index]["unmortgage_cost"]
+                and self.variant[index]["unmortgage_cost"] <= variant_money
+            ):
+                raise Divergence("a player could have paid off a mortgage")
+        checked = set()
+        for space, group in self.groups.items():
+            if (
+                self.spaces[space]["type"] != "BuildableProperty"
+                or group[0] in checked
+                or any(owners.get(index) != seat for index in group)
+            ):
+                continue
+            checked.add(group[0])
+            if any(index in mortgaged for index in group) or all(
+                levels.get(index, 0) == HOTEL_LEVEL for index in group
+            ):
+                continue
+            cost = self.spaces[space]["house_and_hotel_cost"]
+            if money < cost <= variant_money:
+                raise Divergence("a player could have built more")
+
+    def evaluate(self, log: EventLog) -> Trajectory:
+        metadata = log.metadata
+        # logs from before editions were recorded were played on the default one
+        edition = metadata.get("edition", editions.DEFAULT_EDITION)
+        if edition != self.base:
+            raise InvalidEdition(
+                f"game {metadata.get('seed')} was played on {edition}, "
+                f"not on the variant's base, {self.base}"
+            )
+        num_players = metadata["num_players"]
+        multiple = CASH_MULTIPLES.get(metadata.get("buy_decision_algorithm"))
+        events = list(log)
+        money, delta = [0] * num_players, [0] * num_players
+        owners, levels, mortgaged = {}, {}, set()
+        # seat -> what they just rolled, if they haven't drawn a card since
+        rolls = {}
+        # seat -> (payee, logged amount, variant's amount, whether it's a purchase) of the
+        # payment the player has to make next
+        payments = {}
+        building = None
+        outcomes, variant_outcomes = Counter(), Counter()
+        trajectory = Trajectory(metadata.get("seed"), 1.0, outcomes, variant_outcomes)
+        turn = 0
+        # once the game has diverged the rest of it is only replayed for its own outcomes, so
+        # every event updates the logged game before the variant can diverge from it
+        for index, (event, seat, a, b) in enumerate(events):
+            try:
+                if event == TURN:
+                    turn += 1
+                    building = seat
+                elif event == ROLL:
+                    rolls[seat] = a
+                    if building == seat:
+                        building = None
+                        self.check_build_phase(
+                            seat,
+                            money[seat],
+                            money[seat] + delta[seat],
+                            owners,
+                            levels,
+                            mortgaged,
+                        )
+                elif event == CARD:
+                    rolls.pop(seat, None)
+                elif event == MOVE:
+                    space = self.spaces[a]
+                    if space["type"] in editions.TAX_KINDS:
+                        payments[seat] = (
+                            BANK_SEAT,
+                            space["amount"],
+                            self.variant[a]["amount"],
+                            False,
+                        )
+                    elif space["type"] in editions.PROPERTY_KINDS and a not in owners:
+                        bought = (
+                            index + 2 < len(events)
+                            and events[index + 1][:2] == (TRANSFER, seat)
+                            and events[index + 2][:3] == (BUY, seat, a)
+                        )
+                        cost, variant_cost = space["cost"], self.variant[a]["cost"]
+                        if bought:
+                            payments[seat] = (BANK_SEAT, cost, variant_cost, True)
+                        trajectory.weight *= self.weigh_purchase(
+                            multiple,
+                            bought,
+                            money[seat],
+                            money[seat] + delta[seat],
+                            cost,
+                            variant_cost,
+                        )
+                        if not trajectory.weight:
+                            raise Divergence("a purchase would have gone the other way")
+                elif event == RENT:
+                    outcomes["rent"] += b
+                    rent = self.get_rent(a, b, rolls.get(seat), owners, levels)
+                    payments[seat] = (owners[a], b, rent, False)
+                    variant_outcomes["rent"] += rent
+                elif event == TRANSFER:
+                    amount = b
+                    affordable = True
+                    if seat != BANK_SEAT:
+                        payment = payments.get(seat)
+                        purchase = False
+                        if payment is not None and payment[:2] == (a, b):
+                            _, _, amount, purchase = payments.pop(seat)
+                            name = "purchases" if purchase else "tax"
+                            if purchase or a == BANK_SEAT:
+                                outcomes[name] += b
+                                variant_outcomes[name] += amount
+                        affordable = purchase or money[seat] + delta[seat] >= amount
+                        money[seat] -= b
+                        delta[seat] -= amount - b
+                    if a != BANK_SEAT:
+                        money[a] += b
+                        delta[a] += amount - b
+                    if not affordable:
+                        raise Divergence("a player would have had to raise funds")
+                elif event == BUY:
+                    owners[a] = seat
+                elif event in (BUILD, MORTGAGE, BANKRUPT):
+                    raising_funds = (
+                        event == BANKRUPT
+                        or (event == BUILD and b < levels.get(a, 0))
+                        or (event == MORTGAGE and b)
+                    )
+                    payment = payments.get(seat)
+                    if event == BUILD:
+                        levels[a] = b
+                    elif event == MORTGAGE:
+                        (mortgaged.add if b else mortgaged.discard)(a)
+                        if not b:
+                            # the transfer paying it off was logged at the logged price
+                            delta[seat] -= (
+                                self.variant[a]["unmortgage_cost"]
+                                - self.spaces[a]["unmortgage_cost"]
+                            )
+                            if money[seat] + delta[seat] < 0:
+                                raise Divergence(
+                                    "a player couldn't have paid off a mortgage"
+                                )
+                    else:
+                        payments.pop(seat, None)
+                    if raising_funds and (
+                        delta[seat] or (payment and payment[1] != payment[2])
+                    ):
+                        raise Divergence("a player would have raised funds differently")
+            except Divergence as e:
+                if trajectory.divergence is None:
+                    trajectory.divergence = (turn, str(e))
+                    trajectory.weight = 0.0
+        for seat in range(num_players):
+            outcomes[f"money_{seat}"] = money[seat]
+            variant_outcomes[f"money_{seat}"] = money[seat] + delta[seat]
+        return trajectory
+
+
+class Report:
+    """
+    the variant's estimates from the weighted trajectories of the logged games
+    """
+
+    def __init__(
+        self, trajectories: List[Trajectory], min_ess_fraction=MIN_ESS_FRACTION
+    ):
+        self.trajectories = trajectories
+        self.min_ess_fraction = min_ess_fraction
+
+    @property
+    def effective_sample_size(self) -> float:
+        weights = [trajectory.weight for trajectory in self.trajectories]
+        squares = sum(weight * weight for weight in weights)
+        return sum(weights) ** 2 / squares if squares else 0.0
+
+    @property
+    def needs_resimulation(self) -> bool:
+        return self.effective_sample_size < self.min_ess_fraction * len(
+            self.trajectories
+        )
+
+    def get_estimates(self) -> Dict[str, tuple]:
+        """
+        outcome -> (its mean in the logged games, the variant's estimate, the weighted mean of
+        the difference the variant made to the games that kept some weight)
+        """
+        total_weight = sum(trajectory.weight for trajectory in self.trajectories)
+        names = {
+            name for trajectory in self.trajectories for name in trajectory.outcomes
+        }
+        names = [name for name in OUTCOMES if name in names] + sorted(
+            names.difference(OUTCOMES)
+        )
+        estimates = {}
+        for name in names:
+            logged = statistics.fmean(t.outcomes[name] for t in self.trajectories)
+            difference = math.nan
+            if total_weight:
+                difference = (
+                    sum(
+                        t.weight * (t.variant_outcomes[name] - t.outcomes[name])
+                        for t in self.trajectories
+                    )
+                    / total_weight
+                )
+            estimates[name] = (logged, logged + difference, difference)
+        return estimates
+
+    def get_divergences(self) -> Counter:
+        """
+        why the games diverged -> how many did
+        """
+        return Counter(
+            trajectory.divergence[1]
+            for trajectory in self.trajectories
+            if trajectory.divergence
+        )
+
+    def print_summary(self):
+        num_games = len(self.trajectories)
+        print(
+            f"{num_games} games, effective sample size {self.effective_sample_size:.1f} "
+            f"({self.effective_sample_size / num_games:.0%})"
+        )
+        if self.needs_resimulation:
+            print("  too few games are still valid: play the variant instead")
+        for name, (logged, variant, difference) in self.get_estimates().items():
+            print(
+                f"  {name}: {logged:.1f} -> {variant:.1f} ({difference:+.1f} per game)"
+            )
+        for reason, count in self.get_divergences().most_common():
+            print(f"  diverged {count} times: {reason}")
+
+
+def reweight(
+    logs: Sequence[EventLog],
+    variant: dict,
+    temperature=0.0,
+    min_ess_fraction=MIN_ESS_FRACTION,
+) -> Report:
+    replay = VariantReplay(variant, temperature)
+    return Report([replay.evaluate(log) for log in logs], min_ess_fraction)
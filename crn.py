@@ -0,0 +1,205 @@
+"""
+Compare buy decision algorithms with common random numbers: every algorithm plays every seed
+with the same dice and the same cards, so that the difference between their results is down to
+the algorithms rather than to luck, and far fewer games tell them apart.
+
+Keeping the games in step takes more than seeding `random` the same way: as soon as two
+algorithms make a different decision, the games go different ways and everything drawn from a
+shared stream afterwards goes to different players. So every seat gets its own stream of dice
+(`SeatDice`): a player's tenth roll is the same whatever the algorithm did before it. The decks
+are shuffled from `random`, seeded with the game's seed, before the game starts.
+
+With `antithetic`, every seed is also played with every die turned upside down (7 minus it),
+and each seed's unit is the mean of the pair, which cancels out some more of the luck.
+
+The variance reduction is the variance the difference would have with independent games (the
+variance of one algorithm's results plus the other's) over the variance actually seen, per game:
+that many times fewer games give the same confidence interval.
+"""
+import math
+import random
+import statistics
+from collections import defaultdict
+from contextlib import redirect_stdout
+from os import devnull
+from typing import Dict, List, Sequence
+
+from monopoly import Game, MAX_ROUNDS
+from simulate import get_results
+
+Z_95 = 1.96
+
+
+class SeatDice:
+    """
+    dice for `Game(dice=...)`: a stream per seat, and one for rolls that aren't anyone's turn
+    """
+
+    def __init__(self, seed: int, antithetic=False):
+        self.seed = seed
+        self.antithetic = antithetic
+        self.streams: Dict[object, random.Random] = {}
+
+    def __call__(self, seat=None):
+        stream = self.streams.get(seat)
+        if stream is None:
+            stream = self.streams[seat] = random.Random(f"{self.seed}:{seat}")
+        die_one, die_two = stream.randint(1, 6), stream.randint(1, 6)
+        if self.antithetic:
+            return 7 - die_one, 7 - die_two
+        return die_one, die_two
+
+
+def play(
+    buy_decision_algorithm,
+    num_players: int,
+    seed: int,
+    attrs_to_get,
+    max_rounds=MAX_ROUNDS,
+    antithetic=False,
+) -> Dict[str, float]:
+    seats = None
+    if not isinstance(buy_decision_algorithm, type):
+        seats = [buy_decision_algorithm] * num_players
+        buy_decision_algorithm = type(buy_decision_algorithm)
+    random.seed(seed)
+    game = Game(
+        num_players,
+        buy_decision_algorithm,
+        seats=seats,
+        max_rounds=max_rounds,
+        dice=SeatDice(seed, antithetic),
+    )
+    results = defaultdict(list)
+    get_results(results, game, attrs_to_get)
+    game.end()
+    return {attr: values[0] for attr, values in results.items()}
+
+
+class Comparison:
+    """
+    the paired differences of an algorithm's results from the baseline's, one per unit (a seed,
+    or a seed and its antithetic twin); `baseline` and `other` have the games of every unit
+    """
+
+    def __init__(self, name, baseline_name, attr, baseline, other):
+        self.name = name
+        self.baseline_name = baseline_name
+        self.attr = attr
+        self.games_per_unit = len(baseline[0])
+        self.differences = [
+            statistics.mean(b) - statistics.mean(a) for a, b in zip(baseline, other)
+        ]
+        self.num_units = len(self.differences)
+        self.mean = statistics.mean(self.differences)
+        self.variance = statistics.variance(self.differences)
+        self.half_width = Z_95 * math.sqrt(self.variance / self.num_units)
+        # the variance of the difference between two independent games, against the variance
+        # here for as many games
+        self.independent_variance = statistics.variance(
+            [game for unit in baseline for game in unit]
+        ) + statistics.variance([game for unit in other for game in unit])
+        paired_variance = self.variance * self.games_per_unit
+        self.variance_reduction = (
+            self.independent_variance / paired_variance if paired_variance else math.inf
+        )
+
+    def __str__(self):
+        return (
+            f"{self.name} - {self.baseline_name}, {self.attr}: "
+            f"{self.mean:+.3f} ± {self.half_width:.3f} (95%, {self.num_units} seeds), "
+            f"variance reduction {self.variance_reduction:.1f}x, "
+            f"so {1 / self.variance_reduction:.0%} of the games"
+        )
+
+
+def play_units(
+    buy_decision_algorithms: Sequence,
+    num_players: int,
+    num_games: int,
+    seed=0,
+    attrs_to_get=("get_rounds_played_per_player",),
+    max_rounds=MAX_ROUNDS,
+    antithetic=False,
+) -> List[Dict[str, List[List[float]]]]:
+    """
+    plays every algorithm on the same `num_games` seeds (and their antithetic twins); per
+    algorithm, attribute -> the results of the games of every unit
+    """
+    if num_games < 2:
+        raise ValueError(
+            "comparing algorithms takes at least 2 games, for the variance of the differences"
+        )
+    games_per_unit = 2 if antithetic else 1
+    results = [defaultdict(list) for _ in buy_decision_algorithms]
+    with open(devnull, "w") as null, redirect_stdout(null):
+        for game_index in range(num_games):
+            game_seed = seed * 1_000_003 + game_index
+            for algorithm_results, algorithm in zip(results, buy_decision_algorithms):
+                games = [
+                    play(
+                        algorithm,
+                        num_players,
+                        game_seed,
+                        attrs_to_get,
+                        max_rounds,
+                        antithetic=flipped,
+                    )
+                    for flipped in (False, True)[:games_per_unit]
+                ]
+                for attr in attrs_to_get:
+                    algorithm_results[attr].append([game[attr] for game in games])
+    return results
+
+
+def get_comparisons(
+    buy_decision_algorithms: Sequence, results, attrs_to_get
+) -> List[Comparison]:
+    """
+    the differences of every algorithm from the first, from `play_units`' results
+    """
+    baseline = buy_decision_algorithms[0]
+    return [
+        Comparison(
+            get_name(algorithm),
+            get_name(baseline),
+            attr,
+            results[0][attr],
+            algorithm_results[attr],
+        )
+        for algorithm, algorithm_results in zip(
+            buy_decision_algorithms[1:], results[1:]
+        )
+        for attr in attrs_to_get
+    ]
+
+
+def compare_algorithms(
+    buy_decision_algorithms: Sequence,
+    num_players: int,
+    num_games: int,
+    seed=0,
+    attrs_to_get=("get_rounds_played_per_player",),
+    max_rounds=MAX_ROUNDS,
+    antithetic=False,
+) -> List[Comparison]:
+    """
+    plays every algorithm on the same `num_games` seeds (and their antithetic twins); the
+    differences of every algorithm from the first
+    """
+    results = play_units(
+        buy_decision_algorithms,
+        num_players,
+        num_games,
+        seed,
+        attrs_to_get,
+        max_rounds,
+        antithetic,
+    )
+    return get_comparisons(buy_decision_algorithms, results, attrs_to_get)
+
+
+def get_name(buy_decision_algorithm) -> str:
+    if isinstance(buy_decision_algorithm, type):
+        return buy_decision_algorithm.__name__
+    return repr(buy_decision_algorithm)
@@ -0,0 +1,260 @@
+"""
+Check that a faster way of playing games plays them the way `Game` does.
+
+An engine that can play the same game as `Game`, given the same seed, is compared with it event
+by event (see the events in monopoly/core.py): `find_divergences` plays both on every seed and
+reports the first event where each game went differently, and `shrink` cuts a diverging case
+down to the fewest players and rounds that still diverge, which is usually a few turns to read
+through.
+
+    divergences = find_divergences(with_options(hashing=True), BuyEverything, range(200))
+    for divergence in divergences[:1]:
+        print(shrink(with_options(hashing=True), divergence.case))
+
+An engine is called like `play_reference`: with a seed, the number of players, the buy decision
+algorithm, the round limit and a recorder for its events; it returns the number of rounds.
+
+An engine that can't play the same games, like the batched engine with its NumPy dice, is
+compared on the distributions of its outcomes instead (`compare_distributions`): a two-sample
+Kolmogorov-Smirnov test and a test of the difference between the means, for each outcome.
+"""
+import math
+import random
+import statistics
+from contextlib import redirect_stdout
+from functools import partial
+from os import devnull
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+from event_log import EVENT_NAMES
+from monopoly import CARD, CARDS, TURN, Game, MAX_ROUNDS
+
+MIN_PLAYERS = 2
+ALPHA = 0.001
+
+
+class Case(NamedTuple):
+    seed: int
+    num_players: int
+    buy_decision_algorithm: type
+    max_rounds: int
+
+
+def play_reference(
+    seed, num_players, buy_decision_algorithm, max_rounds, recorder, **game_kwargs
+) -> int:
+    random.seed(seed)
+    game = Game(
+        num_players,
+        buy_decision_algorithm,
+        max_rounds=max_rounds,
+        recorder=recorder,
+        **game_kwargs,
+    )
+    rounds = game.rounds
+    game.end()
+    return rounds
+
+
+def with_options(**game_kwargs):
+    """
+    `Game` with some of its options, e.g. `hashing` or `counters`, which mustn't change the game
+    """
+    return partial(play_reference, **game_kwargs)
+
+
+def get_events(engine, case: Case) -> List[tuple]:
+    events = []
+    with open(devnull, "w") as null, redirect_stdout(null):
+        engine(*case, lambda *event: events.append(event))
+    return events
+
+
+def describe(event: Optional[tuple]) -> str:
+    if event is None:
+        return "the end of the game"
+    kind, seat, a, b = event
+    if kind == CARD:
+        return f"seat {seat} {EVENT_NAMES[kind]} {CARDS[a].__name__}"
+    return f"seat {seat} {EVENT_NAMES[kind]} {a} {b}"
+
+
+class Divergence:
+    """
+    the first event where the engine's game wasn't the reference's
+    """
+
+    def __init__(self, case: Case, index: int, turn: int, expected, got):
+        self.case = case
+        self.index = index
+        self.turn = turn
+        self.expected = expected
+        self.got = got
+
+    def __repr__(self):
+        return (
+            f"<{self.__class__.__name__} seed={self.case.seed} "
+            f"num_players={self.case.num_players} max_rounds={self.case.max_rounds} "
+            f"event {self.index} (turn {self.turn}): expected {describe(self.expected)}, "
+            f"got {describe(self.got)}>"
+        )
+
+
+def compare(engine, case: Case, reference=play_reference) -> Optional[Divergence]:
+    expected_events = get_events(reference, case)
+    events = get_events(engine, case)
+    turn = 0
+    for index in range(max(len(expected_events), len(events))):
+        expected = expected_events[index] if index < len(expected_events) else None
+        got = events[index] if index < len(events) else None
+        if expected != got:
+            return Divergence(case, index, turn, expected, got)
+        # turns are counted from their first event (see `Game.turns`)
+        turn += expected[0] == TURN
+    return None
+
+
+def find_divergences(
+    engine,
+    buy_decision_algorithm,
+    seeds: Sequence[int],
+    num_players=4,
+    max_rounds=MAX_ROUNDS,
+    reference=play_reference,
+) -> List[Divergence]:
+    divergences = []
+    for seed in seeds:
+        case = Case(seed, num_players, buy_decision_algorithm, max_rounds)
+        divergence = compare(engine, case, reference)
+        if divergence is not None:
+            divergences.append(divergence)
+    return divergences
+
+
+def shrink(engine, case: Case, reference=play_reference) -> Divergence:
+    """
+    the diverging case with the fewest players, then the fewest rounds, that still diverges
+    """
+    divergence = compare(engine, case, reference)
+    if divergence is None:
+        raise ValueError(f"{case} doesn't diverge")
+    for num_players in range(MIN_PLAYERS, case.num_players):
+        smaller = compare(engine, case._replace(num_players=num_players), reference)
+        if smaller is not None:
+            divergence = smaller
+            break
+    # once a game has diverged it stays diverged, so the rounds are bisected
+    low, high = 0, divergence.case.max_rounds
+    while high - low > 1:
+        middle = (low + high) // 2
+        smaller = compare(
+            engine, divergence.case._replace(max_rounds=middle), reference
+        )
+        if smaller is None:
+            low = middle
+        else:
+            high, divergence = middle, smaller
+    return divergence
+
+
+def ks_test(a: Sequence[float], b: Sequence[float]) -> tuple:
+    """
+    the two-sample Kolmogorov-Smirnov statistic and its asymptotic p-value
+    """
+    a, b = sorted(a), sorted(b)
+    n, m = len(a), len(b)
+    i = j = 0
+    statistic = 0.0
+    while i < n and j < m:
+        value = min(a[i], b[j])
+        while i < n and a[i] == value:
+            i += 1
+        while j < m and b[j] == value:
+            j += 1
+        statistic = max(statistic, abs(i / n - j / m))
+    effective = math.sqrt(n * m / (n + m))
+    lambda_ = (effective + 0.12 + 0.11 / effective) * statistic
+    if lambda_ < 0.2:
+        return statistic, 1.0
+    p_value = 2 * sum(
+        (-1) ** (k - 1) * math.exp(-2 * k * k * lambda_ * lambda_)
+        for k in range(1, 101)
+    )
+    return statistic, min(1.0, max(0.0, p_value))
+
+
+class DistributionCheck:
+    def __init__(self, outcome, expected: Sequence[float], got: Sequence[float], alpha):
+        self.outcome = outcome
+        self.alpha = alpha
+        self.ks_statistic, self.ks_p_value = ks_test(expected, got)
+        self.expected_mean = statistics.fmean(expected)
+        self.mean = statistics.fmean(got)
+        self.standard_error = math.sqrt(
+            statistics.variance(expected) / len(expected)
+            + statistics.variance(got) / len(got)
+        )
+        self.z = (
+            (self.mean - self.expected_mean) / self.standard_error
+            if self.standard_error
+            else 0.0
+        )
+
+    @property
+    def passed(self) -> bool:
+        z_critical = statistics.NormalDist().inv_cdf(1 - self.alpha / 2)
+        return self.ks_p_value >= self.alpha and abs(self.z) < z_critical
+
+    def __str__(self):
+        return (
+            f"{self.outcome}: {'ok' if self.passed else 'DIFFERENT'}, KS "
+            f"{self.ks_statistic:.3f} (p={self.ks_p_value:.3g}), mean {self.mean:.2f} "
+            f"against {self.expected_mean:.2f} (z={self.z:+.2f})"
+        )
+
+
+def compare_distributions(
+    expected: Dict[str, Sequence[float]],
+    got: Dict[str, Sequence[float]],
+    alpha=ALPHA,
+) -> List[DistributionCheck]:
+    """
+    outcome -> the values of every game, from the reference and from the engine
+    """
+    return [
+        DistributionCheck(outcome, values, got[outcome], alpha)
+        for outcome, values in expected.items()
+    ]
+
+
+def sample_reference(
+    buy_decision_algorithm, seeds: Sequence[int], num_players=4, max_rounds=MAX_ROUNDS
+) -> Dict[str, List[float]]:
+    """
+    the outcomes the batched engine has too, for every seed
+    """
+    outcomes = {"rounds": [], "bankruptcies": []}
+    with open(devnull, "w") as null, redirect_stdout(null):
+        for seed in seeds:
+            random.seed(seed)
+            game = Game(num_players, buy_decision_algorithm, max_rounds=max_rounds)
+            outcomes["rounds"].append(game.rounds)
+            outcomes["bankruptcies"].append(
+                sum(player.bankrupt for player in game._players)
+            )
+            game.end()
+    return outcomes
+
+
+def sample_batched(
+    buy_decision_algorithm, num_games, num_players=4, max_rounds=MAX_ROUNDS, seed=0
+) -> Dict[str, List[float]]:
+    from batched_engine import BatchedGames
+
+    games = BatchedGames(
+        num_games, num_players, buy_decision_algorithm, max_rounds=max_rounds, seed=seed
+    ).run()
+    return {
+        "rounds": games.rounds.tolist(),
+        "bankruptcies": games.bankrupt.sum(axis=1).tolist(),
+    }
@@ -0,0 +1,301 @@
+"""
+Boards and decks as data, so that other editions and house rules don't need code.
+
+An edition is a JSON file in editions/: the spaces in order (each with its type and, for
+properties and taxes, its prices) and the cards in each deck. `load` reads and validates one;
+the engine builds the board's objects from it (see `Board.use_edition` in monopoly/core.py).
+Once validated, an edition is cached with `marshal` in editions/.cache, under the checksum of its
+JSON, so that importing the engine doesn't have to import `json` (and `re`) to parse it again.
+
+`compile` turns an edition into a compact binary form for code that doesn't want objects at all:
+a table of ints with a row per space (kind, group, prices, rent by level) and a movement table
+giving, for every kind of space and every space, the index of the next space of that kind. The
+compiled file is cached in editions/.cache under a hash of the edition's JSON and read with
+`mmap`, so loading a compiled edition costs a page mapping and switching between loaded ones
+costs a dictionary lookup.
+"""
+from __future__ import annotations
+
+import marshal
+import os
+import struct
+import zlib
+from functools import lru_cache
+
+from exceptions import InvalidEdition
+
+# typing is only needed by type checkers, and is slow to import
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Dict, List
+
+EDITIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "editions")
+CACHE_DIR = os.path.join(EDITIONS_DIR, ".cache")
+DEFAULT_EDITION = "swiss_fr"
+
+KINDS = (
+    "Go",
+    "BuildableProperty",
+    "Railroad",
+    "Utility",
+    "IncomeTax",
+    "LuxuryTax",
+    "Chance",
+    "CommunityChest",
+    "Jail",
+    "GoToJail",
+    "FreeParking",
+)
+PROPERTY_KINDS = ("BuildableProperty", "Railroad", "Utility")
+TAX_KINDS = ("IncomeTax", "LuxuryTax")
+DECKS = ("ChanceDeck", "CommunityChestDeck")
+PRICES = ("cost", "mortgage_cost", "unmortgage_cost")
+# rent by building level for buildable properties, by number owned for railroads and utilities
+RENT_KEYS = {
+    "BuildableProperty": ("0", "monopoly", "1", "2", "3", "4", "hotel"),
+    "Railroad": ("1", "2", "3", "4"),
+    "Utility": ("1", "2"),
+}
+
+MAGIC = b"MNPLYBRD"
+FORMAT_VERSION = 1
+# of the validated editions `load` caches: bump it when `validate` or the format of an edition
+# changes, so that none of them are served without being validated again
+LOAD_VERSION = 1
+HEADER = struct.Struct("<8s4I")
+COLUMNS = (
+    "kind",
+    "group",
+    "cost",
+    "house_and_hotel_cost",
+    "mortgage_cost",
+    "unmortgage_cost",
+    "amount",
+    # rent: buildable properties by key of RENT_KEYS, the rest by number owned - 1
+    "rent_0",
+    "rent_1",
+    "rent_2",
+    "rent_3",
+    "rent_4",
+    "rent_5",
+    "rent_6",
+)
+COLUMN = {name: index for index, name in enumerate(COLUMNS)}
+RENT_COLUMN = COLUMN["rent_0"]
+
+
+def get_path(name: str) -> str:
+    return os.path.join(EDITIONS_DIR, f"{name}.json")
+
+
+def check(condition, message):
+    if not condition:
+        raise InvalidEdition(message)
+
+
+def validate(data: dict):
+    spaces = data.get("spaces")
+    check(isinstance(spaces, list) and spaces, "an edition needs a list of spaces")
+    check(spaces[0].get("type") == "Go", "the first space must be Go")
+    check(
+        sum(space.get("type") == "Jail" for space in spaces) == 1,
+        "there must be one Jail",
+    )
+    check(len(spaces) < 256, "too many spaces")
+    for index, space in enumerate(spaces):
+        kind = space.get("type")
+        check(kind in KINDS, f"space {index}: unknown type {kind!r}")
+        if kind in TAX_KINDS:
+            check(
+                isinstance(space.get("amount"), int),
+                f"space {index}: a tax needs an amount",
+            )
+        if kind not in PROPERTY_KINDS:
+            continue
+        check(
+            isinstance(space.get("name"), dict),
+            f"space {index}: a property needs a name",
+        )
+        for price in PRICES:
+            check(
+                isinstance(space.get(price), int) and space[price] >= 0,
+                f"space {index}: {price} must be a non-negative int",
+            )
+        rent = space.get("rent")
+        check(
+            isinstance(rent, dict) and tuple(rent) == RENT_KEYS[kind],
+            f"space {index}: rent needs the keys {', '.join(RENT_KEYS[kind])} in order",
+        )
+        check(
+            all(isinstance(v, int) and v >= 0 for v in rent.values()),
+            f"space {index}: rents must be non-negative ints",
+        )
+        if kind == "BuildableProperty":
+            check(isinstance(space.get("color"), str), f"space {index}: needs a color")
+            check(
+                isinstance(space.get("house_and_hotel_cost"), int),
+                f"space {index}: needs a house_and_hotel_cost",
+            )
+    decks = data.get("decks", {})
+    for deck in DECKS:
+        cards = decks.get(deck)
+        check(
+            isinstance(cards, list)
+            and cards
+            and all(isinstance(c, str) for c in cards),
+            f"{deck} needs a list of cards",
+        )
+
+
+@lru_cache(maxsize=None)
+def load_json(name: str) -> bytes:
+    try:
+        with open(get_path(name), "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        raise InvalidEdition(f"no such edition: {name}")
+
+
+def get_tmp_path(path: str) -> str:
+    import threading
+
+    # lru_cache doesn't keep two threads from writing the same cache file at once
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+@lru_cache(maxsize=None)
+def load(name: str = DEFAULT_EDITION) -> dict:
+    source = load_json(name)
+    path = os.path.join(
+        CACHE_DIR, f"{name}-{LOAD_VERSION}-{zlib.crc32(source):08x}.marshal"
+    )
+    try:
+        with open(path, "rb") as f:
+            return marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+    import json
+
+    try:
+        data = json.loads(source)
+    except json.JSONDecodeError as e:
+        raise InvalidEdition(f"{name}: {e}")
+    validate(data)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(get_tmp_path(path), "wb") as f:
+            marshal.dump(data, f)
+        os.replace(f.name, path)
+    except OSError:
+        # a read-only install: loaded from the JSON every time
+        pass
+    return data
+
+
+def get_groups(spaces: List[dict]) -> Dict[str, int]:
+    """
+    color groups in the order they first appear, then railroads and utilities
+    """
+    groups = {}
+    for space in spaces:
+        if space["type"] == "BuildableProperty":
+            groups.setdefault(space["color"], len(groups))
+    for space in spaces:
+        if space["type"] in ("Railroad", "Utility"):
+            groups.setdefault(space["type"], len(groups))
+    return groups
+
+
+def compile_edition(data: dict) -> bytes:
+    spaces = data["spaces"]
+    groups = get_groups(spaces)
+    table = []
+    for space in spaces:
+        kind = space["type"]
+        row = [0] * len(COLUMNS)
+        row[COLUMN["kind"]] = KINDS.index(kind)
+        row[COLUMN["group"]] = groups.get(space.get("color", kind), -1)
+        for column in (
+            "cost",
+            "house_and_hotel_cost",
+            "mortgage_cost",
+            "unmortgage_cost",
+            "amount",
+        ):
+            row[COLUMN[column]] = space.get(column, 0)
+        for offset, value in enumerate(space.get("rent", {}).values()):
+            row[RENT_COLUMN + offset] = value
+        table.extend(row)
+
+    num_spaces = len(spaces)
+    next_of_kind = []
+    for kind in KINDS:
+        for index in range(num_spaces):
+            following = [(index + step) % num_spaces for step in range(1, num_spaces)]
+            matches = [i for i in following if spaces[i]["type"] == kind]
+            next_of_kind.append(matches[0] if matches else -1)
+
+    group_sizes = [0] * len(groups)
+    for space in spaces:
+        group = groups.get(space.get("color", space["type"]))
+        if group is not None:
+            group_sizes[group] += 1
+
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, num_spaces, len(KINDS), len(groups))
+    ints = table + next_of_kind + group_sizes
+    return header + struct.pack(f"<{len(ints)}i", *ints)
+
+
+class CompiledBoard:
+    """
+    a compiled edition, mapped from its cache file, or from `data` where the cache couldn't
+    be written: `table` has a row of `COLUMNS` per space
+    """
+
+    def __init__(self, path, data: bytes = None):
+        import mmap
+
+        if data is None:
+            with open(path, "rb") as f:
+                self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self.mmap = data
+        magic, version, self.num_spaces, num_kinds, self.num_groups = (
+            HEADER.unpack_from(self.mmap)
+        )
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise InvalidEdition(f"{path} isn't a compiled edition of this version")
+        ints = memoryview(self.mmap)[HEADER.size :].cast("i")
+        table_size = self.num_spaces * len(COLUMNS)
+        self.table = ints[:table_size]
+        self.next_of_kind_table = ints[
+            table_size : table_size + num_kinds * self.num_spaces
+        ]
+        self.group_sizes = ints[table_size + num_kinds * self.num_spaces :]
+
+    def get(self, space: int, column: str) -> int:
+        return self.table[space * len(COLUMNS) + COLUMN[column]]
+
+    def next_of_kind(self, kind: str, space: int) -> int:
+        return self.next_of_kind_table[KINDS.index(kind) * self.num_spaces + space]
+
+
+@lru_cache(maxsize=None)
+def compiled(name: str = DEFAULT_EDITION) -> CompiledBoard:
+    import hashlib
+
+    source = load_json(name)
+    digest = hashlib.sha256(source + bytes([FORMAT_VERSION])).hexdigest()[:16]
+    path = os.path.join(CACHE_DIR, f"{name}-{digest}.bin")
+    if os.path.exists(path):
+        return CompiledBoard(path)
+    data = compile_edition(load(name))
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(get_tmp_path(path), "wb") as f:
+            f.write(data)
+        os.replace(f.name, path)
+    except OSError:
+        # a read-only install: compiled again by every process
+        return CompiledBoard(path, data)
+    return CompiledBoard(path)
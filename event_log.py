@@ -0,0 +1,218 @@
+"""
+A compact binary record of everything that happens in a game, and a replayer that rebuilds the
+state of the game at any turn from it.
+
+Attach an `EventLog` to a game with `Game(..., recorder=log)`, or use `record_game`. The engine
+reports every turn, roll, move, transfer of money, purchase, rent payment, card, change of
+buildings, mortgage and bankruptcy (see the event constants in monopoly/core.py).
+
+Every event is an 8-byte record: event, seat, one small argument (a space, a seat, a card...)
+and one int (an amount, a level...). Turns aren't stored on every record: a TURN record starts
+each turn. Records are gathered into blocks of `BLOCK_SIZE` and each block is compressed with
+zlib; a typical game takes a few KB.
+
+File layout: MAGIC, the length of the metadata, the metadata as JSON, then per block the number
+of records, the compressed length and the compressed records.
+
+Money only ever moves in TRANSFER records, so the replayer doesn't need the rules: it just
+applies the records in order, which is far faster than playing the game again.
+"""
+import json
+import random
+import struct
+import zlib
+from typing import Dict, Iterator, Optional, Set, Tuple
+
+from editions import DEFAULT_EDITION
+from monopoly import (
+    BANK_SEAT,
+    BANKRUPT,
+    BUILD,
+    BUY,
+    CARD,
+    CARDS,
+    MORTGAGE,
+    MOVE,
+    RENT,
+    ROLL,
+    TRANSFER,
+    TURN,
+    Game,
+    MAX_ROUNDS,
+)
+
+MAGIC = b"MNPLYLOG"
+RECORD = struct.Struct("<BBhi")
+BLOCK_HEADER = struct.Struct("<II")
+LENGTH = struct.Struct("<I")
+BLOCK_SIZE = 4096
+
+EVENT_NAMES = {
+    TURN: "turn",
+    ROLL: "roll",
+    MOVE: "move",
+    TRANSFER: "transfer",
+    BUY: "buy",
+    RENT: "rent",
+    CARD: "card",
+    BUILD: "build",
+    MORTGAGE: "mortgage",
+    BANKRUPT: "bankrupt",
+}
+
+Event = Tuple[int, int, int, int]
+
+
+class EventLog:
+    def __init__(self, metadata: Optional[dict] = None):
+        self.metadata = metadata or {}
+        # (number of records, compressed records)
+        self.blocks = []
+        self.buffer = bytearray()
+        self.buffered = 0
+
+    def __call__(self, event: int, seat: int, a: int = 0, b: int = 0):
+        self.buffer += RECORD.pack(event, seat, a, b)
+        self.buffered += 1
+        if self.buffered == BLOCK_SIZE:
+            self.flush()
+
+    def __len__(self):
+        return sum(count for count, _ in self.blocks) + self.buffered
+
+    def flush(self):
+        if self.buffered:
+            self.blocks.append((self.buffered, zlib.compress(bytes(self.buffer), 6)))
+            self.buffer = bytearray()
+            self.buffered = 0
+
+    def __iter__(self) -> Iterator[Event]:
+        for _, data in self.blocks:
+            yield from RECORD.iter_unpack(zlib.decompress(data))
+        yield from RECORD.iter_unpack(bytes(self.buffer))
+
+    def to_bytes(self) -> bytes:
+        self.flush()
+        metadata = json.dumps(self.metadata).encode()
+        parts = [MAGIC, LENGTH.pack(len(metadata)), metadata]
+        for count, data in self.blocks:
+            parts.append(BLOCK_HEADER.pack(count, len(data)))
+            parts.append(data)
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "EventLog":
+        if not data.startswith(MAGIC):
+            raise ValueError("not an event log")
+        offset = len(MAGIC)
+        (length,) = LENGTH.unpack_from(data, offset)
+        offset += LENGTH.size
+        log = cls(json.loads(data[offset : offset + length]))
+        offset += length
+        while offset < len(data):
+            count, length = BLOCK_HEADER.unpack_from(data, offset)
+            offset += BLOCK_HEADER.size
+            log.blocks.append((count, data[offset : offset + length]))
+            offset += length
+        return log
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path) -> "EventLog":
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+    def describe(self) -> Iterator[str]:
+        """
+        the log as text, one line per event
+        """
+        turn = 0
+        for event, seat, a, b in self:
+            if event == TURN:
+                turn += 1
+            name = EVENT_NAMES[event]
+            if event == CARD:
+                yield f"{turn} {seat} {name} {CARDS[a].__name__}"
+            else:
+                yield f"{turn} {seat} {name} {a} {b}"
+
+
+class ReplayState:
+    def __init__(self, num_players: int):
+        self.turn = 0
+        self.money = [0] * num_players
+        self.positions = [0] * num_players
+        self.owners: Dict[int, int] = {}
+        self.buildings: Dict[int, int] = {}
+        self.mortgaged: Set[int] = set()
+        self.bankrupt: Set[int] = set()
+
+    def __repr__(self):
+        return (
+            f"<ReplayState turn={self.turn} money={self.money} positions={self.positions} "
+            f"bankrupt={sorted(self.bankrupt)}>"
+        )
+
+
+def replay(log: EventLog, turn: Optional[int] = None) -> ReplayState:
+    """
+    the state of the game at the start of `turn` (counting from 1), or at the end
+    """
+    state = ReplayState(log.metadata["num_players"])
+    money, positions = state.money, state.positions
+    for event, seat, a, b in log:
+        if event == TURN:
+            if turn is not None and state.turn + 1 == turn:
+                break
+            state.turn += 1
+        elif event == TRANSFER:
+            if seat != BANK_SEAT:
+                money[seat] -= b
+            if a != BANK_SEAT:
+                money[a] += b
+        elif event == MOVE:
+            positions[seat] = a
+        elif event == BUY:
+            state.owners[a] = seat
+        elif event == BUILD:
+            state.buildings[a] = b
+        elif event == MORTGAGE:
+            if b:
+                state.mortgaged.add(a)
+            else:
+                state.mortgaged.discard(a)
+        elif event == BANKRUPT:
+            state.bankrupt.add(seat)
+    return state
+
+
+def record_game(
+    seed: int,
+    num_players: int,
+    buy_decision_algorithm,
+    max_rounds=MAX_ROUNDS,
+    edition=DEFAULT_EDITION,
+) -> Tuple[Game, EventLog]:
+    log = EventLog(
+        {
+            "seed": seed,
+            "num_players": num_players,
+            "buy_decision_algorithm": buy_decision_algorithm.__name__,
+            "max_rounds": max_rounds,
+            "edition": edition,
+        }
+    )
+    random.seed(seed)
+    game = Game(
+        num_players,
+        buy_decision_algorithm,
+        max_rounds=max_rounds,
+        recorder=log,
+        edition=edition,
+    )
+    game.end()
+    log.flush()
+    return game, log
@@ -36,3 +36,11 @@ class CantMortgage(Exception):
 
 class CantBuyBuildings(Exception):
     pass
+
+
+class InvalidEdition(Exception):
+    pass
+
+
+class WorkerDied(Exception):
+    pass
@@ -0,0 +1,183 @@
+"""
+Raise cash for a player who can't cover a payment, instead of going straight to bankruptcy.
+
+The player's assets are split into independent "items":
+
+- a monopoly (a color group the player owns completely) is one item: you can sell its buildings
+  one level at a time from the top down, and only once they're all gone can you mortgage
+  any subset of its properties
+- every other property is its own item: mortgage it or don't
+
+Each item has a handful of options, each raising some cash at some loss (selling a building
+gets you half its price back, mortgaging costs you the 10% premium to lift it later). Picking
+one option per item so that the cash covers the debt at the smallest loss is a multiple-choice
+knapsack, solved with a small DP over the cash raised (capped at the debt). Solutions are cached
+by the asset configuration and the debt; the cache outlives games, so it's kept small.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from itertools import combinations
+from time import perf_counter
+
+# for type checkers only
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import List, Optional, Tuple
+
+HOTEL_LEVEL = 5
+
+
+class LiquidationStats:
+    """
+    counters for how often the solver runs and how long it takes
+    """
+    runs = 0
+    covered = 0
+    failed = 0
+    seconds = 0.0
+
+    @classmethod
+    def reset(cls):
+        cls.runs = 0
+        cls.covered = 0
+        cls.failed = 0
+        cls.seconds = 0.0
+        solve.cache_clear()
+
+    @classmethod
+    def summary(cls):
+        cache_info = solve.cache_info()
+        return {
+            "runs": cls.runs,
+            "covered": cls.covered,
+            "failed": cls.failed,
+            "seconds": cls.seconds,
+            "mean_microseconds": cls.seconds / cls.runs * 1e6 if cls.runs else 0.0,
+            "cache_hits": cache_info.hits,
+            "cache_misses": cache_info.misses,
+        }
+
+
+def get_group_options(properties) -> List[Tuple[int, Tuple, int, int]]:
+    """
+    options for a monopoly: (levels to sell, properties to mortgage, cash, loss)
+    """
+    level = max(p.building_level for p in properties)
+    building_cost = properties[0].house_and_hotel_cost
+    sell_price = building_cost // 2
+    options = []
+    for levels in range(level + 1):
+        cash, loss = levels * sell_price, levels * (building_cost - sell_price)
+        options.append((levels, (), cash, loss))
+        if levels != level:
+            continue
+        unmortgaged = [p for p in properties if not p.mortgaged]
+        for size in range(1, len(unmortgaged) + 1):
+            for to_mortgage in combinations(unmortgaged, size):
+                options.append(
+                    (
+                        levels,
+                        to_mortgage,
+                        cash + sum(p.mortgage_cost for p in to_mortgage),
+                        loss + sum(p.unmortgage_cost - p.mortgage_cost for p in to_mortgage),
+                    )
+                )
+    return options
+
+
+def get_items(player) -> List[Tuple["Property", List[Tuple[int, Tuple, int, int]]]]:
+    """
+    one (property, options) pair per item; for a monopoly the property is any one of the group
+    """
+    items = []
+    groups_seen = set()
+    for property_ in player.properties:
+        type_ = property_.type
+        if hasattr(property_, "buildings") and player.owns_all_type(type_):
+            if type_ in groups_seen:
+                continue
+            groups_seen.add(type_)
+            items.append((property_, get_group_options(property_.properties_of_type)))
+        elif not property_.mortgaged:
+            items.append(
+                (
+                    property_,
+                    [
+                        (0, (), 0, 0),
+                        (
+                            0,
+                            (property_,),
+                            property_.mortgage_cost,
+                            property_.unmortgage_cost - property_.mortgage_cost,
+                        ),
+                    ],
+                )
+            )
+    return items
+
+
+@lru_cache(maxsize=256)
+def solve(items: Tuple[Tuple[Tuple[int, int], ...], ...], amount: int) -> Optional[Tuple[int, ...]]:
+    """
+    `items` holds a (cash, loss) pair for every option of every item.
+    Returns the index of the option to take for each item, or None if even liquidating
+    everything can't raise `amount`.
+    """
+    # cash raised (capped at `amount`) -> (loss, chosen option indices)
+    best = {0: (0, ())}
+    for options in items:
+        next_best = {}
+        for cash, (loss, choices) in best.items():
+            for index, (option_cash, option_loss) in enumerate(options):
+                new_cash = min(amount, cash + option_cash)
+                new_loss = loss + option_loss
+                current = next_best.get(new_cash)
+                if current is None or new_loss < current[0]:
+                    next_best[new_cash] = (new_loss, choices + (index,))
+        best = next_best
+    if amount not in best:
+        return None
+    return best[amount][1]
+
+
+def sell_levels(property_, levels):
+    num_properties = property_.num_of_type
+    if property_.building_level == HOTEL_LEVEL:
+        property_.sell_buildings("hotel", num_properties)
+        levels -= 1
+    if levels:
+        property_.sell_buildings("house", levels * num_properties)
+
+
+def raise_funds(player, amount: int) -> bool:
+    """
+    sell buildings and mortgage properties so that `player` has at least `amount` in cash,
+    at the smallest loss.  Returns False (without touching anything) if that can't be done.
+    """
+    shortfall = amount - player.money
+    if shortfall <= 0:
+        return True
+    started = perf_counter()
+    LiquidationStats.runs += 1
+    items = get_items(player)
+    choices = solve(
+        tuple(
+            tuple((cash, loss) for _, _, cash, loss in options) for _, options in items
+        ),
+        shortfall,
+    )
+    if choices is None:
+        LiquidationStats.failed += 1
+        LiquidationStats.seconds += perf_counter() - started
+        return False
+
+    for (property_, options), index in zip(items, choices):
+        levels, to_mortgage, _, _ = options[index]
+        if levels:
+            sell_levels(property_, levels)
+        for property_ in to_mortgage:
+            property_.mortgage(player)
+    LiquidationStats.covered += 1
+    LiquidationStats.seconds += perf_counter() - started
+    return True
@@ -0,0 +1,276 @@
+"""
+Live metrics for a running sweep: throughput, the progress of every cell, running means with
+their confidence intervals, the capped-game rate and, with a coordinator, the health of its
+workers.
+
+    metrics = SweepMetrics(snapshot_path="sweep-metrics.json")
+    metrics.serve(9100)  # http://127.0.0.1:9100/metrics, and /metrics.json
+    Sweep("sweep.jsonl", metrics=metrics).run(num_games=10_000, processes=8)
+
+The sweep calls `update` as it records every unit, which is where all of the work is done: the
+metrics are rendered there, in Prometheus' text format and as JSON, and kept as two strings. A
+scrape, from the server's own thread, just sends the latest ones, so it never waits on the sweep
+and the sweep never waits on it. The JSON is also written to `snapshot_path` every
+`snapshot_every` seconds.
+"""
+import json
+import math
+import os
+import threading
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import monotonic, time
+from typing import Dict, List, Optional
+
+from sweep import CAPPED, TURNS, Aggregates, Cell, merge
+
+Z_95 = 1.96
+PREFIX = "monopoly_sweep"
+
+
+def escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def get_labels(**labels) -> str:
+    return ",".join(f'{name}="{escape(value)}"' for name, value in labels.items())
+
+
+class SweepMetrics:
+    def __init__(self, snapshot_path=None, snapshot_every=10.0):
+        self.snapshot_path = snapshot_path
+        self.snapshot_every = snapshot_every
+        self.started = monotonic()
+        self.last_snapshot = self.started
+        self.games = 0
+        self.turns = 0
+        self.capped = 0
+        self.units_done: Dict[Cell, int] = defaultdict(int)
+        self.units_total: Dict[Cell, int] = defaultdict(int)
+        self.aggregates: Dict[Cell, Aggregates] = defaultdict(dict)
+        # set by the coordinator serving the sweep, if there's one
+        self.coordinator = None
+        self.server: Optional[ThreadingHTTPServer] = None
+        self.text = ""
+        self.json = "{}"
+        self.render()
+
+    def start(self, pending: List[tuple], done: Dict[Cell, set]):
+        """
+        the sweep's units still to play, and those it had already played
+        """
+        for cell, units in done.items():
+            self.units_done[cell] = self.units_total[cell] = len(units)
+        for _, algorithm_name, num_players, *_ in pending:
+            self.units_total[(algorithm_name, num_players)] += 1
+        self.render()
+
+    def update(self, cell: Cell, aggregates: Aggregates):
+        self.units_done[cell] += 1
+        self.units_total[cell] = max(self.units_total[cell], self.units_done[cell])
+        if TURNS in aggregates:
+            count, turns, _ = aggregates[TURNS]
+            self.games += int(count)
+            self.turns += int(turns)
+        if CAPPED in aggregates:
+            self.capped += int(aggregates[CAPPED][1])
+        merge(
+            self.aggregates[cell],
+            {
+                attr: values
+                for attr, values in aggregates.items()
+                if not attr.startswith("_")
+            },
+        )
+        self.render()
+        if (
+            self.snapshot_path
+            and monotonic() - self.last_snapshot >= self.snapshot_every
+        ):
+            self.write_snapshot()
+
+    def get_estimates(self, cell: Cell) -> Dict[str, tuple]:
+        """
+        attribute -> (mean, half width of the 95% confidence interval)
+        """
+        estimates = {}
+        for attr, (count, total, total_squared) in self.aggregates[cell].items():
+            mean = total / count
+            variance = (
+                (total_squared - count * mean * mean) / (count - 1)
+                if count > 1
+                else 0.0
+            )
+            estimates[attr] = (mean, Z_95 * math.sqrt(max(0.0, variance) / count))
+        return estimates
+
+    def get_workers(self) -> dict:
+        coordinator = self.coordinator
+        if coordinator is None:
+            return {}
+        return {
+            "connected": len(coordinator.workers),
+            "lost": coordinator.dead_workers,
+            "units_in_flight": len(coordinator.in_flight),
+            "units_stolen": coordinator.stolen,
+            "units_redispatched": coordinator.redispatched,
+        }
+
+    def get_snapshot(self) -> dict:
+        seconds = monotonic() - self.started
+        return {
+            "time": time(),
+            "seconds": seconds,
+            "games": self.games,
+            "turns": self.turns,
+            "capped_games": self.capped,
+            "games_per_second": self.games / seconds if seconds else 0.0,
+            "turns_per_second": self.turns / seconds if seconds else 0.0,
+            "capped_rate": self.capped / self.games if self.games else 0.0,
+            "workers": self.get_workers(),
+            "cells": [self.get_cell(cell) for cell in sorted(self.units_total)],
+        }
+
+    def get_cell(self, cell: Cell) -> dict:
+        algorithm_name, num_players = cell
+        return {
+            "algorithm": algorithm_name,
+            "num_players": num_players,
+            "units_done": self.units_done[cell],
+            "units_total": self.units_total[cell],
+            "estimates": {
+                attr: {"mean": mean, "ci95": half_width}
+                for attr, (mean, half_width) in self.get_estimates(cell).items()
+            },
+        }
+
+    def render(self):
+        snapshot = self.get_snapshot()
+        lines = []
+
+        def add(name, kind, help_, samples):
+            lines.append(f"# HELP {PREFIX}_{name} {help_}")
+            lines.append(f"# TYPE {PREFIX}_{name} {kind}")
+            for labels, value in samples:
+                lines.append(
+                    f"{PREFIX}_{name}{{{labels}}} {value}"
+                    if labels
+                    else f"{PREFIX}_{name} {value}"
+                )
+
+        add("games_total", "counter", "Games played.", [("", snapshot["games"])])
+        add("turns_total", "counter", "Turns played.", [("", snapshot["turns"])])
+        add(
+            "capped_games_total",
+            "counter",
+            "Games cut off at the round limit.",
+            [("", snapshot["capped_games"])],
+        )
+        add(
+            "games_per_second",
+            "gauge",
+            "Games per second since the sweep started.",
+            [("", snapshot["games_per_second"])],
+        )
+        add(
+            "turns_per_second",
+            "gauge",
+            "Turns per second since the sweep started.",
+            [("", snapshot["turns_per_second"])],
+        )
+        cells = snapshot["cells"]
+        for name, key, help_ in (
+            ("units_done", "units_done", "Work units finished, per cell."),
+            ("units_total", "units_total", "Work units in the sweep, per cell."),
+        ):
+            add(
+                name,
+                "gauge",
+                help_,
+                [
+                    (
+                        get_labels(
+                            algorithm=c["algorithm"], num_players=c["num_players"]
+                        ),
+                        c[key],
+                    )
+                    for c in cells
+                ],
+            )
+        for name, key, help_ in (
+            ("mean", "mean", "Running mean of every attribute, per cell."),
+            ("ci95", "ci95", "Half width of the mean's 95% confidence interval."),
+        ):
+            add(
+                name,
+                "gauge",
+                help_,
+                [
+                    (
+                        get_labels(
+                            algorithm=c["algorithm"],
+                            num_players=c["num_players"],
+                            attr=attr,
+                        ),
+                        estimate[key],
+                    )
+                    for c in cells
+                    for attr, estimate in c["estimates"].items()
+                ],
+            )
+        workers = snapshot["workers"]
+        if workers:
+            add(
+                "workers",
+                "gauge",
+                "Coordinator workers and units, by state.",
+                [(get_labels(state=state), value) for state, value in workers.items()],
+            )
+        # swapped in whole, so a scrape gets either the old strings or the new ones
+        self.text = "\n".join(lines) + "\n"
+        self.json = json.dumps(snapshot)
+
+    def write_snapshot(self):
+        self.last_snapshot = monotonic()
+        tmp_path = f"{self.snapshot_path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.json)
+        os.replace(tmp_path, self.snapshot_path)
+
+    def serve(self, port=9100, host="127.0.0.1") -> ThreadingHTTPServer:
+        """
+        serves /metrics (Prometheus) and /metrics.json from a daemon thread
+        """
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body, content_type = metrics.text, "text/plain; version=0.0.4"
+                elif self.path == "/metrics.json":
+                    body, content_type = metrics.json, "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode()
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *_):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self.server
+
+    def close(self):
+        if self.snapshot_path:
+            self.write_snapshot()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
@@ -0,0 +1,103 @@
+"""
+Monopoly, to simulate and to play.
+
+- core.py: the engine, everything a simulation needs
+- interactive.py: the decisions people make in their own time, when they're playing
+- text.py: what the cards say
+
+Importing the package imports only the engine; the rest is loaded the first time one of its
+names is used, from here or from its module, so that workers and the command line don't pay for
+it (see benchmarks/importtime.py).
+"""
+from monopoly.core import (
+    ALL_MONEY,
+    BACKUP_LANGUAGE,
+    BANK_SEAT,
+    BANKRUPT,
+    BUILD,
+    BUILDABLE_PROPERTY_COLORS,
+    BUILDING_TYPES,
+    BUY,
+    CARD,
+    CARDS,
+    DECKS,
+    LANGUAGE,
+    MAX_ROUNDS,
+    MORTGAGE,
+    MOVE,
+    NUM_HOTELS,
+    NUM_HOUSES,
+    RENT,
+    ROLL,
+    TRANSFER,
+    TURN,
+    AdvanceCard,
+    AdvanceThreeSpacesCard,
+    Bank,
+    Board,
+    BuildableProperty,
+    BuildingAndLoanMaturesCard,
+    Card,
+    CardSpace,
+    Chance,
+    ChanceDeck,
+    CommunityChest,
+    CommunityChestDeck,
+    Decision,
+    Deck,
+    Doubles,
+    EconomicActor,
+    ElectedPresidentCard,
+    FreeParking,
+    Game,
+    GetOutOfJailFreeCard,
+    Go,
+    GoToBernPlaceFederaleCard,
+    GoToClosestRailroadCard,
+    GoToJail,
+    GoToJailCard,
+    IncomeTax,
+    Jail,
+    LuxuryTax,
+    Monopoly,
+    NothingHappensWhenYouLandOnItSpace,
+    Player,
+    Property,
+    Railroad,
+    RepairPropertyCard,
+    Space,
+    SpaceCounters,
+    SpeedingCard,
+    TaxSpace,
+    Utility,
+    build_spaces,
+    buy_decision,
+    check_args,
+    get_counters,
+    get_deck_cards,
+    get_hasher,
+    get_index_of_next_space_of_type,
+    get_property_with_least_number_of_houses,
+    get_property_with_no_hotels,
+    get_space_index,
+    get_spaces_dict,
+    record,
+    shuffle_decks,
+)
+
+# name -> the module it's loaded from, when it's first asked for
+LAZY = {
+    "PendingBuyDecision": "monopoly.interactive",
+    "GetOutOfJailDecision": "monopoly.interactive",
+    "CARD_TEXT": "monopoly.text",
+    "get_card_text": "monopoly.text",
+}
+
+
+def __getattr__(name):
+    if name not in LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+
+    value = globals()[name] = getattr(import_module(LAZY[name]), name)
+    return value
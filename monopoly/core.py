@@ -0,0 +1,1404 @@
+"""
+The engine: the board, the rules and the game. Everything a simulation needs, and only that;
+card text is in text.py and the decisions made by people playing in interactive.py, loaded when
+they're first used.
+
+Purpose:
+
+1) To simulate games of Monopoly in order to determine the best strategy
+2) To play Monopoly on a computer
+
+Along those lines, here's some prior art:
+
+http://www.tkcs-collins.com/truman/monopoly/monopoly.shtml
+https://blog.ed.ted.com/2017/12/01/heres-how-to-win-at-monopoly-according-to-math-experts/
+
+
+TODO: maybe instead of all these classmethods, instances?
+TODO: store LAST_ROLL in a global constant instead of passing it around to all the `action` methods
+TODO: write some tests
+TODO: add auctions
+TODO: print the reason someone decided to/not to buy a property
+TODO: print whether someone is in jail or just visiting
+TODO: don't allow buying of multiple houses/a hotel on a property if the other properties in the same color don't have any
+"""
+from __future__ import annotations
+
+from abc import ABC
+from collections import defaultdict
+from copy import copy
+from random import choice, shuffle
+from time import sleep
+
+import editions
+from editions import DEFAULT_EDITION
+from exceptions import (
+    Argument,
+    CantBuyBuildings,
+    CantMortgage,
+    DidntFind,
+    InvalidEdition,
+    MustBeEqualAmounts,
+    NoOwner,
+    NotEnough,
+    TooMany,
+    TooManyPlayers,
+    NotEnoughPlayers,
+)
+from liquidation import raise_funds
+
+# only for annotations: importing typing costs more than the rest of the engine
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import List, Optional, Tuple, Type
+
+ALL_MONEY = 20_580
+NUM_HOUSES = 32
+NUM_HOTELS = 12
+
+# whether a roll was doubles
+Doubles = bool
+
+LANGUAGE = "français"
+BACKUP_LANGUAGE = "English"
+BUILDING_TYPES = "house", "hotel"
+MAX_ROUNDS = 5000
+# a die's faces, as a constant so that rolling it doesn't build a new range every time
+DIE = (1, 2, 3, 4, 5, 6)
+
+# events, reported to whatever is recording the game (see `Game.recorder` and event_log.py),
+# each with a seat and up to two numbers
+TURN = 0  # seat
+ROLL = 1  # seat, total, doubles
+MOVE = 2  # seat, space
+TRANSFER = 3  # seat paying, seat paid, amount
+BUY = 4  # seat, space, price
+RENT = 5  # seat, space, amount
+CARD = 6  # seat, index in CARDS
+BUILD = 7  # seat, space, building level (5 is a hotel)
+MORTGAGE = 8  # seat, space, 1 if mortgaged else 0
+BANKRUPT = 9  # seat
+BANK_SEAT = 255
+
+BUILDABLE_PROPERTY_COLORS = (
+    "yellow",
+    "red",
+    "light blue",
+    "brown",
+    "pink",
+    "orange",
+    "green",
+    "dark blue",
+)
+
+
+def record(event, seat, a=0, b=0):
+    game = Game.current
+    if game is not None and game.recorder is not None:
+        game.recorder(event, seat, a, b)
+
+
+class SpaceCounters:
+    """
+    what happened on each space during a game, in lists indexed by board position, for games
+    played with `counters=True` (see roi.py)
+    """
+
+    NAMES = ("landings", "rent", "purchase_price", "building_spend", "turns_owned")
+
+    def __init__(self, num_spaces: int):
+        self.landings = [0] * num_spaces
+        self.rent = [0] * num_spaces
+        self.purchase_price = [0] * num_spaces
+        # net of what selling buildings got back; a group's buildings are paid for once, so
+        # it's shared between its properties
+        self.building_spend = [0.0] * num_spaces
+        # `Game.rounds` when each property was bought
+        self.bought_at = [None] * num_spaces
+
+    def get_totals(self, rounds: int) -> dict:
+        """
+        every counter, with the turns each property was owned for once `rounds` turns are done
+        """
+        totals = {name: getattr(self, name) for name in self.NAMES[:-1]}
+        totals["turns_owned"] = [
+            0 if bought_at is None else rounds - bought_at for bought_at in self.bought_at
+        ]
+        return totals
+
+
+def get_counters() -> Optional[SpaceCounters]:
+    game = Game.current
+    return game.counters if game is not None else None
+
+
+def get_hasher():
+    """
+    the `ZobristHash` of the game being played, if it's played with `hashing` (see zobrist.py)
+    """
+    game = Game.current
+    return game.zobrist if game is not None else None
+
+
+class Space:
+    def __repr__(self):
+        if hasattr(self, "_name"):
+            return self._name
+        return self.__name__
+
+
+class NothingHappensWhenYouLandOnItSpace(Space):
+    @classmethod
+    def action(self, player: "Player", _):
+        pass
+
+
+class Go(NothingHappensWhenYouLandOnItSpace):
+    """
+    should this really be a NothingHappensWhenYouLandOnItSpace?
+    since you get to collect $200
+    """
+    pass
+
+
+class Jail(NothingHappensWhenYouLandOnItSpace):
+    pass
+
+
+class FreeParking(NothingHappensWhenYouLandOnItSpace):
+    pass
+
+
+class TaxSpace(Space):
+    amount = None
+
+    @classmethod
+    def action(cls, player, _):
+        print(f"{player} pays bank {cls.amount} ({cls.__name__})")
+        player.pay("Bank", cls.amount)
+
+
+class LuxuryTax(TaxSpace):
+    _name = {"français": "Impôt Supplémentaire", "deutsch": "Nachsteuer"}
+    amount = 75
+
+
+class IncomeTax(TaxSpace):
+    # TODO: _name
+    amount = 100
+
+
+class GoToJail(Space):
+    @classmethod
+    def action(cls, player, _):
+        # player.go_to_jail()
+        pass
+
+
+class CardSpace(Space):
+    deck = None
+
+    @classmethod
+    def action(cls, player, _):
+        # for lazy loading to avoid circular imports (?)
+        deck = globals()[cls.deck]
+        card = deck.get_card()
+        record(CARD, player.seat, CARDS.index(card))
+        return card.action(player, _)
+
+
+class CommunityChest(CardSpace):
+    deck = "CommunityChestDeck"
+    _name = {"français": "Chancellerie", "deutsch": "Kanzlei"}
+
+
+class Chance(CardSpace):
+    deck = "ChanceDeck"
+    _name = {"français": "Chance", "deutsch": "Chance", "English": "Chance"}
+
+
+class Card(ABC):
+    mandatory_action = False
+    cost = None
+    keep = False
+
+    @classmethod
+    def action(self, player: "Player", _):
+        raise NotImplementedError
+
+    def __repr__(self):
+        from monopoly.text import get_card_text
+
+        return get_card_text(type(self))
+
+
+class ElectedPresidentCard(Card):
+    mandatory_action = True
+
+    @classmethod
+    def action(cls, player, _):
+        print("{cls.__name__}")
+        for other_player in Game.current.get_live_players():
+            if other_player != player:
+                print(f"{player} is paying {other_player} 50")
+                player.pay(other_player, 50)
+
+
+class GetOutOfJailFreeCard(Card):
+    @classmethod
+    def action(cls, player: "Player", _):
+        print(f"{player} got a get out of jail free card")
+        player.get_out_of_jail_free_card = True
+
+
+class AdvanceCard(Card):
+    mandatory_action = True
+    kwarg = {}
+
+    @classmethod
+    def action(cls, player, _):
+        print(f"the card is {cls.__name__}")
+        player.advance(**cls.kwarg)
+
+
+class GoToJailCard(AdvanceCard):
+    kwarg = {"until_space_type": "Jail", "pass_go": False}
+
+
+class AdvanceThreeSpacesCard(AdvanceCard):
+    mandatory_action = True
+    kwarg = {"num_spaces": 3}
+
+
+class GoToClosestRailroadCard(AdvanceCard):
+    kwarg = {"until_space_type": "Railroad"}
+
+
+class GoToBernPlaceFederaleCard(AdvanceCard):
+    mandatory_action = True
+    kwarg = {"space_index": "Berne Place Fédérale"}
+
+
+class BuildingAndLoanMaturesCard(Card):
+    mandatory_action = True
+
+    @classmethod
+    def action(self, player, _):
+        print(f"{self.__class__}: the bank pays {player} 150")
+        Bank.pay(player, 150)
+
+
+class SpeedingCard(Card):
+    mandatory_action = True
+
+    @classmethod
+    def action(cls, player, _):
+        print(f"{cls.__name__}: {player} pays 15 to Bank")
+        player.pay(Bank, 15)
+
+
+class RepairPropertyCard(Card):
+    @classmethod
+    def action(cls, player, _):
+        num_houses, num_hotels = 0, 0
+        for property in player.buildable_properties:
+            num_houses += property.buildings["house"]
+            num_hotels += property.buildings["hotel"]
+        total_owed = sum([num_houses * 25, num_hotels * 100])
+        print(f"{player} pays the bank {total_owed} for {cls.__name__}")
+        player.pay(Bank, total_owed)
+
+
+class Deck:
+    # set from the edition (see `Board.use_edition`)
+    cards = ()
+    # swapped for the copy belonging to whichever game is being played
+    deck = None
+
+    @classmethod
+    def shuffle(cls):
+        # start from the same order every time, so that the deck only depends on the seed
+        cls.deck.sort(key=lambda card: card.__name__)
+        shuffle(cls.deck)
+
+    @classmethod
+    def get_card(cls):
+        card = cls.deck.pop()
+        if not card.keep:
+            cls.deck.insert(0, card)
+        return card
+
+
+class ChanceDeck(Deck):
+    pass
+
+
+class CommunityChestDeck(Deck):
+    pass
+
+
+DECKS = (ChanceDeck, CommunityChestDeck)
+# every card an edition can use; CARD events refer to cards by their index in here, so only add
+# to the end
+CARDS = (
+    AdvanceThreeSpacesCard,
+    ElectedPresidentCard,
+    BuildingAndLoanMaturesCard,
+    GoToBernPlaceFederaleCard,
+    GoToJailCard,
+    SpeedingCard,
+    GoToClosestRailroadCard,
+    GetOutOfJailFreeCard,
+    RepairPropertyCard,
+)
+
+
+def shuffle_decks():
+    for deck in DECKS:
+        deck.shuffle()
+
+
+def buy_decision(property: "Property", player: "Player"):
+    algorithm = player.buy_decision_algorithm or Game.current.buy_decision_algorithm
+    return algorithm(property, player)
+
+
+class Decision:
+    """
+    a decision somebody has yet to make, which holds up the game (see interactive.py)
+    """
+
+
+class Property(Space):
+    mortgaged = False
+    owner = None
+    cost = 0
+    instances = []
+    # `instances` by type, swapped in with them (see `Game.activate`)
+    by_type = {}
+    type = None
+
+    def __init__(self, _name):
+        self._name = _name
+        self.instances.append(self)
+
+    def __repr__(self):
+        if hasattr(self, "_name"):
+            return self._name[LANGUAGE]
+        return str(self.__class__)
+
+    @classmethod
+    def reset(cls):
+        for property in cls.instances:
+            property.owner = None
+            property.mortgaged = False
+            if isinstance(property, BuildableProperty):
+                property.buildings = {"house": 0, "hotel": 0}
+
+    @classmethod
+    def get_num_of_type(cls, type):
+        return len(cls.instances_by_type()[type])
+
+    @property
+    def num_of_type(self):
+        return self.get_num_of_type(self.type)
+
+    @property
+    def properties_of_type(self):
+        return self.instances_by_type()[self.type]
+
+    @classmethod
+    def instances_by_type(cls):
+        return Property.by_type
+
+    @staticmethod
+    def group_by_type(instances) -> dict:
+        ibt = defaultdict(list)
+        for i in instances:
+            ibt[i.type].append(i)
+        return ibt
+
+    def action(self, player: "Player", last_roll=None):
+        if not self.owner:
+            buy = buy_decision(self, player)
+            if isinstance(buy, Decision):
+                print(f"{player} is deciding whether to buy {self}")
+                player.pending_decision = buy
+                return
+            if buy:
+                print(f"{player} will buy {self}")
+                return player.buy(self)
+            print(f"{player} decided not to buy {self}")
+            return
+        if self.owner == player or self.mortgaged:
+            print(f"{player} landed on his own property, {self}")
+            return
+        rent = self.calculate_rent(last_roll)
+        record(RENT, player.seat, self.index, rent)
+        counters = get_counters()
+        if counters is not None:
+            counters.rent[self.index] += rent
+        print(f"{player} pays {self.owner} ${rent} after landing on it.")
+        player.pay(self.owner, rent)
+
+    def calculate_rent(self, _):
+        if not self.owner:
+            raise NoOwner
+
+    def mortgage(self, player: "Player"):
+        if self.mortgaged:
+            raise CantMortgage
+        Bank.pay(player, self.mortgage_cost)
+        self.mortgaged = True
+        hasher = get_hasher()
+        if hasher is not None:
+            hasher.mortgage(self)
+        record(MORTGAGE, player.seat, self.index, 1)
+
+    def un_mortgage(self, player: "Player") -> bool:
+        """
+        pays the mortgage off if the player has the cash, without raising any; whether it did
+        """
+        if not self.mortgaged:
+            raise CantMortgage
+        try:
+            player.pay(Bank, self.unmortgage_cost, liquidate=False)
+        except NotEnough:
+            return False
+        self.mortgaged = False
+        hasher = get_hasher()
+        if hasher is not None:
+            hasher.mortgage(self)
+        record(MORTGAGE, player.seat, self.index, 0)
+        return True
+
+
+class Utility(Property):
+    cost = 200
+    # times the dice
+    rent = {0: 0, 1: 4, 2: 10}
+    mortgage_cost = 75
+    unmortgage_cost = 83
+    type = "utility"
+
+    def calculate_rent(self, last_roll: int):
+        super().calculate_rent(last_roll)
+        if not last_roll:
+            return 10 * Player.roll_the_dice()[0]
+        return self.rent[self.owner.owns_x_of_type(self.type)] * last_roll
+
+
+class Railroad(Property):
+    cost = 200
+    rent = {1: 25, 2: 50, 3: 100, 4: 200}
+    mortgage_cost = 100
+    unmortgage_cost = 110
+    type = "railroad"
+
+    def calculate_rent(self, _):
+        super().calculate_rent(_)
+        owns_x_of_type = self.owner.owns_x_of_type(self.type)
+        if not owns_x_of_type:
+            return 0
+        return self.rent[owns_x_of_type]
+
+
+class BuildableProperty(Property):
+    def __init__(
+        self,
+        _name,
+        cost,
+        rent,
+        color,
+        house_and_hotel_cost,
+        mortgage_cost,
+        unmortgage_cost,
+    ):
+        super().__init__(_name)
+        self.cost = cost
+        self.rent = rent
+        self.house_and_hotel_cost = house_and_hotel_cost
+        self.color = color
+        self.type = color
+        self.mortgage_cost = mortgage_cost
+        self.unmortgage_cost = unmortgage_cost
+        self.buildings = {"house": 0, "hotel": 0}
+
+    def buy_building(self, building_type):
+        """
+        TODO: Each property within a group must be no more than one house level away from all other
+         properties in that group. For example, if you own the Orange group, you can’t put a
+         second house on New York Ave until you have a first house on St. James and Tennessee.
+         Then you can’t put a third house on any property until you have two houses on
+         all properties.
+        """
+        if not self.owner.owns_all_type(self.type):
+            raise CantBuyBuildings
+        if any(property_.mortgaged for property_ in self.properties_of_type):
+            raise CantBuyBuildings
+
+        if building_type == "hotel" and self.buildings["house"] != 4:
+            raise NotEnough
+        elif building_type == "house" and self.buildings["house"] == 4:
+            raise TooMany
+
+        cost = self.house_and_hotel_cost
+        self.owner.check_funds(cost)
+        Bank.get_building(building_type)
+        self.owner.pay(Bank, cost)
+
+        counters = get_counters()
+        hasher = get_hasher()
+        for property_ in self.properties_of_type:
+            level = property_.building_level
+            if building_type == "hotel":
+                property_.buildings["house"] = 0
+                property_.buildings["hotel"] = 1
+            else:
+                property_.buildings["house"] += 1
+            record(BUILD, self.owner.seat, property_.index, property_.building_level)
+            if hasher is not None:
+                hasher.build(property_, level, property_.building_level)
+            if counters is not None:
+                counters.building_spend[property_.index] += cost / self.num_of_type
+
+    def sell_buildings(self, building_type, quantity):
+        if not self.buildings[building_type]:
+            raise NotEnough
+        if quantity % self.num_of_type:
+            # TODO: this isn't right
+            #  https://www.quora.com/When-can-a-player-place-a-house-in-monopoly
+            raise MustBeEqualAmounts
+        # buildings go up a level at a time across the whole group (see `buy_building`),
+        # so they come down the same way, for half of what they cost
+        levels = quantity // self.num_of_type
+        if building_type == "hotel" and levels > 1:
+            raise TooMany
+        if building_type == "house" and levels > self.buildings["house"]:
+            raise TooMany
+
+        hasher = get_hasher()
+        for property_ in self.properties_of_type:
+            level = property_.building_level
+            if building_type == "hotel":
+                property_.buildings["hotel"] = 0
+                property_.buildings["house"] = 4
+            else:
+                property_.buildings["house"] -= levels
+            record(BUILD, self.owner.seat, property_.index, property_.building_level)
+            if hasher is not None:
+                hasher.build(property_, level, property_.building_level)
+        Bank.put_building(building_type, quantity)
+        refund = levels * (self.house_and_hotel_cost // 2)
+        Bank.pay(self.owner, refund)
+        counters = get_counters()
+        if counters is not None:
+            for property_ in self.properties_of_type:
+                counters.building_spend[property_.index] -= refund / self.num_of_type
+
+    @property
+    def building_level(self):
+        if self.buildings["hotel"]:
+            return 5
+        return self.buildings["house"]
+
+    def mortgage(self, player: "Player"):
+        if self.buildings["house"] or self.buildings["hotel"]:
+            raise CantMortgage
+        super().mortgage(player)
+
+    def calculate_rent(self, _):
+        super().calculate_rent(_)
+        if self.buildings["house"] or self.buildings["hotel"]:
+            buildings = self.buildings
+            if buildings["house"]:
+                key = buildings["house"]
+            else:
+                key = "hotel"
+        elif self.owner.owns_all_type(self.type):
+            key = "monopoly"
+        else:
+            key = 0
+        return self.rent[key]
+
+
+def build_spaces(edition: dict) -> list:
+    """
+    the board's spaces, from an edition (see editions.py)
+    """
+    spaces = []
+    # properties register themselves in `Property.instances`; keep the current ones out of it
+    instances, Property.instances = Property.instances, []
+    try:
+        for data in edition["spaces"]:
+            class_ = globals()[data["type"]]
+            if class_ is BuildableProperty:
+                rent = {
+                    key if key in ("monopoly", "hotel") else int(key): value
+                    for key, value in data["rent"].items()
+                }
+                space = BuildableProperty(
+                    _name=data["name"],
+                    cost=data["cost"],
+                    color=data["color"],
+                    rent=rent,
+                    house_and_hotel_cost=data["house_and_hotel_cost"],
+                    mortgage_cost=data["mortgage_cost"],
+                    unmortgage_cost=data["unmortgage_cost"],
+                )
+            elif issubclass(class_, Property):
+                space = class_(_name=data["name"])
+                rent = {int(key): value for key, value in data["rent"].items()}
+                for name, value in (
+                    ("cost", data["cost"]),
+                    ("rent", {**class_.rent, **rent}),
+                    ("mortgage_cost", data["mortgage_cost"]),
+                    ("unmortgage_cost", data["unmortgage_cost"]),
+                ):
+                    if value != getattr(class_, name):
+                        setattr(space, name, value)
+            elif issubclass(class_, TaxSpace) and data["amount"] != class_.amount:
+                space = type(class_.__name__, (class_,), {"amount": data["amount"]})
+            else:
+                space = class_
+            spaces.append(space)
+    finally:
+        Property.instances = instances
+    return spaces
+
+
+def get_spaces_dict(spaces) -> dict:
+    spaces_dict = {}
+    for index, space in enumerate(spaces):
+        if hasattr(space, "_name"):
+            space_name = space._name
+        else:
+            space_name = space.__name__
+
+        if isinstance(space_name, dict):
+            space_name = space._name.get(LANGUAGE) or space._name.get(BACKUP_LANGUAGE)
+        spaces_dict[space_name] = index
+    return spaces_dict
+
+
+def get_deck_cards(edition: dict) -> dict:
+    cards = {card.__name__: card for card in CARDS}
+    try:
+        return {
+            deck: tuple(cards[name] for name in edition["decks"][deck.__name__])
+            for deck in DECKS
+        }
+    except KeyError as e:
+        raise InvalidEdition(f"no such card: {e.args[0]}")
+
+
+class Board:
+    """
+    The spaces come from an edition (see editions.py); `use_edition` switches between them.
+    """
+
+    edition = None
+    # the edition in its compiled form, for lookups that don't need the spaces themselves; it's
+    # read when it's first needed (see `get_compiled`)
+    compiled = None
+    # `spaces` is swapped for the copy belonging to whichever game is being played (see
+    # `Game.activate`); this is the original
+    template = spaces = []
+    SPACES_DICT = {}
+    NUM_SPACES = 0
+    # name -> (spaces, SPACES_DICT, cards of each deck), so that switching back is free
+    _editions = {}
+
+    @classmethod
+    def use_edition(cls, name=DEFAULT_EDITION):
+        if name == cls.edition:
+            return
+        if name not in cls._editions:
+            edition = editions.load(name)
+            spaces = build_spaces(edition)
+            for index, space in enumerate(spaces):
+                if isinstance(space, Property):
+                    space.index = index
+            cls._editions[name] = (
+                spaces,
+                get_spaces_dict(spaces),
+                get_deck_cards(edition),
+            )
+        spaces, cls.SPACES_DICT, deck_cards = cls._editions[name]
+        cls.template = spaces
+        cls.NUM_SPACES = len(spaces)
+        cls.compiled = None
+        cls.edition = name
+        for deck, cards in deck_cards.items():
+            deck.cards = cards
+        cls.restore()
+
+    @classmethod
+    def get_compiled(cls) -> editions.CompiledBoard:
+        if cls.compiled is None:
+            cls.compiled = editions.compiled(cls.edition)
+        return cls.compiled
+
+    @classmethod
+    def restore(cls):
+        """
+        swaps the original spaces and decks back in, so that no game's stay reachable from here
+        """
+        cls.spaces = cls.template
+        Property.instances = [space for space in cls.spaces if isinstance(space, Property)]
+        Property.by_type = Property.group_by_type(Property.instances)
+        for deck in DECKS:
+            deck.deck = list(deck.cards)
+
+
+Board.use_edition()
+
+
+def get_space_index(name):
+    return Board.SPACES_DICT[name]
+
+
+class EconomicActor:
+    pass
+
+
+class Bank(EconomicActor):
+    money = ALL_MONEY
+    seat = BANK_SEAT
+    NUM_HOUSES = NUM_HOUSES
+    NUM_HOTELS = NUM_HOTELS
+
+    @classmethod
+    def reset(cls):
+        cls.money = ALL_MONEY
+        cls.NUM_HOUSES = NUM_HOUSES
+        cls.NUM_HOTELS = NUM_HOTELS
+
+    @classmethod
+    def get_state(cls) -> tuple:
+        return cls.money, cls.NUM_HOUSES, cls.NUM_HOTELS
+
+    @classmethod
+    def set_state(cls, state: tuple):
+        cls.money, cls.NUM_HOUSES, cls.NUM_HOTELS = state
+
+    @classmethod
+    def pay(cls, actor: "EconomicActor", amount: int):
+        if isinstance(actor, str):
+            actor = globals()[actor]
+        cls.money -= amount
+        actor.money += amount
+        record(TRANSFER, BANK_SEAT, actor.seat, amount)
+        hasher = get_hasher()
+        if hasher is not None:
+            hasher.transfer(cls, actor, amount)
+
+    @classmethod
+    def get_building(cls, type_):
+        cls.check_building_type(type_)
+        store = cls.get_building_store(type_)
+        if not store:
+            raise NotEnough(f"Not enough {type_}s!")
+        else:
+            store -= 1
+
+    @classmethod
+    def put_building(cls, type_, quantity):
+        cls.check_building_type(type_)
+        store = cls.get_building_store(type_)
+        store += quantity
+
+    @staticmethod
+    def check_building_type(type_):
+        if type_ not in BUILDING_TYPES:
+            raise TypeError
+
+    @classmethod
+    def get_building_store(cls, type_):
+        return cls.NUM_HOUSES if type_ == "house" else cls.NUM_HOTELS
+
+
+def get_index_of_next_space_of_type(current_space_index, until_space_type):
+    if until_space_type in editions.KINDS:
+        index = Board.get_compiled().next_of_kind(
+            until_space_type, current_space_index % Board.NUM_SPACES
+        )
+        if index < 0:
+            raise DidntFind
+        return index
+    for step in range(1, Board.NUM_SPACES):
+        index = (current_space_index + step) % Board.NUM_SPACES
+        if isinstance(until_space_type, str):
+            until_space_type = globals()[until_space_type]
+        if Board.spaces[index] == until_space_type or isinstance(
+            Board.spaces[index], until_space_type
+        ):
+            return index
+    raise DidntFind
+
+
+def check_args(num_spaces, space_index, until_space_type):
+    num_args = (
+        (num_spaces is not None)
+        + (space_index is not None)
+        + (until_space_type is not None)
+    )
+    if num_args != 1:
+        raise Argument("provide either num_spaces or space_index or until_space_type")
+
+
+def get_property_with_least_number_of_houses(properties):
+    return sorted(properties, key=lambda prop: prop.buildings["house"], reverse=True)[0]
+
+
+def get_property_with_no_hotels(properties):
+    return sorted(properties, key=lambda prop: prop.buildings["hotel"])[0]
+
+
+class Monopoly:
+    def __init__(self, property_: "BuildableProperty"):
+        self.properties = Property.instances_by_type()[property_.type]
+        self.num_properties = len(self.properties)
+        self.max_num_houses = 4 * self.num_properties
+        self.max_num_hotels = self.num_properties
+
+    def __repr__(self):
+        return f"<Monopoly type={self.properties[0].type}"
+
+    @property
+    def num_houses(self):
+        num = 0
+        for property in self.properties:
+            num += property.buildings["house"]
+        return num
+
+    @property
+    def num_hotels(self):
+        num = 0
+        for property in self.properties:
+            num += property.buildings["hotel"]
+        return num
+
+    @property
+    def next_building(self) -> Tuple[Optional[str], Optional["BuildableProperty"]]:
+        num_houses, num_hotels, max_num_houses, max_num_hotels = (
+            self.num_houses,
+            self.num_hotels,
+            self.max_num_houses,
+            self.max_num_hotels,
+        )
+        first_prop = self.properties[0]
+
+        if not num_houses and not num_hotels:
+            return "house", first_prop
+
+        elif num_hotels == max_num_hotels:
+            return None, None
+
+        elif num_houses < max_num_houses:
+            if not num_hotels:
+                return (
+                    "house",
+                    get_property_with_least_number_of_houses(self.properties),
+                )
+            else:
+                return "hotel", get_property_with_no_hotels(self.properties)
+        elif num_houses == max_num_houses:
+            return "hotel", first_prop
+
+
+class Player(EconomicActor):
+    in_jail = False
+    bankrupt = False
+    get_out_of_jail_free_card = False
+    go_again = False
+    buy_decision_algorithm = None
+    pending_decision = None
+    # the ring of players still in the game, in turn order (see `Game.turns`)
+    next_player = previous_player = None
+    turn_order = 0
+    current_space_index = get_space_index("Go")
+    money = 0
+    passed_go_times = 0
+
+    def __str__(self):
+        return self.name
+
+    def __init__(self, seat=None):
+        self.name = choice([str(i) for i in range(10_000)])
+        self.seat = seat
+        self.monopolies = []
+        Bank.pay(self, 1_500)
+
+    def pay(self, actor: Type["EconomicActor"], amount: int, liquidate=True):
+        """
+        if `liquidate`, sell buildings and mortgage properties as needed before giving up
+        """
+        if isinstance(actor, str):
+            actor = globals()[actor]
+        if liquidate and amount > self.money:
+            raise_funds(self, amount)
+        self.check_funds(amount)
+        self.money -= amount
+        actor.money += amount
+        record(TRANSFER, self.seat, actor.seat, amount)
+        hasher = get_hasher()
+        if hasher is not None:
+            hasher.transfer(self, actor, amount)
+
+    def check_funds(self, amount):
+        if amount > self.money:
+            raise NotEnough
+
+    def buy(self, property_: "Property", from_=Bank, cost=None):
+        try:
+            self.pay(from_, cost or property_.cost, liquidate=False)
+        except NotEnough:
+            return
+        previous_owner = property_.owner
+        property_.owner = self
+        record(BUY, self.seat, property_.index, cost or property_.cost)
+        hasher = get_hasher()
+        if hasher is not None:
+            hasher.own(property_, previous_owner, self)
+        counters = get_counters()
+        if counters is not None:
+            counters.purchase_price[property_.index] += cost or property_.cost
+            counters.bought_at[property_.index] = Game.current.rounds
+
+        if property_.__class__.__name__ == "BuildableProperty" and self.owns_all_type(
+            property_.type
+        ):
+            monopoly = Monopoly(property_)
+            self.monopolies.append(monopoly)
+
+    def pay_off_mortgages(self):
+        """
+        pays off mortgages while there's the cash, those of monopolies first, which can't be
+        built on until they're all paid off
+        """
+        for property_ in Property.instances:
+            if property_.mortgaged and property_.owner is self:
+                break
+        else:
+            return
+        monopoly_types = {monopoly.properties[0].type for monopoly in self.monopolies}
+        mortgaged = [p for p in self.properties if p.mortgaged]
+        mortgaged.sort(key=lambda property_: property_.type not in monopoly_types)
+        for property_ in mortgaged:
+            if self.can_afford(property_.unmortgage_cost) and property_.un_mortgage(self):
+                print(f"{self} paid off the mortgage on {property_}")
+
+    def buy_buildings_if_possible(self):
+        self.pay_off_mortgages()
+        if self.monopolies:
+            print(f"{self} has {self.monopolies}")
+        else:
+            print(f"{self} has no monopolies.")
+        for monopoly in self.monopolies:
+            while True:
+                next_building_type, property_ = monopoly.next_building
+                if not next_building_type:
+                    break
+                print("next_building_type:", next_building_type, "property_:", property_)
+                if not self.can_afford(property_.house_and_hotel_cost):
+                    print("can't afford")
+                    break
+                try:
+                    property_.buy_building(next_building_type)
+                except (NotEnough, CantBuyBuildings):
+                    print("can't afford")
+                    break
+                print("bought a building")
+
+    def take_a_turn(self):
+        if self.in_jail:
+            print(f"{self} is in jail")
+            from monopoly.interactive import GetOutOfJailDecision
+
+            decision = GetOutOfJailDecision(self)
+            print(decision)
+            return decision
+        # TODO: you can buy buildings from jail! Fix this
+        self.buy_buildings_if_possible()
+        num_spaces, doubles = self.roll_the_dice(self.seat)
+        record(ROLL, self.seat, num_spaces, doubles)
+        print(f'{self} rolled', str(num_spaces))
+        if doubles:
+            self.go_again = True
+        else:
+            self.go_again = False
+
+        self.advance(num_spaces, just_rolled=True)
+
+    def owns_x_of_type(self, type_):
+        owned = 0
+        for property_ in Property.instances_by_type().get(type_, ()):
+            if property_.owner is self:
+                owned += 1
+        return owned
+
+    def owns_all_type(self, type_):
+        return self.owns_x_of_type(type_) == Property.get_num_of_type(type_)
+
+    @property
+    def properties_by_type(self):
+        pbt = defaultdict(list)
+        for property in self.properties:
+            pbt[property.type].append(property)
+        return pbt
+
+    @staticmethod
+    def roll_the_dice(seat=None) -> Tuple[int, Doubles]:
+        dice = Game.current.dice if Game.current is not None else None
+        if dice is not None:
+            die_one, die_two = dice(seat)
+        else:
+            die_one, die_two = choice(DIE), choice(DIE)
+        total = die_one + die_two
+        if die_one == die_two:
+            return total, True
+        return total, False
+
+    @property
+    def assets(self):
+        return self.money + self.total_property_mortgage_value
+
+    @property
+    def total_property_mortgage_value(self):
+        return sum(property.mortgage_cost for property in self.properties)
+
+    @property
+    def properties(self) -> List["Property"]:
+        # TODO: create an `instances` class attribute on `Property` that keeps track of them all
+        #  then iterate through those instances to see which ones have an owner equal to `self`
+        return [p for p in Property.instances if p.owner == self]
+
+    @property
+    def buildable_properties(self) -> List[BuildableProperty]:
+        return [
+            p for p in self.properties if p.__class__.__name__ == "BuildableProperty"
+        ]
+
+    def advance(
+        self,
+        num_spaces=None,
+        space_index=None,
+        until_space_type=None,
+        pass_go=True,
+        just_rolled=True,
+    ):
+        new_space_index = None
+        check_args(num_spaces, space_index, until_space_type)
+        if num_spaces:
+            new_space_index = self.current_space_index + num_spaces
+        elif space_index:
+            if isinstance(space_index, str):
+                space_index = get_space_index(space_index)
+            new_space_index = space_index
+        elif until_space_type:
+            new_space_index = get_index_of_next_space_of_type(
+                self.current_space_index, until_space_type
+            )
+
+        if pass_go and new_space_index >= Board.NUM_SPACES - 1:
+            self.money += 200
+            record(TRANSFER, BANK_SEAT, self.seat, 200)
+            hasher = get_hasher()
+            if hasher is not None:
+                hasher.transfer(Bank, self, 200)
+            print(f"{self} passed go and collected 200")
+            self.passed_go_times += 1
+            new_space_index = new_space_index - Board.NUM_SPACES
+        elif pass_go and self.current_space_index > new_space_index:
+            self.money += 200
+            record(TRANSFER, BANK_SEAT, self.seat, 200)
+            hasher = get_hasher()
+            if hasher is not None:
+                hasher.transfer(Bank, self, 200)
+            print(f"{self} passed go and collected 200")
+            self.passed_go_times += 1
+
+        print("new_space_index", str(new_space_index))
+        hasher = get_hasher()
+        if hasher is not None:
+            hasher.move(self, self.current_space_index, new_space_index)
+        self.current_space_index = new_space_index
+        record(MOVE, self.seat, new_space_index % Board.NUM_SPACES)
+        counters = get_counters()
+        if counters is not None:
+            counters.landings[new_space_index % Board.NUM_SPACES] += 1
+
+        if just_rolled:
+            last_roll = num_spaces
+        else:
+            last_roll = None
+
+        try:
+            self.do_action_of_current_space(last_roll=last_roll)
+        except NotEnough:
+            # TODO: is this always right?
+            # TODO: eventually make deals to avoid bankruptcy
+            self.bankrupt = True
+            if Game.current is not None:
+                Game.current.remove_player(self)
+            record(BANKRUPT, self.seat)
+            print(f"{self} just went bankrupt!")
+
+    def do_action_of_current_space(self, last_roll=None):
+        space = Board.spaces[self.current_space_index]
+        print(f"space is {space}")
+        space.action(self, last_roll)
+
+    def go_to_jail(self):
+        self.in_jail = True
+        hasher = get_hasher()
+        if hasher is not None:
+            hasher.move(self, self.current_space_index, get_space_index("Jail"))
+        self.current_space_index = get_space_index("Jail")
+
+    def can_afford(self, cost):
+        return self.money >= cost
+
+
+class Game:
+    """
+    A game owns its own copy of the board's properties, of the decks and of the bank's money
+    and buildings. Whichever game is being played has them swapped in (see `activate`), so
+    several games can be in progress at once as long as each one is activated before it's
+    played.
+
+    `end` tears the game down once its results have been read: nothing outside the game refers
+    to it or to anything in it any more, so it's freed as soon as it's dropped.
+
+    By default the game is played to the end as soon as it's created. With `autostart=False`,
+    play it with `start`, or a turn at a time by iterating over `turns()`.
+    """
+
+    current: Optional["Game"] = None
+    recorder = None
+    dice = None
+    counters = None
+    zobrist = None
+    rounds = 0
+
+    def __init__(
+        self,
+        num_players,
+        buy_decision_algorithm,
+        slow_down=False,
+        seats=None,
+        max_rounds=MAX_ROUNDS,
+        autostart=True,
+        recorder=None,
+        edition=None,
+        dice=None,
+        roll_for_order=False,
+        counters=False,
+        hashing=False,
+    ):
+        """
+        `seats` optionally gives each player their own BuyDecision instance (None to use
+        `buy_decision_algorithm`), so that strategies can play against each other
+
+        `recorder` is called with every event of the game (see `record`)
+
+        `edition` is the name of the board to play on (see editions.py); the default board is
+        back in use once the game ends
+
+        `dice`, if given, is called with a seat (None for rolls that aren't a player's turn) and
+        returns the two dice, instead of rolling them with `random` (see crn.py)
+
+        with `roll_for_order`, the players roll to see who goes first, and play goes on in seat
+        order from them; otherwise seat 0 goes first
+
+        with `counters`, what happens on every space is counted in `counters` (see
+        `SpaceCounters`); otherwise none of that costs anything
+
+        with `hashing`, `zobrist` keeps a hash of the state of the game as it's played (see
+        zobrist.py)
+        """
+        self.slow_down = slow_down
+        self.recorder = recorder
+        self.dice = dice
+        self.max_rounds = max_rounds
+        self.edition = edition or DEFAULT_EDITION
+        Board.use_edition(self.edition)
+        self.spaces = [
+            copy(space) if isinstance(space, Property) else space
+            for space in Board.template
+        ]
+        self.properties = [space for space in self.spaces if isinstance(space, Property)]
+        self.by_type = Property.group_by_type(self.properties)
+        self.decks = {deck: list(deck.cards) for deck in DECKS}
+        self.bank = (ALL_MONEY, NUM_HOUSES, NUM_HOTELS)
+        if counters:
+            self.counters = SpaceCounters(len(self.spaces))
+        self.activate()
+
+        shuffle_decks()
+        Property.reset()
+        self.buy_decision_algorithm = buy_decision_algorithm()
+        if num_players < 2:
+            raise NotEnoughPlayers
+        if num_players > 8:
+            raise TooManyPlayers
+        self._players = [Player(seat) for seat in range(num_players)]
+        if seats is not None:
+            if len(seats) != num_players:
+                raise Argument("provide one seat per player")
+            for player, seat in zip(self._players, seats):
+                player.buy_decision_algorithm = seat
+        first = self.roll_for_first_player() if roll_for_order else 0
+        self.seat_players(self._players[first:] + self._players[:first])
+        if hashing:
+            from zobrist import ZobristHash
+
+            self.zobrist = ZobristHash(self)
+        if autostart:
+            self.start()
+
+    def activate(self):
+        previous = Game.current
+        if previous is self:
+            return
+        if previous is not None:
+            previous.bank = Bank.get_state()
+        Game.current = self
+        Board.use_edition(self.edition)
+        Board.spaces = self.spaces
+        Property.instances = self.properties
+        Property.by_type = self.by_type
+        for deck, cards in self.decks.items():
+            deck.deck = cards
+        Bank.set_state(self.bank)
+
+    def roll_for_first_player(self) -> int:
+        """
+        everyone rolls and the highest roll goes first, those tied for it rolling again; the seat
+        """
+        contenders = self._players
+        while len(contenders) > 1:
+            rolls = [(player.roll_the_dice(player.seat)[0], player) for player in contenders]
+            highest = max(total for total, _ in rolls)
+            contenders = [player for total, player in rolls if total == highest]
+        return contenders[0].seat
+
+    def seat_players(self, order: List["Player"]):
+        """
+        links the players into a ring in turn order
+        """
+        for position, player in enumerate(order):
+            player.turn_order = position
+            player.next_player = order[(position + 1) % len(order)]
+            player.previous_player = order[position - 1]
+        # the first player still in the game, to walk the ring from
+        self.first_player = order[0]
+        self.next_to_play = order[0]
+        self.num_active_players = len(order)
+
+    def remove_player(self, player: "Player"):
+        """
+        takes a bankrupt player out of the ring; they keep pointing at the player after them so
+        that the turn goes on from there
+        """
+        if player.previous_player is None:
+            return
+        player.previous_player.next_player = player.next_player
+        player.next_player.previous_player = player.previous_player
+        player.previous_player = None
+        if self.first_player is player:
+            self.first_player = player.next_player
+        self.num_active_players -= 1
+
+    def get_live_players(self):
+        """
+        the players still in the game, in turn order
+        """
+        player = self.first_player
+        for _ in range(self.num_active_players):
+            yield player
+            player = player.next_player
+
+    @property
+    def active_players(self):
+        return [player for player in self._players if not player.bankrupt]
+
+    @property
+    def is_over(self):
+        return self.num_active_players <= 1 or self.rounds >= self.max_rounds
+
+    def turns(self):
+        """
+        plays the game, yielding the player who just took a turn after every turn
+
+        `rounds` counts every player's turn, including those of the bankrupt players skipped on
+        the way to the next player still in the game
+        """
+        num_players = len(self._players)
+        while not self.is_over:
+            player = self.next_to_play
+            print()
+            print()
+            record(TURN, player.seat)
+            player.take_a_turn()
+            yield player
+            while player.go_again and not player.bankrupt and not player.in_jail:
+                print()
+                print()
+                record(TURN, player.seat)
+                player.take_a_turn()
+                yield player
+            following = player.next_player
+            turns_passed = (following.turn_order - player.turn_order) % num_players
+            if self.num_active_players <= 1:
+                # the game's over before anyone else's turn
+                turns_passed = 1
+            self.rounds = min(self.rounds + (turns_passed or num_players), self.max_rounds)
+            self.next_to_play = following
+
+    def start(self):
+        self.activate()
+        for _ in self.turns():
+            if self.slow_down:
+                sleep(3)
+
+    @property
+    def winner(self) -> "Player":
+        """
+        the last player standing, or the one with the most assets if the game was cut off
+        """
+        # from the game's own properties rather than `Property.instances`, which are only this
+        # game's while it's active
+        mortgage_values = defaultdict(int)
+        for property in self.properties:
+            if property.owner is not None:
+                mortgage_values[id(property.owner)] += property.mortgage_cost
+        return max(
+            self.active_players,
+            key=lambda player: player.money + mortgage_values[id(player)],
+        )
+
+    def get_space_counters(self) -> dict:
+        """
+        counter name -> value per space (see `SpaceCounters`)
+        """
+        return self.counters.get_totals(self.rounds)
+
+    def get_rounds_played_per_player(self):
+        return self.rounds / len(self._players)
+
+    def end(self):
+        if Game.current is self:
+            self.bank = Bank.get_state()
+            Game.current = None
+            Board.restore()
+            Board.use_edition()
+        self.recorder = None
+        self.dice = None
+        # the references between players and properties that would keep them alive in a cycle
+        for player in self._players:
+            player.monopolies = []
+            player.pending_decision = None
+            player.next_player = player.previous_player = None
+        self.first_player = self.next_to_play = None
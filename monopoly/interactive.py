@@ -0,0 +1,32 @@
+"""
+The decisions a person playing makes in their own time: the game stops and waits for them
+(see `AskThePlayer` and server.py). Simulations never make any, so this isn't loaded for them.
+"""
+from monopoly.core import Decision
+
+
+class PendingBuyDecision(Decision):
+    """
+    returned by a BuyDecision that can't decide on the spot (e.g. it's waiting for a person);
+    the game carries on once somebody calls `resolve`
+    """
+
+    def __init__(self, property_: "Property", player: "Player"):
+        self.property = property_
+        self.player = player
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} {self.player} {self.property}>"
+
+    def resolve(self, buy: bool):
+        self.player.pending_decision = None
+        if buy:
+            print(f"{self.player} will buy {self.property}")
+            self.player.buy(self.property)
+        else:
+            print(f"{self.player} decided not to buy {self.property}")
+
+
+class GetOutOfJailDecision(Decision):
+    def __init__(self, player: "Player"):
+        pass
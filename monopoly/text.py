@@ -0,0 +1,45 @@
+"""
+What the cards say, in every language they've been written in. Nothing in a game needs it, so
+it's only loaded to show a card to somebody.
+"""
+from monopoly.core import BACKUP_LANGUAGE, LANGUAGE
+
+CARD_TEXT = {
+    "ElectedPresidentCard": {
+        "français": "Vous avez été elu president du conseil d'administration. Versez M50 à "
+        "chaque joueur."
+    },
+    "GetOutOfJailFreeCard": {
+        "français": "Vous êtes libéré de prison. Cette carte peut être conservée jusqu'à ce "
+        "qu'elle soit utilisée ou vendue. "
+    },
+    "GoToJailCard": {
+        "français": "Allez en prison. Avancez tout droit en prison. Ne passez pas par la case "
+        "départ. Ne recevez pas M200. "
+    },
+    "AdvanceThreeSpacesCard": {"français": "Reculez de trois cases."},
+    "GoToClosestRailroadCard": {
+        "français": "Avancez jusqu'à le chemin de fer le plus proche."
+    },
+    "GoToBernPlaceFederaleCard": {
+        "français": "Avancez jusqu'a Bern Place Federale. Si vous passez par la case départ, "
+        "vous touchez la prime habituelle de M200. "
+    },
+    "BuildingAndLoanMaturesCard": {
+        "français": "Votre immeuble et votre pret rapportent. Vous devez toucher M150.",
+        "English": "Your building and loan matures. Collect M150.",
+    },
+    "SpeedingCard": {"français": "Amende pour excès de vitesse. Payez M15."},
+    "RepairPropertyCard": {
+        "français": "Vous faites des réparations sur toutes vos propriétés: Versez M25"
+        " pour chaque maison M100 pour Chaque hôtel que vous possédez"
+    },
+}
+
+
+def get_card_text(card, language=LANGUAGE) -> str:
+    """
+    the card's text in `language`, or in the backup language, or its name
+    """
+    text = CARD_TEXT.get(card.__name__, {})
+    return text.get(language) or text.get(BACKUP_LANGUAGE) or card.__name__
@@ -0,0 +1,274 @@
+"""
+Search for strong `ParametricBuyDecision` parameters instead of writing strategy classes by hand.
+
+Candidates are scored by how often they win when they play against players using the default
+parameters. The search is a separable (diagonal-covariance) evolution strategy in the spirit of
+CMA-ES, working in parameter space normalized to [0, 1]:
+
+- every generation samples `population_size` candidates around the current mean
+- candidates are raced on the same seeds, in rungs of doubling size; only the better half of each
+  rung goes on to the next one, so bad candidates are dropped after a handful of games
+- every (candidate, seed) result is kept, so candidates that come up again cost nothing
+- the mean and per-parameter step sizes move toward the best half of the population
+- the whole state is written to a JSON checkpoint after every generation, so a run can be
+  stopped and resumed
+
+Games run in batches on a process pool.
+"""
+import json
+import math
+import os
+import random
+import sys
+from contextlib import redirect_stdout
+from multiprocessing import Pool
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from buy_decision_algos import ParametricBuyDecision
+from monopoly import Game
+from simulate import silence
+
+Vector = Tuple[float, ...]
+
+# normalized coordinates are rounded to this grid so that near-identical candidates share results
+GRID = 1_000
+
+
+def to_params(normalized: Sequence[float]) -> Vector:
+    return tuple(
+        low + x * (high - low)
+        for x, (_, low, high, _) in zip(normalized, ParametricBuyDecision.parameters)
+    )
+
+
+def to_normalized(params: Sequence[float]) -> Vector:
+    return tuple(
+        (x - low) / (high - low)
+        for x, (_, low, high, _) in zip(params, ParametricBuyDecision.parameters)
+    )
+
+
+def snap(normalized: Sequence[float]) -> Vector:
+    return tuple(round(min(1.0, max(0.0, x)) * GRID) / GRID for x in normalized)
+
+
+def play_seat(params: Vector, seed: int, num_players: int, max_rounds: int) -> int:
+    """
+    1 if a player using `params` beats default players in the game with this seed, else 0
+    """
+    random.seed(seed)
+    candidate_seat = seed % num_players
+    seats = [
+        ParametricBuyDecision.from_vector(params)
+        if seat == candidate_seat
+        else ParametricBuyDecision()
+        for seat in range(num_players)
+    ]
+    game = Game(num_players, ParametricBuyDecision, seats=seats, max_rounds=max_rounds)
+    won = game.winner is game._players[candidate_seat]
+    game.end()
+    return int(won)
+
+
+def evaluate_batch(task) -> Tuple[Vector, List[Tuple[int, int]]]:
+    normalized, seeds, num_players, max_rounds = task
+    params = to_params(normalized)
+    return normalized, [(seed, play_seat(params, seed, num_players, max_rounds)) for seed in seeds]
+
+
+class Optimizer:
+    def __init__(
+        self,
+        population_size=12,
+        num_games=64,
+        first_rung_games=8,
+        num_players=4,
+        max_rounds=500,
+        processes=None,
+        checkpoint_path=None,
+        seed=0,
+        batch_size=8,
+    ):
+        self.population_size = population_size
+        self.num_games = num_games
+        self.first_rung_games = first_rung_games
+        self.num_players = num_players
+        self.max_rounds = max_rounds
+        self.processes = processes
+        self.checkpoint_path = checkpoint_path
+        self.batch_size = batch_size
+        # every candidate plays the same seeds
+        self.seeds = list(range(seed * 1_000_000, seed * 1_000_000 + num_games))
+        self.rng = random.Random(seed)
+
+        self.generation = 0
+        self.mean = snap(to_normalized([d for _, _, _, d in ParametricBuyDecision.parameters]))
+        self.sigmas = [0.25] * len(self.mean)
+        self.best: Optional[Tuple[Vector, float]] = None
+        # normalized candidate -> {seed: won}
+        self.evaluations: Dict[Vector, Dict[int, int]] = {}
+        self.games_played = 0
+        self.games_reused = 0
+
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            self.load()
+
+    @property
+    def best_strategy(self) -> Optional[ParametricBuyDecision]:
+        if self.best is None:
+            return None
+        return ParametricBuyDecision.from_vector(to_params(self.best[0]))
+
+    def sample(self) -> List[Vector]:
+        return [
+            snap(m + s * self.rng.gauss(0, 1) for m, s in zip(self.mean, self.sigmas))
+            for _ in range(self.population_size)
+        ]
+
+    def win_rate(self, candidate: Vector, num_games: int) -> float:
+        results = self.evaluations[candidate]
+        return sum(results[seed] for seed in self.seeds[:num_games]) / num_games
+
+    def play(self, pool, candidates: List[Vector], num_games: int):
+        seeds = self.seeds[:num_games]
+        tasks = []
+        for candidate in candidates:
+            done = self.evaluations.setdefault(candidate, {})
+            to_play = [seed for seed in seeds if seed not in done]
+            self.games_reused += len(seeds) - len(to_play)
+            for start in range(0, len(to_play), self.batch_size):
+                tasks.append(
+                    (
+                        candidate,
+                        to_play[start:start + self.batch_size],
+                        self.num_players,
+                        self.max_rounds,
+                    )
+                )
+        if pool:
+            self.collect(pool.imap_unordered(evaluate_batch, tasks))
+            return
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            self.collect(map(evaluate_batch, tasks))
+
+    def collect(self, batches):
+        for candidate, results in batches:
+            self.games_played += len(results)
+            self.evaluations[candidate].update(results)
+
+    def race(self, pool, candidates: List[Vector]) -> List[Tuple[Vector, float]]:
+        """
+        successive halving: returns the candidates best first, ranked by the furthest rung they
+        reached, then by win rate
+        """
+        ranked = []
+        alive = list(dict.fromkeys(candidates))
+        num_games = min(self.first_rung_games, self.num_games)
+        while True:
+            self.play(pool, alive, num_games)
+            scored = sorted(
+                ((c, self.win_rate(c, num_games)) for c in alive),
+                key=lambda pair: pair[1],
+                reverse=True,
+            )
+            if num_games >= self.num_games:
+                return scored + ranked
+            if len(scored) <= 1:
+                # the last one standing still plays every seed, to be in the running for best
+                num_games = self.num_games
+                continue
+            keep = max(1, len(scored) // 2)
+            ranked = scored[keep:] + ranked
+            alive = [c for c, _ in scored[:keep]]
+            num_games = min(self.num_games, num_games * 2)
+
+    def update(self, ranked: List[Tuple[Vector, float]]):
+        num_parents = max(1, len(ranked) // 2)
+        weights = [math.log(num_parents + 0.5) - math.log(i + 1) for i in range(num_parents)]
+        total = sum(weights)
+        weights = [w / total for w in weights]
+        parents = [c for c, _ in ranked[:num_parents]]
+
+        old_mean = self.mean
+        self.mean = snap(
+            sum(w * p[i] for w, p in zip(weights, parents)) for i in range(len(old_mean))
+        )
+        learning_rate = 0.3
+        for i, sigma in enumerate(self.sigmas):
+            spread = math.sqrt(sum(w * (p[i] - old_mean[i]) ** 2 for w, p in zip(weights, parents)))
+            self.sigmas[i] = min(0.5, max(0.01, (1 - learning_rate) * sigma + learning_rate * spread))
+
+    def step(self, pool=None):
+        candidates = self.sample()
+        if self.best is not None:
+            candidates[0] = self.best[0]
+        ranked = self.race(pool, candidates)
+        full = [(c, score) for c, score in ranked if len(self.evaluations[c]) >= self.num_games]
+        if full and (self.best is None or full[0][1] >= self.best[1]):
+            self.best = full[0]
+        self.update(ranked)
+        self.generation += 1
+        self.save()
+        if self.best is None:
+            print(
+                f"generation {self.generation}: no candidate has played every seed yet, "
+                f"played {self.games_played}, reused {self.games_reused}"
+            )
+            return
+        print(
+            f"generation {self.generation}: best {self.best_strategy} "
+            f"wins {self.best[1]:.0%}, played {self.games_played}, reused {self.games_reused}"
+        )
+
+    def run(self, generations: int):
+        if self.processes == 1:
+            for _ in range(generations):
+                self.step()
+            return self.best_strategy
+        with Pool(self.processes, initializer=silence) as pool:
+            for _ in range(generations):
+                self.step(pool)
+        return self.best_strategy
+
+    def save(self):
+        if not self.checkpoint_path:
+            return
+        state = {
+            "generation": self.generation,
+            "mean": self.mean,
+            "sigmas": self.sigmas,
+            "best": self.best,
+            "rng": self.rng.getstate(),
+            "games_played": self.games_played,
+            "games_reused": self.games_reused,
+            "evaluations": [
+                [list(candidate), sorted(results.items())]
+                for candidate, results in self.evaluations.items()
+            ],
+        }
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def load(self):
+        with open(self.checkpoint_path) as f:
+            state = json.load(f)
+        self.generation = state["generation"]
+        self.mean = tuple(state["mean"])
+        self.sigmas = state["sigmas"]
+        if state["best"] is not None:
+            self.best = (tuple(state["best"][0]), state["best"][1])
+        version, internal_state, gauss_next = state["rng"]
+        self.rng.setstate((version, tuple(internal_state), gauss_next))
+        self.games_played = state["games_played"]
+        self.games_reused = state["games_reused"]
+        self.evaluations = {
+            tuple(candidate): {seed: won for seed, won in results}
+            for candidate, results in state["evaluations"]
+        }
+
+
+if __name__ == "__main__":
+    optimizer = Optimizer(checkpoint_path="optimize_checkpoint.json")
+    print(optimizer.run(generations=int(sys.argv[1]) if len(sys.argv) > 1 else 20))
@@ -0,0 +1,361 @@
+"""
+Compare buy decision algorithms from the results of every game they played: the mean of every
+attribute with a bootstrap confidence interval, per algorithm and number of players, and the
+difference of every algorithm from a baseline, with its confidence interval, a significance
+test and an effect size.
+
+    report = Report()
+    report.add("BuyEverything", 4, {"get_rounds_played_per_player": rounds})
+    report.add("BuyIfHaveThreeTimesPrice", 4, {"get_rounds_played_per_player": other_rounds})
+    report.print_tables()
+    report.save("report.json")
+
+Where two algorithms played the same seeds, one game each (as `play_x_games` plays them), the
+games are paired: the difference is the mean of the per-seed differences, tested with a paired
+test, and its effect size is that mean over their standard deviation (Cohen's d_z). Otherwise
+they're compared as independent samples, with Welch's test and Cohen's d over the pooled
+standard deviation. The p-values take the test statistics as normal, which they are for as many
+games as a simulation plays.
+
+The bootstrap never resamples the games themselves: resampling n games with replacement draws
+how many times every distinct result comes up from a multinomial distribution, so every
+resample is a draw of one count per distinct result (the number of rounds a game lasts only
+takes a few hundred values), however many games there are. Results with more than
+`max_distinct` distinct values are first sorted into that many bins of as many games, each
+standing for the mean of its games, which leaves out the little variance there is within a bin.
+"""
+import json
+import math
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+RESAMPLES = 2_000
+CONFIDENCE = 0.95
+MAX_DISTINCT = 4_096
+# resamples drawn at once, to keep the counts drawn small
+RESAMPLES_PER_DRAW = 256
+
+Cell = Tuple[str, int]
+
+
+def get_distinct(
+    values: np.ndarray, max_distinct=MAX_DISTINCT
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    the distinct values and how many times each comes up, or the means of `max_distinct` bins
+    and their sizes where there are more
+    """
+    distinct, counts = np.unique(values, return_counts=True)
+    if len(distinct) <= max_distinct:
+        return distinct.astype(np.float64), counts
+    ordered = np.sort(values).astype(np.float64)
+    starts = np.linspace(0, len(ordered), max_distinct, endpoint=False).astype(np.int64)
+    sizes = np.diff(np.append(starts, len(ordered)))
+    return np.add.reduceat(ordered, starts) / sizes, sizes
+
+
+def bootstrap_means(
+    values: np.ndarray,
+    resamples=RESAMPLES,
+    rng: Optional[np.random.Generator] = None,
+    max_distinct=MAX_DISTINCT,
+) -> np.ndarray:
+    """
+    the means of `resamples` resamples of `values`
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    values = np.asarray(values)
+    distinct, counts = get_distinct(values, max_distinct)
+    probabilities = counts / len(values)
+    means = np.empty(resamples)
+    for first in range(0, resamples, RESAMPLES_PER_DRAW):
+        last = min(first + RESAMPLES_PER_DRAW, resamples)
+        drawn = rng.multinomial(len(values), probabilities, size=last - first)
+        means[first:last] = drawn @ distinct / len(values)
+    return means
+
+
+def get_interval(means: np.ndarray, confidence=CONFIDENCE) -> Tuple[float, float]:
+    """
+    the percentile interval of bootstrapped means
+    """
+    tail = (1 - confidence) / 2
+    low, high = np.quantile(means, (tail, 1 - tail))
+    return float(low), float(high)
+
+
+def get_p_value(difference: float, standard_error: float) -> float:
+    """
+    two-sided, taking the difference over its standard error as normal
+    """
+    if standard_error == 0:
+        return 1.0 if difference == 0 else 0.0
+    return math.erfc(abs(difference / standard_error) / math.sqrt(2))
+
+
+def get_effect_size(difference: float, std_dev: float) -> float:
+    if std_dev == 0:
+        return 0.0 if difference == 0 else math.copysign(math.inf, difference)
+    return difference / std_dev
+
+
+class Summary:
+    def __init__(
+        self, name: str, num_players: int, attr: str, values: np.ndarray, interval
+    ):
+        self.name = name
+        self.num_players = num_players
+        self.attr = attr
+        self.games = len(values)
+        self.mean = float(values.mean())
+        self.std_dev = float(values.std(ddof=1)) if self.games > 1 else 0.0
+        self.low, self.high = interval
+
+    def __repr__(self):
+        return (
+            f"<{self.__class__.__name__} {self.name} num_players={self.num_players} "
+            f"{self.attr} mean={self.mean:.3f}>"
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "algorithm": self.name,
+            "num_players": self.num_players,
+            "attr": self.attr,
+            "games": self.games,
+            "mean": self.mean,
+            "std_dev": self.std_dev,
+            "low": self.low,
+            "high": self.high,
+        }
+
+
+class Comparison:
+    """
+    `name`'s results less `baseline_name`'s
+    """
+
+    def __init__(
+        self,
+        name: str,
+        baseline_name: str,
+        num_players: int,
+        attr: str,
+        paired: bool,
+        difference: float,
+        interval: Tuple[float, float],
+        p_value: float,
+        effect_size: float,
+    ):
+        self.name = name
+        self.baseline_name = baseline_name
+        self.num_players = num_players
+        self.attr = attr
+        self.paired = paired
+        self.difference = difference
+        self.low, self.high = interval
+        self.p_value = p_value
+        self.effect_size = effect_size
+
+    def __repr__(self):
+        return (
+            f"<{self.__class__.__name__} {self.name} - {self.baseline_name} "
+            f"num_players={self.num_players} {self.attr} difference={self.difference:+.3f}>"
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "algorithm": self.name,
+            "baseline": self.baseline_name,
+            "num_players": self.num_players,
+            "attr": self.attr,
+            "paired": self.paired,
+            "difference": self.difference,
+            "low": self.low,
+            "high": self.high,
+            "p_value": self.p_value,
+            # JSON has no infinity
+            "effect_size": (
+                self.effect_size if math.isfinite(self.effect_size) else None
+            ),
+        }
+
+
+class Report:
+    def __init__(
+        self,
+        resamples=RESAMPLES,
+        confidence=CONFIDENCE,
+        seed=0,
+        max_distinct=MAX_DISTINCT,
+    ):
+        self.resamples = resamples
+        self.confidence = confidence
+        self.seed = seed
+        self.max_distinct = max_distinct
+        # (algorithm name, num_players) -> attribute -> the result of every game
+        self.results: Dict[Cell, Dict[str, np.ndarray]] = {}
+        # the bootstrapped means, per cell and attribute
+        self.means: Dict[Tuple[Cell, str], np.ndarray] = {}
+
+    def add(self, name: str, num_players: int, results: Dict[str, object]):
+        """
+        the results of every game `name` played with `num_players` players, per attribute, in
+        the order of their seeds
+        """
+        self.results[name, num_players] = {
+            attr: np.asarray(values, dtype=np.float64)
+            for attr, values in results.items()
+        }
+
+    @property
+    def names(self) -> List[str]:
+        return list(dict.fromkeys(name for name, _ in self.results))
+
+    @property
+    def player_counts(self) -> List[int]:
+        return sorted({num_players for _, num_players in self.results})
+
+    def get_rng(self, *key) -> np.random.Generator:
+        # a stream of its own per resampled set of results, whatever order they're asked for in
+        return np.random.default_rng([self.seed, zlib.crc32(repr(key).encode())])
+
+    def get_means(self, cell: Cell, attr: str) -> np.ndarray:
+        means = self.means.get((cell, attr))
+        if means is None:
+            means = self.means[cell, attr] = bootstrap_means(
+                self.results[cell][attr],
+                self.resamples,
+                self.get_rng(*cell, attr),
+                self.max_distinct,
+            )
+        return means
+
+    def get_summaries(self) -> List[Summary]:
+        return [
+            Summary(
+                name,
+                num_players,
+                attr,
+                values,
+                get_interval(
+                    self.get_means((name, num_players), attr), self.confidence
+                ),
+            )
+            for (name, num_players), attrs in self.results.items()
+            for attr, values in attrs.items()
+        ]
+
+    def compare(
+        self, name: str, baseline_name: str, num_players: int, attr: str, paired=True
+    ):
+        """
+        paired where both played as many games, unless not `paired`
+        """
+        cell, baseline_cell = (name, num_players), (baseline_name, num_players)
+        values, baseline = self.results[cell][attr], self.results[baseline_cell][attr]
+        difference = float(values.mean() - baseline.mean())
+        paired = paired and len(values) == len(baseline)
+        if paired:
+            differences = values - baseline
+            std_dev = float(differences.std(ddof=1)) if len(differences) > 1 else 0.0
+            standard_error = std_dev / math.sqrt(len(differences))
+            means = bootstrap_means(
+                differences,
+                self.resamples,
+                self.get_rng(name, baseline_name, num_players, attr),
+                self.max_distinct,
+            )
+        else:
+            variances = [
+                float(v.var(ddof=1)) if len(v) > 1 else 0.0 for v in (values, baseline)
+            ]
+            standard_error = math.sqrt(
+                variances[0] / len(values) + variances[1] / len(baseline)
+            )
+            std_dev = math.sqrt(
+                (variances[0] * (len(values) - 1) + variances[1] * (len(baseline) - 1))
+                / max(1, len(values) + len(baseline) - 2)
+            )
+            means = self.get_means(cell, attr) - self.get_means(baseline_cell, attr)
+        return Comparison(
+            name,
+            baseline_name,
+            num_players,
+            attr,
+            paired,
+            difference,
+            get_interval(means, self.confidence),
+            get_p_value(difference, standard_error),
+            get_effect_size(difference, std_dev),
+        )
+
+    def get_comparisons(self, baseline_name=None, paired=True) -> List[Comparison]:
+        """
+        every other algorithm against `baseline_name` (the first added), per number of players
+        they both played and attribute
+        """
+        names = self.names
+        baseline_name = baseline_name or names[0]
+        return [
+            self.compare(name, baseline_name, num_players, attr, paired)
+            for num_players in self.player_counts
+            if (baseline_name, num_players) in self.results
+            for name in names
+            if name != baseline_name and (name, num_players) in self.results
+            for attr in self.results[name, num_players]
+            if attr in self.results[baseline_name, num_players]
+        ]
+
+    def print_tables(self, baseline_name=None, paired=True):
+        level = f"{self.confidence:.0%}"
+        print(
+            f"{'algorithm':<45} {'players':>7} {'attr':<30} {'games':>8} "
+            f"{'mean':>10} {'stdev':>10} {level + ' interval':>22}"
+        )
+        for summary in self.get_summaries():
+            print(
+                f"{summary.name:<45} {summary.num_players:>7} {summary.attr:<30} "
+                f"{summary.games:>8} {summary.mean:>10.3f} {summary.std_dev:>10.3f} "
+                f"{f'[{summary.low:.3f}, {summary.high:.3f}]':>22}"
+            )
+        comparisons = (
+            self.get_comparisons(baseline_name, paired) if len(self.names) > 1 else []
+        )
+        if not comparisons:
+            return
+        print()
+        print(
+            f"{'algorithm - baseline':<70} {'players':>7} {'attr':<30} {'difference':>10} "
+            f"{level + ' interval':>22} {'p':>8} {'effect':>7}"
+        )
+        for comparison in comparisons:
+            print(
+                f"{comparison.name + ' - ' + comparison.baseline_name:<70} "
+                f"{comparison.num_players:>7} {comparison.attr:<30} "
+                f"{comparison.difference:>+10.3f} "
+                f"{f'[{comparison.low:+.3f}, {comparison.high:+.3f}]':>22} "
+                f"{comparison.p_value:>8.2g} {comparison.effect_size:>+7.2f}"
+                f"{'' if comparison.paired else ' (unpaired)'}"
+            )
+
+    def to_dict(self, baseline_name=None, paired=True) -> dict:
+        return {
+            "resamples": self.resamples,
+            "confidence": self.confidence,
+            "summaries": [summary.to_dict() for summary in self.get_summaries()],
+            "comparisons": [
+                comparison.to_dict()
+                for comparison in (
+                    self.get_comparisons(baseline_name, paired)
+                    if len(self.names) > 1
+                    else []
+                )
+            ],
+        }
+
+    def save(self, path: str, baseline_name=None, paired=True):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(baseline_name, paired), f, indent=2)
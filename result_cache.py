@@ -0,0 +1,249 @@
+"""
+An on-disk cache of simulation results, so that a (buy decision algorithm, number of players,
+seed range) cell that's already been played somewhere comes back without replaying any games.
+
+Entries are content-addressed: the key is a hash of everything that determines the results
+
+- the engine's source (monopoly/, editions.py and friends), so any rule change invalidates
+  everything
+- the board: every space, its prices and rent table, and the contents of the decks
+- the buy decision algorithm's source and parameters
+- the number of players, the seeds, the attributes collected and the round limit
+
+Entries are JSON files named after their key. The cache is bounded by size: reading an entry
+touches its modification time, and when a write takes the cache over `max_bytes` the entries that
+were used least recently are deleted. An entry that can't be read back (a disk that filled up, a
+crash in another process) is deleted and played again.
+"""
+import hashlib
+import inspect
+import json
+import os
+import random
+from collections import OrderedDict, defaultdict
+from contextlib import redirect_stdout
+from types import FunctionType
+from typing import Dict, List, Optional, Sequence
+
+import editions
+import exceptions
+import liquidation
+import monopoly.core
+import monopoly.interactive
+from monopoly import Board, ChanceDeck, CommunityChestDeck, Game, MAX_ROUNDS
+from simulate import get_results
+
+ENGINE_MODULES = (
+    monopoly.core,
+    monopoly.interactive,
+    editions,
+    liquidation,
+    exceptions,
+)
+GAME_STATE = ("owner", "mortgaged", "buildings", "instances", "by_type")
+
+
+def describe(value) -> str:
+    """
+    a stable description of `value`, i.e. without memory addresses in it
+    """
+    if isinstance(value, dict):
+        return (
+            "{"
+            + ", ".join(
+                f"{describe(k)}: {describe(v)}"
+                for k, v in sorted(value.items(), key=lambda kv: repr(kv[0]))
+            )
+            + "}"
+        )
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(describe(v) for v in value) + "]"
+    if isinstance(value, type):
+        return value.__qualname__
+    if callable(value):
+        return value.__code__.co_code.hex() + describe(value.__code__.co_consts[1:])
+    return repr(value)
+
+
+def describe_space(space) -> str:
+    """
+    the space's data attributes, including the ones it inherits (`Railroad.rent`, ...), but not
+    the state of the current game
+    """
+    class_ = space if isinstance(space, type) else type(space)
+    attributes = {}
+    for ancestor in reversed(class_.__mro__):
+        for name, value in vars(ancestor).items():
+            if name.startswith("__") or isinstance(
+                value, (classmethod, staticmethod, property, FunctionType)
+            ):
+                continue
+            attributes[name] = value
+    if not isinstance(space, type):
+        attributes.update(vars(space))
+    for name in GAME_STATE:
+        attributes.pop(name, None)
+    return describe(class_) + describe(attributes)
+
+
+def get_board_fingerprint() -> str:
+    parts = [describe_space(space) for space in Board.template]
+    for deck in (ChanceDeck, CommunityChestDeck):
+        cards = sorted(deck.cards, key=lambda card: card.__qualname__)
+        parts.append(
+            describe(deck)
+            + describe([(card, getattr(card, "kwarg", None)) for card in cards])
+        )
+    return "\n".join(parts)
+
+
+def get_engine_fingerprint() -> str:
+    return "\n".join(inspect.getsource(module) for module in ENGINE_MODULES)
+
+
+def get_algorithm_fingerprint(buy_decision_algorithm) -> str:
+    if isinstance(buy_decision_algorithm, type):
+        return inspect.getsource(buy_decision_algorithm)
+    return inspect.getsource(type(buy_decision_algorithm)) + describe(
+        vars(buy_decision_algorithm)
+    )
+
+
+def play(
+    buy_decision_algorithm,
+    num_players: int,
+    seeds: Sequence[int],
+    attrs_to_get,
+    max_rounds,
+) -> Dict[str, List]:
+    results = defaultdict(list)
+    for seed in seeds:
+        random.seed(seed)
+        if isinstance(buy_decision_algorithm, type):
+            game = Game(num_players, buy_decision_algorithm, max_rounds=max_rounds)
+        else:
+            game = Game(
+                num_players,
+                type(buy_decision_algorithm),
+                seats=[buy_decision_algorithm] * num_players,
+                max_rounds=max_rounds,
+            )
+        get_results(results, game, attrs_to_get)
+        game.end()
+    return dict(results)
+
+
+class ResultCache:
+    def __init__(self, directory, max_bytes=256 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        # the engine and the board are hashed once; change them and you get a new process anyway
+        self.rules_digest = hashlib.sha256(
+            (get_engine_fingerprint() + get_board_fingerprint()).encode()
+        ).hexdigest()
+        # key -> size, least recently used first
+        self.entries: "OrderedDict[str, int]" = OrderedDict()
+        paths = [
+            os.path.join(directory, name)
+            for name in os.listdir(directory)
+            if name.endswith(".json")
+        ]
+        for path in sorted(paths, key=os.path.getmtime):
+            self.entries[os.path.basename(path)[: -len(".json")]] = os.path.getsize(
+                path
+            )
+        self.size = sum(self.entries.values())
+
+    def get_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get_key(
+        self,
+        buy_decision_algorithm,
+        num_players: int,
+        seeds: range,
+        attrs_to_get=("get_rounds_played_per_player",),
+        max_rounds=MAX_ROUNDS,
+    ) -> str:
+        cell = json.dumps(
+            [
+                num_players,
+                seeds.start,
+                seeds.stop,
+                seeds.step,
+                list(attrs_to_get),
+                max_rounds,
+            ]
+        )
+        digest = hashlib.sha256(self.rules_digest.encode())
+        digest.update(get_algorithm_fingerprint(buy_decision_algorithm).encode())
+        digest.update(cell.encode())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, List]]:
+        path = self.get_path(key)
+        try:
+            with open(path) as f:
+                results = json.load(f)
+        except FileNotFoundError:
+            self.entries.pop(key, None)
+            self.misses += 1
+            return None
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            self.remove(key)
+            self.misses += 1
+            return None
+        os.utime(path)
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return results
+
+    def put(self, key: str, results: Dict[str, List]):
+        path = self.get_path(key)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(results, f)
+        os.replace(tmp_path, path)
+        self.size -= self.entries.pop(key, 0)
+        self.entries[key] = os.path.getsize(path)
+        self.size += self.entries[key]
+        self.evict()
+
+    def remove(self, key: str):
+        try:
+            os.remove(self.get_path(key))
+        except FileNotFoundError:
+            pass
+        self.size -= self.entries.pop(key, 0)
+
+    def evict(self):
+        while self.size > self.max_bytes and len(self.entries) > 1:
+            self.remove(next(iter(self.entries)))
+            self.evictions += 1
+
+    def play(
+        self,
+        buy_decision_algorithm,
+        num_players: int,
+        seeds: range,
+        attrs_to_get=("get_rounds_played_per_player",),
+        max_rounds=MAX_ROUNDS,
+    ) -> Dict[str, List]:
+        """
+        the per-game results of this cell, from the cache if they're in it
+        """
+        key = self.get_key(
+            buy_decision_algorithm, num_players, seeds, attrs_to_get, max_rounds
+        )
+        results = self.get(key)
+        if results is None:
+            with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+                results = play(
+                    buy_decision_algorithm, num_players, seeds, attrs_to_get, max_rounds
+                )
+            self.put(key, results)
+        return results
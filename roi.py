@@ -0,0 +1,145 @@
+"""
+Which spaces and color groups pay off: per-space tables and heatmaps from the counters of games
+played with `Game(counters=True)` (see `SpaceCounters`).
+
+A sweep collects them if "space_counters" is one of its `attrs_to_get`: every counter of every
+space becomes an attribute of its own ("rent[12]"), aggregated like the rest, so the tables
+come from the sweep's results:
+
+    sweep = Sweep("sweep.jsonl", attrs_to_get=("get_rounds_played_per_player", SPACE_COUNTERS))
+    sweep.run(num_games=1000, num_players=[4])
+    table = SpaceTable.from_results(sweep.results()[("BuyEverything", 4)])
+    table.print_table()
+    table.print_heatmap("rent")
+
+The return on a property is the rent it brought in over what was paid for it and its
+buildings; rent per turn owned shows how fast it pays, whatever the turn it was bought on.
+"""
+import re
+import statistics
+from collections import defaultdict
+from typing import Dict, Iterable, List
+
+from monopoly import Board, Property, SpaceCounters
+
+SPACE_COUNTERS = "space_counters"
+SHADES = " ░▒▓█"
+HEATMAP_WIDTH = 40
+ATTR = re.compile(r"(\w+)\[(\d+)\]$")
+
+
+def flatten(totals: Dict[str, list]) -> Dict[str, float]:
+    """
+    `Game.get_space_counters()` as an attribute per counter and space
+    """
+    return {
+        f"{name}[{index}]": value
+        for name, values in totals.items()
+        for index, value in enumerate(values)
+    }
+
+
+def get_name(space) -> str:
+    return str(space) if isinstance(space, Property) else type(space).__name__
+
+
+def get_roi(rent: float, spent: float) -> float:
+    return rent / spent if spent else 0.0
+
+
+class SpaceTable:
+    """
+    the mean of every counter for every space, over a number of games
+    """
+
+    def __init__(self, means: Dict[str, List[float]], num_games: int):
+        self.means = means
+        self.num_games = num_games
+        self.spaces = Board.template
+
+    @classmethod
+    def from_games(cls, totals: Iterable[Dict[str, list]]) -> "SpaceTable":
+        """
+        from the `get_space_counters()` of every game
+        """
+        totals = list(totals)
+        means = {
+            name: [
+                statistics.fmean(values) for values in zip(*(t[name] for t in totals))
+            ]
+            for name in SpaceCounters.NAMES
+        }
+        return cls(means, len(totals))
+
+    @classmethod
+    def from_results(cls, results: Dict[str, tuple]) -> "SpaceTable":
+        """
+        from a cell of `Sweep.results()`: attribute -> (count, mean, standard deviation)
+        """
+        means = {name: [0.0] * len(Board.template) for name in SpaceCounters.NAMES}
+        num_games = 0
+        for attr, (count, mean, _) in results.items():
+            match = ATTR.match(attr)
+            if match is None or match[1] not in means:
+                continue
+            means[match[1]][int(match[2])] = mean
+            num_games = count
+        return cls(means, num_games)
+
+    def get_rows(self) -> List[dict]:
+        """
+        a row per property, in board order
+        """
+        rows = []
+        for index, space in enumerate(self.spaces):
+            if not isinstance(space, Property):
+                continue
+            row = {name: values[index] for name, values in self.means.items()}
+            row["index"] = index
+            row["name"] = get_name(space)
+            row["group"] = space.type
+            rows.append(row)
+        return rows
+
+    def get_groups(self) -> Dict[str, dict]:
+        """
+        the rows of each group, summed
+        """
+        groups = defaultdict(lambda: dict.fromkeys(SpaceCounters.NAMES, 0.0))
+        for row in self.get_rows():
+            for name in SpaceCounters.NAMES:
+                groups[row["group"]][name] += row[name]
+        return dict(groups)
+
+    def print_table(self):
+        print(f"per game, over {self.num_games} games")
+        header = (
+            f"{'':>3} {'space':<32}{'landings':>9}{'rent':>9}{'price':>8}"
+            f"{'buildings':>10}{'owned':>8}{'ROI':>7}{'rent/turn':>10}"
+        )
+        print(header)
+        rows = [(f"{row['index']:>3}", row["name"], row) for row in self.get_rows()]
+        rows += [("", f"[{group}]", row) for group, row in self.get_groups().items()]
+        for index, name, row in rows:
+            owned = row["turns_owned"]
+            print(
+                f"{index:>3} {name[:31]:<32}{row['landings']:>9.2f}{row['rent']:>9.1f}"
+                f"{row['purchase_price']:>8.1f}{row['building_spend']:>10.1f}{owned:>8.1f}"
+                f"{get_roi(row['rent'], row['purchase_price'] + row['building_spend']):>7.2f}"
+                f"{row['rent'] / owned if owned else 0.0:>10.3f}"
+            )
+
+    def print_heatmap(self, counter="landings"):
+        """
+        a bar per space, shaded by how it compares with the busiest one
+        """
+        values = self.means[counter]
+        highest = max(values) or 1
+        print(f"{counter}, per game")
+        for index, (space, value) in enumerate(zip(self.spaces, values)):
+            fraction = value / highest
+            shade = SHADES[min(len(SHADES) - 1, round(fraction * (len(SHADES) - 1)))]
+            print(
+                f"{index:>3} {get_name(space)[:31]:<32}"
+                f"{shade * round(fraction * HEATMAP_WIDTH):<{HEATMAP_WIDTH}} {value:.2f}"
+            )
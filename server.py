@@ -0,0 +1,408 @@
+"""
+Host lots of games at once, for people and bots to play over HTTP or a WebSocket.
+
+Every game is an asyncio task that plays turns until a person has to decide something. Seats
+played by a person use `AskThePlayer`, which makes the engine hand back a `PendingBuyDecision`
+instead of blocking; the task then waits on a future until the decision comes in. A game waiting
+on a person is a suspended coroutine, so it costs memory but no CPU. Bots' turns are played
+straight through, handing control back to the event loop every `TIME_SLICE` seconds so that no
+game starves the others.
+
+Every game has its own copy of the board (see `Game.activate`), and the engine runs without
+ever awaiting, so games can't see each other's state.
+
+HTTP, with JSON bodies:
+
+    POST   /games                   {"players": 4, "humans": [0], "bot": "BuyEverything"}
+    GET    /games/<id>
+    POST   /games/<id>/decisions    {"seat": 0, "buy": true}
+    DELETE /games/<id>
+
+Posting a decision answers once the game has played on to the next decision (or the end). A
+game that's over is ended as soon as it is, and forgotten `FINISHED_TTL` seconds later.
+
+WebSocket, at /games/<id>/ws: the server sends the game's state as a text message when you
+connect and after every move you make; send decisions as text messages shaped like the POST body.
+
+Run it with `python server.py [port]`.
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import struct
+import sys
+from itertools import count
+from time import perf_counter
+from typing import Dict, Optional
+
+import buy_decision_algos
+from buy_decision_algos import AskThePlayer
+from exceptions import NotEnoughPlayers, TooManyPlayers
+from monopoly import Game, MAX_ROUNDS
+from simulate import silence
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+TIME_SLICE = 0.002
+# how long a game that's over can still be read
+FINISHED_TTL = 60.0
+REASONS = {
+    200: "OK",
+    201: "Created",
+    400: "Bad Request",
+    404: "Not Found",
+    409: "Conflict",
+}
+
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def get_int(payload: dict, name: str, default: int) -> int:
+    value = payload.get(name, default)
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise RequestError(400, f"{name} must be an integer")
+    try:
+        return int(value)
+    except ValueError:
+        raise RequestError(400, f"{name} must be an integer")
+
+
+def get_humans(payload: dict, num_players: int) -> list:
+    humans = payload.get("humans", [0])
+    if not isinstance(humans, list) or not all(
+        isinstance(seat, int) and not isinstance(seat, bool) and 0 <= seat < num_players
+        for seat in humans
+    ):
+        raise RequestError(
+            400, f"humans must be a list of seats from 0 to {num_players - 1}"
+        )
+    return humans
+
+
+class Session:
+    def __init__(
+        self,
+        id_,
+        num_players=4,
+        humans=(0,),
+        bot="BuyEverything",
+        max_rounds=MAX_ROUNDS,
+    ):
+        bot_algorithm = getattr(buy_decision_algos, bot, None)
+        if not isinstance(bot_algorithm, type) or bot == "AskThePlayer":
+            raise RequestError(400, f"no such bot: {bot}")
+        self.id = id_
+        self.humans = set(humans)
+        seats = [
+            AskThePlayer() if seat in self.humans else None
+            for seat in range(num_players)
+        ]
+        self.game = Game(
+            num_players,
+            bot_algorithm,
+            seats=seats,
+            max_rounds=max_rounds,
+            autostart=False,
+        )
+        self.turns = self.game.turns()
+        self.pending = None
+        self.answer: Optional[asyncio.Future] = None
+        self.version = 0
+        self.changed = asyncio.Event()
+        self.task = asyncio.ensure_future(self.play())
+
+    async def play(self):
+        game = self.game
+        slice_started = perf_counter()
+        while True:
+            game.activate()
+            player = next(self.turns, None)
+            if player is None:
+                break
+            decision = player.pending_decision
+            if decision is None:
+                if perf_counter() - slice_started > TIME_SLICE:
+                    await asyncio.sleep(0)
+                    slice_started = perf_counter()
+                continue
+            self.pending = decision
+            self.answer = asyncio.get_running_loop().create_future()
+            self.publish()
+            buy = await self.answer
+            slice_started = perf_counter()
+            game.activate()
+            decision.resolve(buy)
+            self.pending = None
+        self.turns = None
+        game.end()
+        self.publish()
+
+    def publish(self):
+        self.version += 1
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+    async def wait_for_change(self, version):
+        while self.version == version:
+            await self.changed.wait()
+
+    def get_seat(self, player) -> int:
+        return self.game._players.index(player)
+
+    @property
+    def state(self) -> dict:
+        game = self.game
+        over = game.is_over
+        state = {
+            "id": self.id,
+            "version": self.version,
+            "rounds": game.rounds,
+            "over": over,
+            "winner": self.get_seat(game.winner) if over else None,
+            "players": [
+                {
+                    "seat": seat,
+                    "name": player.name,
+                    "human": seat in self.humans,
+                    "money": player.money,
+                    "position": player.current_space_index,
+                    "properties": [
+                        index
+                        for index, property_ in enumerate(game.properties)
+                        if property_.owner is player
+                    ],
+                    "bankrupt": player.bankrupt,
+                }
+                for seat, player in enumerate(game._players)
+            ],
+            "pending": None,
+        }
+        if self.pending is not None:
+            state["pending"] = {
+                "seat": self.get_seat(self.pending.player),
+                "property": str(self.pending.property),
+                "cost": self.pending.property.cost,
+            }
+        return state
+
+    async def decide(self, seat: int, buy: bool) -> dict:
+        """
+        answers the pending decision, then waits for the game to get to the next one
+        """
+        if self.pending is None or self.get_seat(self.pending.player) != seat:
+            raise RequestError(409, f"seat {seat} has nothing to decide")
+        version = self.version
+        self.answer.set_result(bool(buy))
+        await self.wait_for_change(version)
+        return self.state
+
+    async def wait_for_turn(self) -> dict:
+        """
+        waits until a person has to decide something or the game is over
+        """
+        while self.pending is None and not self.game.is_over:
+            await self.wait_for_change(self.version)
+        return self.state
+
+    def close(self):
+        self.task.cancel()
+        self.game.end()
+
+
+class GameServer:
+    def __init__(self, finished_ttl=FINISHED_TTL):
+        self.sessions: Dict[int, Session] = {}
+        self.ids = count(1)
+        self.finished_ttl = finished_ttl
+
+    def create(self, **kwargs) -> Session:
+        try:
+            session = Session(next(self.ids), **kwargs)
+        except (NotEnoughPlayers, TooManyPlayers):
+            raise RequestError(400, "a game needs between 2 and 8 players")
+        self.sessions[session.id] = session
+        session.task.add_done_callback(lambda _: self.forget_later(session.id))
+        return session
+
+    def forget_later(self, session_id: int):
+        asyncio.get_running_loop().call_later(
+            self.finished_ttl, self.sessions.pop, session_id, None
+        )
+
+    def get(self, path_id: str) -> Session:
+        try:
+            return self.sessions[int(path_id)]
+        except (KeyError, ValueError):
+            raise RequestError(404, f"no such game: {path_id}")
+
+    async def route(self, method: str, path: str, body: bytes):
+        parts = path.strip("/").split("/")
+        try:
+            payload = json.loads(body) if body else {}
+        except json.JSONDecodeError:
+            raise RequestError(400, "body isn't JSON")
+        if not isinstance(payload, dict):
+            raise RequestError(400, "body isn't a JSON object")
+        if parts == ["games"] and method == "POST":
+            num_players = get_int(payload, "players", 4)
+            max_rounds = get_int(payload, "max_rounds", MAX_ROUNDS)
+            if max_rounds < 1:
+                raise RequestError(400, "max_rounds must be at least 1")
+            session = self.create(
+                num_players=num_players,
+                humans=get_humans(payload, num_players),
+                bot=payload.get("bot", "BuyEverything"),
+                max_rounds=max_rounds,
+            )
+            return 201, await session.wait_for_turn()
+        if len(parts) == 2 and parts[0] == "games":
+            session = self.get(parts[1])
+            if method == "GET":
+                return 200, session.state
+            if method == "DELETE":
+                session.close()
+                del self.sessions[session.id]
+                return 200, {"id": session.id}
+        if len(parts) == 3 and parts[0] == "games" and parts[2] == "decisions":
+            if method == "POST":
+                return 200, await self.get(parts[1]).decide(
+                    get_int(payload, "seat", 0), payload.get("buy", False)
+                )
+        raise RequestError(404, f"no such endpoint: {method} {path}")
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode().split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode().partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                if headers.get("upgrade", "").lower() == "websocket":
+                    await self.websocket(reader, writer, path, headers)
+                    break
+                try:
+                    status, payload = await self.route(method, path, body)
+                except RequestError as e:
+                    status, payload = e.status, {"error": str(e)}
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def websocket(self, reader, writer, path, headers):
+        parts = path.strip("/").split("/")
+        accept = base64.b64encode(
+            hashlib.sha1(
+                (headers["sec-websocket-key"] + WEBSOCKET_GUID).encode()
+            ).digest()
+        ).decode()
+        writer.write(
+            "HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n".encode()
+        )
+        try:
+            if len(parts) != 3 or parts[0] != "games" or parts[2] != "ws":
+                raise RequestError(404, f"no such endpoint: {path}")
+            session = self.get(parts[1])
+            await send_frame(writer, json.dumps(await session.wait_for_turn()))
+            while True:
+                message = await read_frame(reader)
+                if message is None:
+                    break
+                try:
+                    decision = json.loads(message)
+                    if not isinstance(decision, dict):
+                        raise RequestError(400, "message isn't a JSON object")
+                    state = await session.decide(
+                        get_int(decision, "seat", 0), decision.get("buy", False)
+                    )
+                except RequestError as e:
+                    state = {"error": str(e)}
+                except json.JSONDecodeError:
+                    state = {"error": "message isn't JSON"}
+                await send_frame(writer, json.dumps(state))
+        except RequestError as e:
+            await send_frame(writer, json.dumps({"error": str(e)}))
+
+    async def serve(self, host="127.0.0.1", port=8080):
+        return await asyncio.start_server(self.handle, host, port)
+
+
+def encode_frame(message: str, opcode=0x1, mask: bytes = None) -> bytes:
+    data = message.encode()
+    header = bytes([0x80 | opcode])
+    mask_bit = 0x80 if mask else 0
+    if len(data) < 126:
+        header += bytes([mask_bit | len(data)])
+    elif len(data) < 1 << 16:
+        header += bytes([mask_bit | 126]) + struct.pack("!H", len(data))
+    else:
+        header += bytes([mask_bit | 127]) + struct.pack("!Q", len(data))
+    if mask:
+        data = bytes(b ^ mask[i % 4] for i, b in enumerate(data))
+        header += mask
+    return header + data
+
+
+async def send_frame(writer, message: str):
+    writer.write(encode_frame(message))
+    await writer.drain()
+
+
+async def read_frame(reader) -> Optional[str]:
+    """
+    the next text message, or None once the connection is closing
+    """
+    while True:
+        opcode, data = await read_raw_frame(reader)
+        if opcode == 0x8:
+            return None
+        if opcode in (0x1, 0x2):
+            return data.decode()
+        # pings and pongs carry nothing for us; the client will cope without a pong
+
+
+async def read_raw_frame(reader):
+    first, second = await reader.readexactly(2)
+    opcode = first & 0x0F
+    length = second & 0x7F
+    if length == 126:
+        (length,) = struct.unpack("!H", await reader.readexactly(2))
+    elif length == 127:
+        (length,) = struct.unpack("!Q", await reader.readexactly(8))
+    mask = await reader.readexactly(4) if second & 0x80 else None
+    data = await reader.readexactly(length)
+    if mask:
+        data = bytes(b ^ mask[i % 4] for i, b in enumerate(data))
+    return opcode, data
+
+
+async def main(port):
+    silence()
+    server = await GameServer().serve(port=port)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 8080))
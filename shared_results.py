@@ -0,0 +1,161 @@
+"""
+Per-game results of games played in parallel, written by the workers straight into a NumPy
+array in shared memory instead of being pickled back to the parent.
+
+The parent allocates a row per attribute and a column per game before any game is played;
+every work unit is a range of games, and the worker that plays it writes each game's results
+into the game's column. All that comes back over the pool's queue is the range, to say it's
+done, so however many attributes there are, nothing is copied or serialized but a couple of
+ints per unit. The aggregates are worked out on the array itself:
+
+    with play_shared(BuyEverything, 2, range(100_000), processes=8) as results:
+        print(results.get_summary())
+        rounds = results.get("get_rounds_played_per_player")  # a view, not a copy
+
+The shared memory is freed when the results are closed, so copy anything that has to outlive
+them.
+"""
+import random
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from monopoly import Game, MAX_ROUNDS
+from simulate import silence
+
+DTYPE = np.float64
+
+# the results the worker is writing into (see `attach`)
+worker_results: Optional["SharedResults"] = None
+
+
+class SharedResults:
+    """
+    a row per attribute and a column per game, in shared memory; `name` attaches to the
+    results another process created
+    """
+
+    def __init__(self, attrs_to_get: Sequence[str], num_games: int, name=None):
+        self.attrs_to_get = tuple(attrs_to_get)
+        self.num_games = num_games
+        self.owner = name is None
+        size = max(1, len(self.attrs_to_get) * num_games * np.dtype(DTYPE).itemsize)
+        if self.owner:
+            self.memory = SharedMemory(create=True, size=size)
+        else:
+            # workers share the creator's resource tracker, which only forgets the memory
+            # once it's unlinked
+            self.memory = SharedMemory(name=name)
+        self.array = np.ndarray(
+            (len(self.attrs_to_get), num_games), dtype=DTYPE, buffer=self.memory.buf
+        )
+        self.rows = {attr: row for row, attr in enumerate(self.attrs_to_get)}
+        # as the parent hears of them
+        self.games_done = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    @property
+    def descriptor(self) -> tuple:
+        """
+        what a worker needs to attach to the results
+        """
+        return self.attrs_to_get, self.num_games, self.memory.name
+
+    def get(self, attr: str) -> np.ndarray:
+        """
+        the results of every game for `attr`, as a view of the shared memory
+        """
+        return self.array[self.rows[attr]]
+
+    def get_summary(self) -> Dict[str, Tuple[int, float, float]]:
+        """
+        attribute -> (count, mean, standard deviation), once every game is done
+        """
+        means = self.array.mean(axis=1)
+        std_devs = self.array.std(axis=1, ddof=1) if self.num_games > 1 else means * 0
+        return {
+            attr: (self.num_games, float(means[row]), float(std_devs[row]))
+            for attr, row in self.rows.items()
+        }
+
+    def close(self):
+        # the array has to go before the memory it's a view of can be closed
+        self.array = None
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+
+def attach(descriptor: tuple):
+    """
+    a worker's initializer
+    """
+    global worker_results
+    silence()
+    worker_results = SharedResults(*descriptor)
+
+
+def play_into(task) -> Tuple[int, int]:
+    """
+    plays the games of a unit, into the worker's results; the unit's range of games
+    """
+    buy_decision_algorithm, num_players, seeds, first, last, max_rounds = task
+    array = worker_results.array
+    attrs_to_get = worker_results.attrs_to_get
+    seats = None
+    if not isinstance(buy_decision_algorithm, type):
+        seats = [buy_decision_algorithm] * num_players
+        buy_decision_algorithm = type(buy_decision_algorithm)
+    for index in range(first, last):
+        random.seed(seeds[index])
+        game = Game(
+            num_players, buy_decision_algorithm, seats=seats, max_rounds=max_rounds
+        )
+        for row, attr in enumerate(attrs_to_get):
+            value = getattr(game, attr)
+            array[row, index] = value() if callable(value) else value
+        game.end()
+    return first, last
+
+
+def play_shared(
+    buy_decision_algorithm,
+    num_players: int,
+    seeds: range,
+    attrs_to_get=("get_rounds_played_per_player",),
+    max_rounds=MAX_ROUNDS,
+    processes=2,
+    chunk_size=25,
+) -> SharedResults:
+    """
+    plays a game per seed on `processes` workers; the results are the caller's to close
+    """
+    results = SharedResults(attrs_to_get, len(seeds))
+    tasks = [
+        (
+            buy_decision_algorithm,
+            num_players,
+            seeds,
+            first,
+            min(first + chunk_size, len(seeds)),
+            max_rounds,
+        )
+        for first in range(0, len(seeds), chunk_size)
+    ]
+    try:
+        with Pool(
+            processes, initializer=attach, initargs=(results.descriptor,)
+        ) as pool:
+            for first, last in pool.imap_unordered(play_into, tasks):
+                results.games_done += last - first
+    except BaseException:
+        results.close()
+        raise
+    return results
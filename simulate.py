@@ -1,11 +1,19 @@
+import os
 import random
-import statistics
+import sys
 from collections import defaultdict
 
 from monopoly import Game
 from buy_decision_algos import BuyIfNoOneOwnsTypeAndIsOfTheOneTypeOwned
 
 
+def silence():
+    """
+    for worker processes: the engine prints every move
+    """
+    sys.stdout = open(os.devnull, "w")
+
+
 def get_results(results, game, attrs_to_get):
     for attr in attrs_to_get:
         attr_obj = getattr(game, attr)
@@ -16,34 +24,102 @@ def get_results(results, game, attrs_to_get):
         results[attr].append(val)
 
 
-def print_results(results, num_players):
-    for attr, results_list in results.items():
-        mean = statistics.mean(results_list)
-        std_dev = statistics.stdev(results_list)
-        print(
-            f"num_players -> {num_players}, mean -> {int(mean)}, stdev -> {int(std_dev)}"
-        )
-
-
 def play_x_games(
     num_games=200,
     num_players=range(2, 9),
     buy_decision_algorithms=(BuyIfNoOneOwnsTypeAndIsOfTheOneTypeOwned,),
     attrs_to_get=("get_rounds_played_per_player",),
     slow_down=False,
+    common_random_numbers=False,
+    antithetic=False,
+    processes=1,
+    threads=1,
+    json_path=None,
 ):
-    for buy_decision_algorithm in buy_decision_algorithms:
-        results = defaultdict(list)
+    """
+    with `common_random_numbers`, the algorithms play the same seeds with the same dice and are
+    compared with the first one (see crn.py), optionally with antithetic dice as well
+
+    with more than one of `processes`, the games are played on that many workers, seeded 0 to
+    `num_games`, writing their results into shared memory (see shared_results.py)
 
-        print(buy_decision_algorithm.__name__)
-        print(buy_decision_algorithm.__doc__)
-        print("num games per simulation:", str(num_games))
-        print("attrs to get:", attrs_to_get)
+    with more than one of `threads`, they're played on that many threads instead, each with its
+    own copy of the engine, or on processes where the GIL is on (see thread_runner.py)
+
+    the results are compared in a report, every algorithm with the first on the same seeds
+    (see report.py), printed, saved to `json_path` and returned; with `common_random_numbers`,
+    the report has a result per seed, the mean of its antithetic pair if there's one
+    """
+    from report import Report
+
+    report = Report()
+    if common_random_numbers:
+        from crn import get_comparisons, get_name, play_units
 
         for num_players_ in num_players:
-            for i in range(num_games):
-                game = Game(num_players_, buy_decision_algorithm=buy_decision_algorithm, slow_down=slow_down)
-                get_results(results, game, attrs_to_get)
-                game.end()
+            print("num_players ->", num_players_)
+            results = play_units(
+                buy_decision_algorithms,
+                num_players_,
+                num_games,
+                attrs_to_get=attrs_to_get,
+                antithetic=antithetic,
+            )
+            for comparison in get_comparisons(
+                buy_decision_algorithms, results, attrs_to_get
+            ):
+                print(comparison)
+            # a unit's mean stands for it, so the report compares the algorithms unit by unit
+            for algorithm, algorithm_results in zip(buy_decision_algorithms, results):
+                report.add(
+                    get_name(algorithm),
+                    num_players_,
+                    {
+                        attr: [sum(unit) / len(unit) for unit in units]
+                        for attr, units in algorithm_results.items()
+                    },
+                )
+    else:
+        for buy_decision_algorithm in buy_decision_algorithms:
+            print(buy_decision_algorithm.__name__)
+            print(buy_decision_algorithm.__doc__)
+            print("num games per simulation:", str(num_games))
+            print("attrs to get:", attrs_to_get)
+
+            for num_players_ in num_players:
+                if threads > 1:
+                    from thread_runner import play_threaded
+
+                    results = play_threaded(
+                        buy_decision_algorithm,
+                        num_players_,
+                        range(num_games),
+                        attrs_to_get,
+                        threads=threads,
+                    )
+                elif processes > 1:
+                    from shared_results import play_shared
+
+                    with play_shared(
+                        buy_decision_algorithm,
+                        num_players_,
+                        range(num_games),
+                        attrs_to_get,
+                        processes=processes,
+                    ) as shared:
+                        results = {
+                            attr: shared.get(attr).copy() for attr in attrs_to_get
+                        }
+                else:
+                    results = defaultdict(list)
+                    for i in range(num_games):
+                        random.seed(i)
+                        game = Game(num_players_, buy_decision_algorithm=buy_decision_algorithm, slow_down=slow_down)
+                        get_results(results, game, attrs_to_get)
+                        game.end()
+                report.add(buy_decision_algorithm.__name__, num_players_, results)
 
-            print_results(results, num_players_)
+    report.print_tables()
+    if json_path:
+        report.save(json_path)
+    return report
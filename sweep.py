@@ -0,0 +1,298 @@
+"""
+`play_x_games`, but checkpointed so that a sweep that gets interrupted can pick up where it left off.
+
+A sweep is a grid of cells, one per (buy decision algorithm, number of players). Every cell is
+split into work units of `chunk_size` games. Every game gets its own seed, derived from the sweep's
+seed, the cell and the game's index, so a game plays out the same whether it runs in the first
+session or after a resume, and adding games or algorithms to a sweep leaves the seeds of
+finished work alone.
+
+The checkpoint is a JSON lines file:
+
+- the first line is a header with the sweep's seed and chunk size
+- after that, a line per cell with the work units it has finished and their aggregates
+  (count, sum and sum of squares for each attribute)
+
+Every finished unit is appended as its own line with a single `write` on a file opened for
+appending, and fsynced. A torn last line (from a crash mid-write) is ignored on load. Every
+`compact_every` units the file is rewritten as one line per cell, via a temporary file and
+`os.replace`, so it never grows beyond the size of the grid.
+
+Every unit also counts its turns and the games cut off at `max_rounds`, under attributes that
+start with an underscore; they're left out of `results` and feed `metrics` (see metrics.py).
+With a `tail`, every unit also sends back the seconds and rounds of its slowest and longest
+games, for the tail sampler to keep the sweep's (see tail_capture.py).
+"""
+import json
+import math
+import os
+import random
+import zlib
+from collections import defaultdict
+from contextlib import redirect_stdout
+from multiprocessing import Pool
+from time import perf_counter
+from typing import Dict, Iterable, List, Tuple
+
+import buy_decision_algos
+from monopoly import Game, MAX_ROUNDS
+from roi import SPACE_COUNTERS, flatten
+from simulate import get_results, silence
+from tail_capture import TailGame, get_unit_tail
+
+Cell = Tuple[str, int]
+# attribute -> [count, sum, sum of squares]
+Aggregates = Dict[str, List[float]]
+TURNS = "_turns"
+CAPPED = "_capped"
+# the unit's candidates for the tail, not aggregated
+TAIL = "_tail"
+
+
+def get_seed(sweep_seed: int, algorithm_name: str, num_players: int, game_index: int) -> int:
+    return zlib.crc32(f"{sweep_seed}:{algorithm_name}:{num_players}:{game_index}".encode())
+
+
+def merge(aggregates: Aggregates, other: Aggregates):
+    for attr, (count, total, total_squared) in other.items():
+        current = aggregates.setdefault(attr, [0, 0.0, 0.0])
+        current[0] += count
+        current[1] += total
+        current[2] += total_squared
+
+
+def play_unit(task) -> Tuple[Cell, int, Aggregates]:
+    (
+        sweep_seed,
+        algorithm_name,
+        num_players,
+        chunk,
+        chunk_size,
+        attrs_to_get,
+        max_rounds,
+        tail_size,
+    ) = task
+    buy_decision_algorithm = getattr(buy_decision_algos, algorithm_name)
+    # the space counters are only collected if they're asked for (see roi.py)
+    count_spaces = SPACE_COUNTERS in attrs_to_get
+    attrs_to_get = [attr for attr in attrs_to_get if attr != SPACE_COUNTERS]
+    results = defaultdict(list)
+    tail = []
+    for game_index in range(chunk * chunk_size, (chunk + 1) * chunk_size):
+        started = perf_counter()
+        random.seed(get_seed(sweep_seed, algorithm_name, num_players, game_index))
+        game = Game(
+            num_players, buy_decision_algorithm, max_rounds=max_rounds, counters=count_spaces
+        )
+        get_results(results, game, attrs_to_get)
+        results[TURNS].append(game.rounds)
+        results[CAPPED].append(int(game.rounds >= max_rounds))
+        if count_spaces:
+            for attr, value in flatten(game.get_space_counters()).items():
+                results[attr].append(value)
+        game.end()
+        if tail_size:
+            tail.append((perf_counter() - started, game.rounds, game_index))
+    aggregates = {
+        attr: [len(values), float(sum(values)), float(sum(v * v for v in values))]
+        for attr, values in results.items()
+    }
+    if tail_size:
+        aggregates[TAIL] = get_unit_tail(tail, tail_size)
+    return (algorithm_name, num_players), chunk, aggregates
+
+
+class Sweep:
+    def __init__(
+        self,
+        checkpoint_path,
+        seed=0,
+        chunk_size=25,
+        attrs_to_get=("get_rounds_played_per_player",),
+        max_rounds=MAX_ROUNDS,
+        compact_every=100,
+        metrics=None,
+        tail=None,
+    ):
+        self.checkpoint_path = checkpoint_path
+        # told about every unit recorded (see metrics.SweepMetrics)
+        self.metrics = metrics
+        # offered the slowest and longest games of every unit (see tail_capture.TailSampler)
+        self.tail = tail
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.attrs_to_get = tuple(attrs_to_get)
+        self.max_rounds = max_rounds
+        self.compact_every = compact_every
+        self.done: Dict[Cell, set] = defaultdict(set)
+        self.aggregates: Dict[Cell, Aggregates] = defaultdict(dict)
+        self.appended_since_compaction = 0
+        if os.path.exists(checkpoint_path):
+            self.load()
+        else:
+            self.compact()
+
+    @property
+    def header(self):
+        return {
+            "seed": self.seed,
+            "chunk_size": self.chunk_size,
+            "attrs_to_get": list(self.attrs_to_get),
+            "max_rounds": self.max_rounds,
+        }
+
+    def load(self):
+        with open(self.checkpoint_path) as f:
+            lines = f.read().split("\n")
+        header = json.loads(lines[0])
+        if header != self.header:
+            raise ValueError(
+                f"{self.checkpoint_path} was written by a different sweep: {header}"
+            )
+        torn = False
+        for line in lines[1:]:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # empty, or torn by a crash mid-append
+                torn = torn or bool(line)
+                continue
+            cell = (record["algorithm"], record["num_players"])
+            new_units = set(record["units"]) - self.done[cell]
+            if not new_units:
+                continue
+            self.done[cell] |= new_units
+            merge(self.aggregates[cell], record["aggregates"])
+        if torn:
+            # the next append would be glued onto the torn line
+            self.compact()
+
+    def compact(self):
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(json.dumps(self.header) + "\n")
+            for cell, units in self.done.items():
+                f.write(self.get_line(cell, sorted(units), self.aggregates[cell]))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+        self.appended_since_compaction = 0
+
+    @staticmethod
+    def get_line(cell: Cell, units: List[int], aggregates: Aggregates) -> str:
+        algorithm_name, num_players = cell
+        record = {
+            "algorithm": algorithm_name,
+            "num_players": num_players,
+            "units": units,
+            "aggregates": aggregates,
+        }
+        return json.dumps(record) + "\n"
+
+    def record(self, cell: Cell, chunk: int, aggregates: Aggregates):
+        tail = aggregates.pop(TAIL, ())
+        if chunk in self.done[cell]:
+            return
+        if self.tail is not None:
+            algorithm_name, num_players = cell
+            for seconds, rounds, game_index in tail:
+                seed = get_seed(self.seed, algorithm_name, num_players, game_index)
+                self.tail.offer(
+                    TailGame(
+                        algorithm_name,
+                        num_players,
+                        seed,
+                        self.max_rounds,
+                        seconds,
+                        rounds,
+                        game_index,
+                    )
+                )
+        line = self.get_line(cell, [chunk], aggregates).encode()
+        fd = os.open(self.checkpoint_path, os.O_WRONLY | os.O_APPEND)
+        try:
+            os.write(fd, line)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        self.done[cell].add(chunk)
+        merge(self.aggregates[cell], aggregates)
+        if self.metrics is not None:
+            self.metrics.update(cell, aggregates)
+        self.appended_since_compaction += 1
+        if self.appended_since_compaction >= self.compact_every:
+            self.compact()
+
+    def get_pending(self, num_games, num_players, buy_decision_algorithms) -> List[tuple]:
+        if num_games % self.chunk_size:
+            raise ValueError(f"num_games must be a multiple of chunk_size ({self.chunk_size})")
+        pending = []
+        for buy_decision_algorithm in buy_decision_algorithms:
+            name = buy_decision_algorithm.__name__
+            for num_players_ in num_players:
+                for chunk in range(num_games // self.chunk_size):
+                    if chunk not in self.done[(name, num_players_)]:
+                        pending.append(
+                            (
+                                self.seed,
+                                name,
+                                num_players_,
+                                chunk,
+                                self.chunk_size,
+                                self.attrs_to_get,
+                                self.max_rounds,
+                                self.tail.k if self.tail is not None else 0,
+                            )
+                        )
+        if self.metrics is not None:
+            self.metrics.start(pending, self.done)
+        return pending
+
+    def run(
+        self,
+        num_games=200,
+        num_players=range(2, 9),
+        buy_decision_algorithms=(buy_decision_algos.BuyIfNoOneOwnsTypeAndIsOfTheOneTypeOwned,),
+        processes=1,
+    ):
+        """
+        play whatever work of the grid isn't in the checkpoint yet
+        """
+        pending = self.get_pending(num_games, num_players, buy_decision_algorithms)
+        if processes == 1:
+            with open(os.devnull, "w") as devnull:
+                for task in pending:
+                    with redirect_stdout(devnull):
+                        result = play_unit(task)
+                    self.record(*result)
+        else:
+            with Pool(processes, initializer=silence) as pool:
+                for result in pool.imap_unordered(play_unit, pending):
+                    self.record(*result)
+        self.compact()
+        return self.results()
+
+    def results(self) -> Dict[Cell, Dict[str, Tuple[int, float, float]]]:
+        """
+        (count, mean, standard deviation) per attribute, per cell
+        """
+        results = {}
+        for cell, aggregates in self.aggregates.items():
+            results[cell] = {}
+            for attr, (count, total, total_squared) in aggregates.items():
+                if attr.startswith("_"):
+                    continue
+                mean = total / count
+                variance = (total_squared - count * mean * mean) / (count - 1) if count > 1 else 0.0
+                results[cell][attr] = (int(count), mean, math.sqrt(max(0.0, variance)))
+        return results
+
+    def print_results(self, cells: Iterable[Cell] = None):
+        results = self.results()
+        for cell in cells or sorted(results):
+            algorithm_name, num_players = cell
+            for attr, (count, mean, std_dev) in results[cell].items():
+                print(
+                    f"{algorithm_name}, num_players -> {num_players}, {attr}: "
+                    f"games -> {count}, mean -> {mean:.2f}, stdev -> {std_dev:.2f}"
+                )
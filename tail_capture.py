@@ -0,0 +1,201 @@
+"""
+Keep the games in the tail of a sweep: the `k` that took longest to play and the `k` that went
+on for the most rounds, with their seeds, so that they can be played again with an event log
+and looked at (see event_log.py).
+
+    tail = TailSampler(k=5)
+    Sweep("sweep.jsonl", tail=tail).run(num_games=10_000, processes=8)
+    for game in tail.capture("tail-logs"):
+        game.print_summary()
+
+While the sweep runs, every unit times its games and sends back the seconds and rounds of
+its own top `k`, a handful of numbers; nothing is recorded for any game. Every game of a sweep
+has its own seed (see `sweep.get_seed`), so `capture` plays the tail games again, exactly as
+they were played, with an `EventLog` attached, and works out from the log why each of them ran
+long.
+"""
+
+import heapq
+import os
+from typing import Iterable, List, Optional
+
+import buy_decision_algos
+from event_log import EventLog, record_game
+from monopoly import (
+    BANK_SEAT,
+    BANKRUPT,
+    BUILD,
+    BUY,
+    MOVE,
+    RENT,
+    ROLL,
+    TRANSFER,
+    TURN,
+    Board,
+    get_space_index,
+)
+
+KINDS = ("slowest", "longest")
+
+
+def get_unit_tail(games: Iterable[tuple], k: int) -> List[list]:
+    """
+    from the (seconds, rounds, game index) of every game of a unit, those of the games that
+    could be in the sweep's tail
+    """
+    games = list(games)
+    tail = set(heapq.nlargest(k, games))
+    tail.update(heapq.nlargest(k, games, key=lambda game: game[1]))
+    return [list(game) for game in sorted(tail)]
+
+
+class TailGame:
+    def __init__(
+        self, algorithm_name, num_players, seed, max_rounds, seconds, rounds, game_index
+    ):
+        self.algorithm_name = algorithm_name
+        self.num_players = num_players
+        self.seed = seed
+        self.max_rounds = max_rounds
+        self.seconds = seconds
+        self.rounds = rounds
+        self.game_index = game_index
+        self.log: Optional[EventLog] = None
+        self.path = None
+
+    def __repr__(self):
+        return (
+            f"<{self.__class__.__name__} {self.algorithm_name} {self.num_players}p "
+            f"seed={self.seed} rounds={self.rounds} seconds={self.seconds:.3f}>"
+        )
+
+    @property
+    def key(self) -> tuple:
+        return self.algorithm_name, self.num_players, self.game_index
+
+    def capture(self, directory=None) -> EventLog:
+        """
+        plays the game again, with an event log, saved in `directory` if given
+        """
+        algorithm = getattr(buy_decision_algos, self.algorithm_name)
+        game, self.log = record_game(
+            self.seed, self.num_players, algorithm, self.max_rounds
+        )
+        if game.rounds != self.rounds:
+            raise RuntimeError(f"{self} played out differently the second time")
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            self.path = os.path.join(
+                directory,
+                f"{self.algorithm_name}-{self.num_players}p-{self.seed}.log",
+            )
+            self.log.save(self.path)
+        return self.log
+
+    def get_reasons(self) -> List[str]:
+        """
+        what the event log says about why the game went on so long
+        """
+        turns = rent = from_bank = builds = bankruptcies = purchases = 0
+        go_to_jail = get_space_index("GoToJail")
+        landed_on_go_to_jail = stayed_put = 0
+        # seat -> where they are, and what they just rolled, if they haven't moved since
+        positions, rolls = {}, {}
+        for event, seat, a, b in self.log:
+            if event == TURN:
+                turns += 1
+            elif event == RENT:
+                rent += b
+            elif event == TRANSFER and seat == BANK_SEAT:
+                from_bank += b
+            elif event == BUILD:
+                builds += 1
+            elif event == BUY:
+                purchases += 1
+            elif event == BANKRUPT:
+                bankruptcies += 1
+            elif event == ROLL:
+                rolls[seat] = a
+            elif event == MOVE:
+                roll = rolls.pop(seat, None)
+                if roll is not None and positions.get(seat) == go_to_jail:
+                    stayed_put += a == (go_to_jail + roll) % Board.NUM_SPACES
+                landed_on_go_to_jail += a == go_to_jail
+                positions[seat] = a
+        reasons = []
+        if self.rounds >= self.max_rounds:
+            reasons.append(f"cut off at max_rounds ({self.max_rounds})")
+        still_in = self.num_players - bankruptcies
+        if still_in > 1:
+            reasons.append(
+                f"{still_in} of {self.num_players} players never went bankrupt"
+            )
+        if not builds:
+            reasons.append(
+                f"nobody ever built on their properties ({purchases} were bought)"
+            )
+        if turns and rent < from_bank:
+            reasons.append(
+                f"the bank paid out more than rent took: {from_bank / turns:.0f} against "
+                f"{rent / turns:.0f} per turn"
+            )
+        if stayed_put:
+            reasons.append(
+                f"landed on Go To Jail {landed_on_go_to_jail} times, and {stayed_put} times "
+                f"moved on from there instead of from jail"
+            )
+        return reasons
+
+    def print_summary(self):
+        print(self)
+        if self.path:
+            print(f"  log: {self.path}")
+        for reason in self.get_reasons():
+            print(f"  - {reason}")
+
+
+class TailSampler:
+    """
+    the `k` slowest and the `k` longest games of a sweep
+    """
+
+    def __init__(self, k=10):
+        self.k = k
+        # kind -> min-heap of (score, key, game), so the root is the first to go
+        self.heaps = {kind: [] for kind in KINDS}
+        self.offered = 0
+
+    def offer(self, game: TailGame):
+        self.offered += 1
+        for kind, score in zip(KINDS, (game.seconds, game.rounds)):
+            heap = self.heaps[kind]
+            entry = (score, game.key, game)
+            if len(heap) < self.k:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+
+    def get_games(self, kind=None) -> List[TailGame]:
+        """
+        the games of the tail, or of one `kind` of tail, the biggest first
+        """
+        kinds = KINDS if kind is None else (kind,)
+        games = {}
+        for kind_ in kinds:
+            for _, key, game in sorted(self.heaps[kind_], reverse=True):
+                games.setdefault(key, game)
+        return list(games.values())
+
+    def capture(self, directory=None) -> List[TailGame]:
+        games = self.get_games()
+        for game in games:
+            if game.log is None:
+                game.capture(directory)
+        return games
+
+    def print_summary(self):
+        print(f"the tail of {self.offered} games")
+        for kind in KINDS:
+            print(f"{kind}:")
+            for game in self.get_games(kind):
+                print(f"  {game}")
@@ -0,0 +1,32 @@
+import os
+
+import pytest
+
+from alloc_profile import AllocationHook, profile_game
+from buy_decision_algos import BuyEverything
+
+
+def allocate():
+    kept = []
+    for _ in range(1_000):
+        kept.append(object())
+    return kept
+
+
+def test_a_steady_state_turn_allocates_little():
+    profile = profile_game(0, 4, BuyEverything, warmup=50, max_turns=300)
+    assert len(profile.steady_turns) == 250
+    assert profile.blocks_per_turn < 30
+    # every block allocated in a turn is put down to some site
+    sites = profile.get_sites_per_turn()
+    assert sum(blocks for _, blocks in sites) == pytest.approx(profile.blocks_per_turn)
+
+
+def test_allocations_are_put_down_to_the_function_making_them():
+    hook = AllocationHook()
+    hook.engine_files.add(os.path.abspath(__file__))
+    hook.start()
+    kept = allocate()
+    hook.stop()
+    assert sum(hook.sites[allocate.__code__].values()) >= len(kept)
+    assert hook.blocks >= len(kept)
@@ -0,0 +1,49 @@
+import random
+from contextlib import redirect_stdout
+from io import StringIO
+
+import numpy as np
+import pytest
+
+from batched_engine import BatchedGames
+from buy_decision_algos import AskThePlayer, BuyIfHaveThreeTimesPrice
+from exceptions import Argument
+from monopoly import Game
+
+
+def ks_statistic(a, b):
+    a, b = np.sort(a), np.sort(b)
+    values = np.union1d(a, b)
+    a_cdf = np.searchsorted(a, values, side="right") / len(a)
+    b_cdf = np.searchsorted(b, values, side="right") / len(b)
+    return np.abs(a_cdf - b_cdf).max()
+
+
+def test_outcomes_match_the_reference_engine():
+    num_games, num_players, max_rounds = 150, 3, 300
+    rounds, bankruptcies = [], []
+    with redirect_stdout(StringIO()):
+        for seed in range(num_games):
+            random.seed(seed)
+            game = Game(num_players, BuyIfHaveThreeTimesPrice, max_rounds=max_rounds)
+            rounds.append(game.rounds)
+            bankruptcies.append(sum(player.bankrupt for player in game._players))
+            game.end()
+    games = BatchedGames(
+        3_000, num_players, BuyIfHaveThreeTimesPrice, max_rounds=max_rounds, seed=0
+    ).run()
+
+    # two-sample Kolmogorov-Smirnov at the 0.1% level
+    critical = 1.95 * np.sqrt(
+        (num_games + games.num_games) / (num_games * games.num_games)
+    )
+    assert ks_statistic(rounds, games.rounds) < critical
+    assert abs(np.mean(bankruptcies) - games.bankrupt.sum(axis=1).mean()) < 0.15
+    assert np.all(games.rounds <= max_rounds)
+    assert np.all(games.get_rounds_played_per_player() == games.rounds / num_players)
+    assert not games.bankrupt[np.arange(games.num_games), games.winner].any()
+
+
+def test_needs_an_algorithm_with_a_batched_form():
+    with pytest.raises(Argument):
+        BatchedGames(10, 2, AskThePlayer)
@@ -0,0 +1,58 @@
+import socket
+import threading
+
+import pytest
+
+from buy_decision_algos import BuyEverything
+from coordinator import Coordinator, encode, receive, start_local_workers
+from sweep import Sweep
+
+GRID = dict(num_games=6, num_players=(2, 3), buy_decision_algorithms=(BuyEverything,))
+
+
+def get_sweep(path):
+    return Sweep(str(path), chunk_size=2, max_rounds=40)
+
+
+def test_local_workers_play_the_same_sweep(tmp_path):
+    expected = get_sweep(tmp_path / "inline.jsonl").run(**GRID)
+    coordinator = Coordinator(get_sweep(tmp_path / "sweep.jsonl"))
+    results = coordinator.run("tcp://127.0.0.1:0", **GRID, local_workers=2)
+    assert results == expected
+    assert coordinator.dispatched >= 6
+
+
+@pytest.mark.parametrize("hang", [False, True])
+def test_the_unit_of_a_lost_worker_is_played_by_another(tmp_path, hang):
+    expected = get_sweep(tmp_path / "inline.jsonl").run(**GRID)
+    address = f"unix:{tmp_path / 'coordinator.sock'}"
+    coordinator = Coordinator(
+        get_sweep(tmp_path / "sweep.jsonl"), heartbeat_timeout=0.5
+    )
+    workers = []
+
+    def lose_a_worker():
+        while True:
+            connection = socket.socket(socket.AF_UNIX)
+            try:
+                connection.connect(str(tmp_path / "coordinator.sock"))
+                break
+            except (FileNotFoundError, ConnectionRefusedError):
+                connection.close()
+        connection.sendall(encode({"type": "ready"}))
+        assert receive(connection)["type"] == "task"
+        if hang:
+            # says nothing more, so it times out
+            threading.Event().wait(1)
+        connection.close()
+        workers.extend(start_local_workers(address, 1))
+
+    thread = threading.Thread(target=lose_a_worker)
+    thread.start()
+    results = coordinator.run(address, **GRID)
+    thread.join()
+    for worker in workers:
+        worker.join()
+    assert results == expected
+    assert coordinator.dead_workers == 1
+    assert coordinator.redispatched == 1
@@ -0,0 +1,73 @@
+import json
+import random
+from contextlib import redirect_stdout
+from io import StringIO
+
+import pytest
+
+import editions
+from buy_decision_algos import BuyEverything
+from counterfactual import Report, Trajectory, make_variant, record_games, reweight
+from counterfactual import save_variant
+from exceptions import InvalidEdition
+from monopoly import Board, Game
+
+
+@pytest.fixture
+def edition_dir(tmp_path, monkeypatch):
+    default = editions.load()
+    (tmp_path / f"{editions.DEFAULT_EDITION}.json").write_text(json.dumps(default))
+    for name in ("EDITIONS_DIR", "CACHE_DIR"):
+        monkeypatch.setattr(editions, name, str(tmp_path))
+    for cached in (editions.load_json, editions.load, editions.compiled):
+        cached.cache_clear()
+    yield tmp_path
+    for cached in (editions.load_json, editions.load, editions.compiled):
+        cached.cache_clear()
+    Board.use_edition(editions.DEFAULT_EDITION)
+
+
+def test_valid_trajectories_end_as_the_variant_would_have(edition_dir):
+    variant = make_variant(
+        rents={"Berne Place Fédérale": 1.1, "Union des Chemins de Fer Privés": 2},
+        taxes={"LuxuryTax": 100},
+    )
+    save_variant(variant, "dearer")
+    logs = record_games(range(30), 3, BuyEverything, max_rounds=200)
+    report = reweight(logs, variant)
+    # the logs have to be of games played on the variant's base
+    with pytest.raises(InvalidEdition):
+        reweight(record_games(range(1), 3, BuyEverything, 50, "dearer"), variant)
+    valid = [t for t in report.trajectories if t.weight]
+    assert valid and len(valid) < len(logs)
+    assert all(t.divergence for t in report.trajectories if not t.weight)
+    for trajectory in valid:
+        with redirect_stdout(StringIO()):
+            random.seed(trajectory.seed)
+            game = Game(3, BuyEverything, max_rounds=200, edition="dearer")
+            game.end()
+        assert [player.money for player in game._players] == [
+            trajectory.variant_outcomes[f"money_{seat}"] for seat in range(3)
+        ]
+
+
+def test_an_unchanged_board_keeps_every_game():
+    logs = record_games(range(10), 2, BuyEverything, max_rounds=100)
+    report = reweight(logs, make_variant())
+    assert report.effective_sample_size == 10
+    assert not report.needs_resimulation
+    for logged, variant, difference in report.get_estimates().values():
+        assert logged == variant and difference == 0
+    with pytest.raises(InvalidEdition):
+        make_variant(taxes={"Berne Place Fédérale": 10})
+
+
+def test_the_effective_sample_size_says_when_to_play_the_variant():
+    trajectories = [
+        Trajectory(seed, weight, {"rent": 10}, {"rent": 20})
+        for seed, weight in enumerate((1.0, 1.0, 0.0, 0.0, 0.0))
+    ]
+    report = Report(trajectories)
+    assert report.effective_sample_size == 2
+    assert report.needs_resimulation
+    assert report.get_estimates()["rent"] == (10, 20, 10)
@@ -0,0 +1,44 @@
+import math
+
+import pytest
+
+from buy_decision_algos import BuyEverything, BuyIfHaveThreeTimesPrice
+from crn import SeatDice, compare_algorithms, play
+
+
+def test_seats_roll_the_same_dice_whatever_happens_in_between():
+    dice, other = SeatDice(3), SeatDice(3)
+    rolls = [dice(0) for _ in range(5)]
+    other(1)
+    other(None)
+    assert [other(0) for _ in range(5)] == rolls
+
+    flipped = SeatDice(3, antithetic=True)
+    assert [flipped(0) for _ in range(5)] == [(7 - a, 7 - b) for a, b in rolls]
+
+
+def test_the_same_seed_plays_the_same_game():
+    assert play(BuyEverything, 3, 5, ("rounds",), 60) == play(
+        BuyEverything, 3, 5, ("rounds",), 60
+    )
+
+
+def test_paired_differences_have_less_variance():
+    for antithetic in (False, True):
+        (comparison,) = compare_algorithms(
+            [BuyEverything, BuyIfHaveThreeTimesPrice],
+            3,
+            num_games=20,
+            max_rounds=100,
+            antithetic=antithetic,
+        )
+        assert comparison.num_units == 20
+        assert comparison.games_per_unit == (2 if antithetic else 1)
+        assert math.isfinite(comparison.half_width)
+        assert comparison.variance_reduction > 1
+        assert "BuyIfHaveThreeTimesPrice - BuyEverything" in str(comparison)
+
+
+def test_one_game_is_too_few_to_compare():
+    with pytest.raises(ValueError):
+        compare_algorithms([BuyEverything, BuyIfHaveThreeTimesPrice], 3, num_games=1)
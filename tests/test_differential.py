@@ -0,0 +1,51 @@
+from buy_decision_algos import BuyEverything, BuyIfHaveThreeTimesPrice
+from crn import SeatDice
+from differential import (
+    Case,
+    compare_distributions,
+    find_divergences,
+    ks_test,
+    play_reference,
+    sample_batched,
+    sample_reference,
+    shrink,
+    with_options,
+)
+from monopoly import ROLL
+
+
+def test_game_options_dont_change_the_games():
+    engine = with_options(hashing=True, counters=True)
+    assert find_divergences(engine, BuyEverything, range(5), max_rounds=200) == []
+
+
+def test_shrinks_a_divergence_to_its_first_turn():
+    def seat_dice(seed, num_players, algorithm, max_rounds, recorder):
+        return play_reference(
+            seed, num_players, algorithm, max_rounds, recorder, dice=SeatDice(seed)
+        )
+
+    divergence = shrink(seat_dice, Case(0, 5, BuyEverything, 300))
+    assert divergence.case == Case(0, 2, BuyEverything, 1)
+    assert divergence.turn == 1
+    assert divergence.expected[0] == divergence.got[0] == ROLL
+
+
+def test_compares_the_batched_engine_on_distributions():
+    expected = sample_reference(BuyIfHaveThreeTimesPrice, range(100), 3, 300)
+    checks = compare_distributions(
+        expected, sample_batched(BuyIfHaveThreeTimesPrice, 2_000, 3, 300)
+    )
+    assert all(check.passed for check in checks), [str(check) for check in checks]
+    # a rule changed: games cut off sooner
+    checks = compare_distributions(
+        expected, sample_batched(BuyIfHaveThreeTimesPrice, 2_000, 3, 200)
+    )
+    assert not checks[0].passed
+
+
+def test_ks_test():
+    assert ks_test([1, 2, 3], [1, 2, 3]) == (0.0, 1.0)
+    statistic, p_value = ks_test(range(100), range(50, 150))
+    assert statistic == 0.5
+    assert p_value < 1e-4
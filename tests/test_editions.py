@@ -0,0 +1,103 @@
+import json
+import random
+from contextlib import redirect_stdout
+from io import StringIO
+
+import pytest
+
+import editions
+from buy_decision_algos import BuyEverything
+from exceptions import InvalidEdition
+from monopoly import Board, Game, IncomeTax, Railroad
+
+
+@pytest.fixture
+def edition_dir(tmp_path, monkeypatch):
+    default = editions.load()
+    write_edition(tmp_path, editions.DEFAULT_EDITION, default)
+    for name in ("EDITIONS_DIR", "CACHE_DIR"):
+        monkeypatch.setattr(editions, name, str(tmp_path))
+    for cached in (editions.load_json, editions.load, editions.compiled):
+        cached.cache_clear()
+    yield tmp_path
+    for cached in (editions.load_json, editions.load, editions.compiled):
+        cached.cache_clear()
+
+
+def write_edition(directory, name, data):
+    (directory / f"{name}.json").write_text(json.dumps(data))
+
+
+def test_compiled_board_matches_the_spaces():
+    board = editions.compiled()
+    assert board.num_spaces == Board.NUM_SPACES
+    for index, space in enumerate(Board.template):
+        kind = editions.KINDS[board.get(index, "kind")]
+        assert kind == getattr(space, "__name__", type(space).__name__)
+        assert board.get(index, "cost") == getattr(space, "cost", 0)
+    railroads = [
+        i for i, space in enumerate(Board.template) if isinstance(space, Railroad)
+    ]
+    assert board.next_of_kind("Railroad", 0) == railroads[0]
+    assert board.next_of_kind("Railroad", railroads[-1]) == railroads[0]
+    assert board.next_of_kind("Jail", Board.NUM_SPACES - 1) == Board.SPACES_DICT["Jail"]
+
+
+def test_invalid_editions_are_refused(edition_dir):
+    data = editions.load()
+    write_edition(edition_dir, "no_jail", {**data, "spaces": data["spaces"][:10]})
+    with pytest.raises(InvalidEdition):
+        editions.load("no_jail")
+    with pytest.raises(InvalidEdition):
+        editions.load("missing")
+
+
+def test_games_play_on_their_own_edition(edition_dir):
+    data = json.loads(json.dumps(editions.load()))
+    data["spaces"][4]["amount"] = 150
+    data["spaces"][5]["rent"]["1"] = 40
+    write_edition(edition_dir, "house_rules", data)
+
+    with redirect_stdout(StringIO()):
+        random.seed(0)
+        game = Game(2, BuyEverything, max_rounds=5, edition="house_rules")
+        assert Board.edition == "house_rules"
+        assert Board.spaces[4].amount == 150 and issubclass(Board.spaces[4], IncomeTax)
+        assert isinstance(game.spaces[5], Railroad) and game.spaces[5].rent[1] == 40
+        Game(2, BuyEverything, max_rounds=5, edition=editions.DEFAULT_EDITION)
+        assert Board.spaces[4].amount == 100
+        game.activate()
+        assert Board.spaces[4].amount == 150
+        game.end()
+        assert Board.edition == editions.DEFAULT_EDITION
+        assert Game(2, BuyEverything, max_rounds=5).edition == editions.DEFAULT_EDITION
+        assert Board.spaces[4].amount == 100
+    Board.use_edition(editions.DEFAULT_EDITION)
+
+
+def test_editions_load_where_the_cache_cant_be_written(edition_dir, monkeypatch):
+    (edition_dir / "not_a_directory").write_text("")
+    monkeypatch.setattr(editions, "CACHE_DIR", str(edition_dir / "not_a_directory"))
+    assert editions.load()["spaces"]
+
+    monkeypatch.setattr(editions, "CACHE_DIR", str(edition_dir))
+    editions.load.cache_clear()
+    editions.load()
+    monkeypatch.setattr(editions, "LOAD_VERSION", editions.LOAD_VERSION + 1)
+    editions.load.cache_clear()
+    editions.load()
+    assert len(list(edition_dir.glob("*.marshal"))) == 2
+
+
+def test_games_play_where_the_board_cant_be_compiled_to_a_file(
+    edition_dir, monkeypatch
+):
+    (edition_dir / "not_a_directory").write_text("")
+    monkeypatch.setattr(editions, "CACHE_DIR", str(edition_dir / "not_a_directory"))
+    monkeypatch.setattr(Board, "compiled", None)
+    with redirect_stdout(StringIO()):
+        random.seed(0)
+        game = Game(4, BuyEverything, max_rounds=300)
+        game.end()
+    assert game.rounds > 0
+    assert editions.compiled().next_of_kind("Jail", 0) == Board.SPACES_DICT["Jail"]
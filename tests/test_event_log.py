@@ -0,0 +1,36 @@
+from buy_decision_algos import BuyEverything
+from event_log import EventLog, record_game, replay
+from monopoly import TURN
+
+
+def test_replay_rebuilds_the_final_state(tmp_path):
+    game, log = record_game(seed=3, num_players=3, buy_decision_algorithm=BuyEverything)
+    path = tmp_path / "game.log"
+    log.save(path)
+    assert path.stat().st_size < 64 * 1024
+
+    state = replay(EventLog.load(path))
+    players = game._players
+    assert state.money == [player.money for player in players]
+    assert state.positions == [player.current_space_index % 40 for player in players]
+    assert state.bankrupt == {player.seat for player in players if player.bankrupt}
+    assert state.owners == {p.index: p.owner.seat for p in game.properties if p.owner}
+    assert state.mortgaged == {p.index for p in game.properties if p.mortgaged}
+    assert {i: level for i, level in state.buildings.items() if level} == {
+        p.index: p.building_level
+        for p in game.properties
+        if hasattr(p, "buildings") and p.building_level
+    }
+
+
+def test_replay_stops_at_a_turn():
+    _, log = record_game(
+        seed=4, num_players=2, buy_decision_algorithm=BuyEverything, max_rounds=30
+    )
+    num_turns = sum(1 for event, *_ in log if event == TURN)
+    assert replay(log, turn=1).turn == 0
+    assert replay(log, turn=10).turn == 9
+    assert replay(log).turn == num_turns
+    # starting money is recorded before the first turn
+    assert replay(log, turn=1).money == [1_500, 1_500]
+    assert len(list(log.describe())) == len(log)
@@ -0,0 +1,113 @@
+from exceptions import CantBuyBuildings
+from liquidation import LiquidationStats, raise_funds, solve
+from monopoly import Bank, Board, Monopoly, Property, Player, Railroad
+import pytest
+
+
+@pytest.fixture
+def player():
+    Bank.reset()
+    Property.reset()
+    for property_ in Property.instances:
+        if hasattr(property_, "buildings"):
+            property_.buildings.update(house=0, hotel=0)
+    LiquidationStats.reset()
+    player = Player()
+    player.money = 0
+    yield player
+    Property.reset()
+
+
+def get_properties_of_type(type_):
+    return Property.instances_by_type()[type_]
+
+
+def test_solve_picks_cheapest_mix():
+    # a building sale raises 25 and loses 25, a mortgage raises 30 and loses 3
+    items = (((0, 0), (25, 25)), ((0, 0), (30, 3)))
+    assert solve(items, 20) == (0, 1)
+    assert solve(items, 40) == (1, 1)
+    assert solve(items, 60) is None
+
+
+def test_mortgages_before_selling_buildings(player):
+    railroad = get_properties_of_type("railroad")[0]
+    railroad.owner = player
+    browns = get_properties_of_type("brown")
+    for brown in browns:
+        brown.owner = player
+        brown.buildings["house"] = 2
+
+    assert raise_funds(player, 80)
+    assert railroad.mortgaged
+    assert all(brown.buildings["house"] == 2 for brown in browns)
+    assert player.money == railroad.mortgage_cost
+
+
+def test_sells_buildings_before_mortgaging_a_monopoly(player):
+    browns = get_properties_of_type("brown")
+    for brown in browns:
+        brown.owner = player
+        brown.buildings["house"] = 1
+
+    assert raise_funds(player, 60)
+    assert all(brown.buildings["house"] == 0 for brown in browns)
+    assert sum(brown.mortgaged for brown in browns) == 2
+    assert player.money == 25 + 30 + 30
+
+
+def test_fails_without_touching_anything(player):
+    railroad = next(p for p in Property.instances if isinstance(p, Railroad))
+    railroad.owner = player
+
+    assert not raise_funds(player, 500)
+    assert not railroad.mortgaged
+    assert player.money == 0
+    assert LiquidationStats.summary()["failed"] == 1
+
+
+def test_pay_liquidates_before_going_bankrupt(player):
+    railroad = get_properties_of_type("railroad")[0]
+    railroad.owner = player
+    other_player = Player()
+
+    player.pay(other_player, 50)
+    assert railroad.mortgaged
+    assert player.money == railroad.mortgage_cost - 50
+    assert LiquidationStats.summary()["runs"] == 1
+
+
+def test_mortgaged_property_cant_be_built_on(player):
+    browns = get_properties_of_type("brown")
+    for brown in browns:
+        brown.owner = player
+    browns[0].mortgaged = True
+    player.money = 1_000
+
+    with pytest.raises(CantBuyBuildings):
+        browns[1].buy_building("house")
+    assert Board.spaces[1].buildings["house"] == 0
+
+
+def test_mortgages_are_paid_off_with_cash_to_spare(player):
+    railroad = get_properties_of_type("railroad")[0]
+    light_blues = get_properties_of_type("light blue")
+    for property_ in (railroad, *light_blues):
+        property_.owner = player
+    railroad.mortgaged = True
+    player.money = railroad.unmortgage_cost - 1
+
+    # paying it off never raises the money by mortgaging anything else
+    assert not railroad.un_mortgage(player)
+    assert railroad.mortgaged and not any(p.mortgaged for p in light_blues)
+    assert player.money == railroad.unmortgage_cost - 1
+
+    for light_blue in light_blues:
+        light_blue.mortgaged = True
+    player.monopolies.append(Monopoly(light_blues[0]))
+    player.money = sum(p.unmortgage_cost for p in light_blues) + player.money
+    player.pay_off_mortgages()
+    # the monopoly first, though the railroad comes before it on the board
+    assert not any(p.mortgaged for p in light_blues)
+    assert railroad.mortgaged
+    assert player.money == railroad.unmortgage_cost - 1
@@ -0,0 +1,37 @@
+import json
+from urllib.request import urlopen
+
+from buy_decision_algos import BuyEverything
+from metrics import SweepMetrics
+from sweep import Sweep
+
+
+def test_a_sweep_reports_its_progress(tmp_path):
+    snapshot_path = tmp_path / "metrics.json"
+    metrics = SweepMetrics(snapshot_path=str(snapshot_path), snapshot_every=0)
+    server = metrics.serve(0)
+    port = server.server_address[1]
+    try:
+        sweep = Sweep(
+            str(tmp_path / "sweep.jsonl"), chunk_size=2, max_rounds=30, metrics=metrics
+        )
+        results = sweep.run(
+            num_games=4, num_players=(2, 3), buy_decision_algorithms=(BuyEverything,)
+        )
+        assert all(not attr.startswith("_") for cell in results.values() for attr in cell)
+
+        text = urlopen(f"http://127.0.0.1:{port}/metrics").read().decode()
+        assert "monopoly_sweep_games_total 8" in text
+        assert (
+            'monopoly_sweep_units_done{algorithm="BuyEverything",num_players="3"} 2'
+            in text
+        )
+        assert 'attr="get_rounds_played_per_player"' in text
+        snapshot = json.loads(urlopen(f"http://127.0.0.1:{port}/metrics.json").read())
+        assert snapshot["games"] == 8
+        # every game of 30 rounds is cut off
+        assert snapshot["capped_rate"] == 1.0
+        assert [cell["units_total"] for cell in snapshot["cells"]] == [2, 2]
+    finally:
+        metrics.close()
+    assert json.loads(snapshot_path.read_text())["games"] == 8
@@ -1,4 +1,12 @@
-from monopoly import Bank, NUM_HOUSES, NUM_HOTELS, ALL_MONEY, Property, Player
+import gc
+import os
+import random
+import subprocess
+import sys
+import weakref
+
+from buy_decision_algos import BuyEverything, BuyIfHaveThreeTimesPrice
+from monopoly import Bank, NUM_HOUSES, NUM_HOTELS, ALL_MONEY, Game, Property, Player
 import pytest
 
 
@@ -19,3 +27,94 @@ def test_roll_the_dice():
         num, doubles = Player.roll_the_dice()
         assert 2 <= num <= 12
         assert isinstance(doubles, bool)
+
+
+def play(seed, algorithm=BuyEverything, **kwargs):
+    random.seed(seed)
+    game = Game(3, algorithm, max_rounds=80, **kwargs)
+    return game, (game.rounds, game.winner.seat, [p.money for p in game._players])
+
+
+def test_an_ended_game_is_freed_without_the_garbage_collector():
+    gc.disable()
+    try:
+        game, _ = play(4)
+        game.end()
+        winner = game.winner
+        assert Game.current is None
+        assert all(p.owner is None for p in Property.instances)
+        del winner
+        refs = [weakref.ref(obj) for obj in [game, *game._players, *game.properties]]
+        del game
+        assert all(ref() is None for ref in refs)
+    finally:
+        gc.enable()
+
+
+def test_games_dont_affect_each_other():
+    game, first = play(7)
+    game.end()
+    for seed in range(3):
+        play(seed, BuyIfHaveThreeTimesPrice)[0].end()
+    game, again = play(7)
+    game.end()
+    assert again == first
+
+
+def test_interleaved_games_have_their_own_bank():
+    first = Game(2, BuyEverything, autostart=False)
+    second = Game(2, BuyEverything, autostart=False)
+    Bank.pay(second._players[0], 100)
+    first.activate()
+    assert Bank.money == ALL_MONEY - 2 * 1_500
+    second.activate()
+    assert Bank.money == ALL_MONEY - 2 * 1_500 - 100
+    first.end()
+    second.end()
+
+
+def test_bankrupt_players_leave_the_ring():
+    game = Game(4, BuyEverything, autostart=False)
+    first, second, third, fourth = game._players
+    assert list(game.get_live_players()) == game._players
+    for player in (first, third):
+        player.bankrupt = True
+        game.remove_player(player)
+    game.remove_player(first)
+    assert game.num_active_players == 2
+    assert game.first_player is second
+    assert list(game.get_live_players()) == [second, fourth]
+    assert second.next_player is fourth and fourth.next_player is second
+    # a removed player still leads on to whoever is after them
+    assert third.next_player is fourth
+    game.end()
+
+
+def test_rolling_for_the_order():
+    random.seed(3)
+    game = Game(4, BuyEverything, autostart=False, roll_for_order=True)
+    first = game.first_player
+    order = list(game.get_live_players())
+    assert [player.seat for player in order] == [
+        (first.seat + i) % 4 for i in range(4)
+    ]
+    assert next(game.turns()) is first
+    game.end()
+
+
+def test_importing_the_engine_leaves_the_rest_for_later():
+    code = (
+        "import sys, monopoly; "
+        "print(' '.join(m for m in ('typing', 'json', 'hashlib', 'monopoly.text', "
+        "'monopoly.interactive') if m in sys.modules)); "
+        "print(monopoly.get_card_text(monopoly.SpeedingCard)); "
+        "print(monopoly.PendingBuyDecision.__module__)"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.splitlines()
+    assert output == ["", "Amende pour excès de vitesse. Payez M15.", "monopoly.interactive"]
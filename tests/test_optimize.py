@@ -0,0 +1,47 @@
+from buy_decision_algos import ParametricBuyDecision
+from optimize import Optimizer, to_normalized, to_params
+
+
+def get_optimizer(checkpoint_path):
+    return Optimizer(
+        population_size=4,
+        num_games=4,
+        first_rung_games=2,
+        max_rounds=50,
+        processes=1,
+        checkpoint_path=checkpoint_path,
+    )
+
+
+def test_normalization_round_trips():
+    defaults = ParametricBuyDecision().vector
+    assert to_params(to_normalized(defaults)) == defaults
+
+
+def test_run_reuses_evaluations_and_resumes(tmp_path):
+    checkpoint_path = str(tmp_path / "checkpoint.json")
+    optimizer = get_optimizer(checkpoint_path)
+    best = optimizer.run(generations=2)
+
+    assert isinstance(best, ParametricBuyDecision)
+    assert optimizer.games_reused > 0
+    # bad candidates are dropped before playing every seed
+    assert any(len(results) < 4 for results in optimizer.evaluations.values())
+
+    resumed = get_optimizer(checkpoint_path)
+    assert resumed.generation == 2
+    assert resumed.best == optimizer.best
+    assert resumed.sample() == optimizer.sample()
+
+
+def test_the_last_survivor_plays_every_seed():
+    optimizer = Optimizer(
+        population_size=4,
+        num_games=16,
+        first_rung_games=2,
+        max_rounds=50,
+        processes=1,
+    )
+    optimizer.step()
+    assert optimizer.best is not None
+    assert len(optimizer.evaluations[optimizer.best[0]]) >= 16
@@ -0,0 +1,79 @@
+import json
+import math
+from contextlib import redirect_stdout
+from io import StringIO
+
+import numpy as np
+
+from buy_decision_algos import BuyEverything, BuyIfHaveThreeTimesPrice
+from report import Report, bootstrap_means, get_interval
+from simulate import play_x_games
+
+
+def test_the_bootstrap_matches_the_standard_error():
+    rng = np.random.default_rng(0)
+    for values in (rng.poisson(60, 100_000), rng.normal(1_000, 300, 100_000)):
+        means = bootstrap_means(values, 4_000, np.random.default_rng(1), max_distinct=512)
+        standard_error = values.std() / math.sqrt(len(values))
+        assert abs(means.mean() - values.mean()) < standard_error / 10
+        assert abs(means.std() / standard_error - 1) < 0.1
+        low, high = get_interval(means)
+        assert low < values.mean() < high
+
+
+def test_paired_games_are_compared_game_by_game(tmp_path):
+    rng = np.random.default_rng(2)
+    baseline = rng.poisson(60, 5_000)
+    report = Report(resamples=1_000)
+    report.add("A", 4, {"rounds": baseline})
+    report.add("B", 4, {"rounds": baseline + rng.integers(0, 3, 5_000)})
+    report.add("B", 3, {"rounds": baseline})
+    paired, unpaired = report.compare("B", "A", 4, "rounds"), report.compare(
+        "B", "A", 4, "rounds", paired=False
+    )
+    assert paired.paired and not unpaired.paired
+    assert paired.difference == unpaired.difference
+    assert paired.low < paired.difference < paired.high
+    assert paired.high - paired.low < (unpaired.high - unpaired.low) / 5
+    assert paired.p_value < 1e-10
+    assert paired.effect_size > unpaired.effect_size > 0
+    # B played with 3 players, but A didn't
+    assert [c.num_players for c in report.get_comparisons()] == [4]
+
+    report.save(tmp_path / "report.json")
+    saved = json.loads((tmp_path / "report.json").read_text())
+    assert len(saved["summaries"]) == 3
+    assert saved["comparisons"][0]["algorithm"] == "B"
+
+
+def test_simulations_report_every_algorithm_and_number_of_players():
+    with redirect_stdout(StringIO()) as out:
+        report = play_x_games(
+            num_games=6,
+            num_players=(2, 3),
+            buy_decision_algorithms=(BuyEverything, BuyIfHaveThreeTimesPrice),
+        )
+    assert sorted(report.results) == [
+        ("BuyEverything", 2),
+        ("BuyEverything", 3),
+        ("BuyIfHaveThreeTimesPrice", 2),
+        ("BuyIfHaveThreeTimesPrice", 3),
+    ]
+    assert all(summary.games == 6 for summary in report.get_summaries())
+    assert "BuyIfHaveThreeTimesPrice - BuyEverything" in out.getvalue()
+
+
+def test_common_random_numbers_are_reported_seed_by_seed(tmp_path):
+    json_path = tmp_path / "report.json"
+    with redirect_stdout(StringIO()):
+        report = play_x_games(
+            num_games=4,
+            num_players=(2,),
+            buy_decision_algorithms=(BuyEverything, BuyIfHaveThreeTimesPrice),
+            common_random_numbers=True,
+            antithetic=True,
+            json_path=json_path,
+        )
+    (comparison,) = report.get_comparisons()
+    assert comparison.paired and comparison.num_players == 2
+    assert json.loads(json_path.read_text())["comparisons"][0]["paired"]
@@ -0,0 +1,54 @@
+import os
+
+from buy_decision_algos import BuyEverything, ParametricBuyDecision
+from monopoly import Board
+from result_cache import ResultCache
+
+
+def test_second_request_comes_from_the_cache(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    first = cache.play(BuyEverything, 2, range(3), max_rounds=50)
+    second = cache.play(BuyEverything, 2, range(3), max_rounds=50)
+    assert first == second
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert len(first["get_rounds_played_per_player"]) == 3
+
+    reopened = ResultCache(str(tmp_path))
+    assert reopened.play(BuyEverything, 2, range(3), max_rounds=50) == first
+    assert reopened.hits == 1
+
+
+def test_key_covers_cell_parameters_and_board(tmp_path, monkeypatch):
+    cache = ResultCache(str(tmp_path))
+    key = cache.get_key(BuyEverything, 2, range(10))
+    assert key == cache.get_key(BuyEverything, 2, range(10))
+    assert key != cache.get_key(BuyEverything, 3, range(10))
+    assert key != cache.get_key(BuyEverything, 2, range(11))
+    assert cache.get_key(ParametricBuyDecision(), 2, range(10)) != cache.get_key(
+        ParametricBuyDecision(cash_multiple=2), 2, range(10)
+    )
+
+    monkeypatch.setitem(Board.spaces[1].rent, 0, 3)
+    assert ResultCache(str(tmp_path)).get_key(BuyEverything, 2, range(10)) != key
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=1)
+    first_key = cache.get_key(BuyEverything, 2, range(1))
+    cache.put(first_key, {"a": [1]})
+    cache.put(cache.get_key(BuyEverything, 2, range(2)), {"a": [1, 2]})
+    assert cache.get(first_key) is None
+    assert cache.evictions == 1
+
+
+def test_a_corrupt_entry_is_played_again(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    first = cache.play(BuyEverything, 2, range(3), max_rounds=50)
+    path = cache.get_path(cache.get_key(BuyEverything, 2, range(3), max_rounds=50))
+    with open(path, "r+") as f:
+        f.truncate(10)
+
+    reopened = ResultCache(str(tmp_path))
+    assert reopened.play(BuyEverything, 2, range(3), max_rounds=50) == first
+    assert (reopened.hits, reopened.misses) == (0, 1)
+    assert reopened.size == os.path.getsize(path)
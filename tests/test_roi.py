@@ -0,0 +1,55 @@
+import random
+from collections import Counter
+
+import pytest
+
+from buy_decision_algos import BuyEverything
+from monopoly import Game, MOVE, RENT, BUY
+from roi import SPACE_COUNTERS, SpaceTable
+from sweep import Sweep
+
+
+def test_counters_match_the_events():
+    events = Counter()
+    amounts = Counter()
+
+    def recorder(event, seat, a, b):
+        events[event] += 1
+        if event in (RENT, BUY):
+            amounts[event] += b
+
+    random.seed(5)
+    game = Game(3, BuyEverything, max_rounds=150, recorder=recorder, counters=True)
+    totals = game.get_space_counters()
+    assert sum(totals["landings"]) == events[MOVE]
+    assert sum(totals["rent"]) == amounts[RENT]
+    assert sum(totals["purchase_price"]) == amounts[BUY]
+    owned = [p.index for p in game.properties if p.owner]
+    assert all(totals["turns_owned"][index] > 0 for index in owned)
+    assert all(0 <= turns <= game.rounds for turns in totals["turns_owned"])
+    game.end()
+
+    random.seed(5)
+    game = Game(3, BuyEverything, max_rounds=150)
+    assert game.counters is None
+    game.end()
+
+
+def test_sweep_collects_the_counters(tmp_path):
+    sweep = Sweep(
+        str(tmp_path / "sweep.jsonl"),
+        attrs_to_get=("get_rounds_played_per_player", SPACE_COUNTERS),
+        chunk_size=5,
+        max_rounds=100,
+    )
+    results = sweep.run(
+        num_games=10, num_players=[3], buy_decision_algorithms=[BuyEverything]
+    )
+    table = SpaceTable.from_results(results[("BuyEverything", 3)])
+    assert table.num_games == 10
+    assert sum(table.means["landings"]) > 0
+    groups = table.get_groups()
+    assert "railroad" in groups
+    assert sum(group["rent"] for group in groups.values()) == pytest.approx(
+        sum(table.means["rent"])
+    )
@@ -0,0 +1,137 @@
+import asyncio
+import json
+import os
+import weakref
+
+from monopoly import Game
+from server import GameServer, encode_frame, read_frame
+
+
+def play(coroutine):
+    return asyncio.run(coroutine)
+
+
+async def play_a_game(session):
+    state = await session.wait_for_turn()
+    decisions = 0
+    while not state["over"]:
+        assert state["pending"]["seat"] == 0
+        state = await session.decide(0, decisions % 2 == 0)
+        decisions += 1
+    return state, decisions
+
+
+def test_games_wait_for_people_and_stay_apart():
+    async def run():
+        server = GameServer()
+        sessions = [server.create(num_players=3, max_rounds=60) for _ in range(20)]
+        results = await asyncio.gather(*(play_a_game(session) for session in sessions))
+        for session, (state, decisions) in zip(sessions, results):
+            assert state["over"]
+            assert decisions > 0
+            owned = [p for player in state["players"] for p in player["properties"]]
+            assert len(owned) == len(set(owned))
+            assert all(
+                p.owner in session.game._players
+                for p in session.game.properties
+                if p.owner
+            )
+
+    play(run())
+
+
+def test_finished_games_are_ended_and_forgotten():
+    async def run():
+        server = GameServer(finished_ttl=0.01)
+        session = server.create(num_players=2, humans=[], max_rounds=40)
+        state = await session.wait_for_turn()
+        assert state["over"] and state["winner"] is not None
+        await session.task
+        assert Game.current is not session.game
+        assert session.turns is None
+        assert server.get(str(session.id)).state == state
+        game = weakref.ref(session.game)
+        del session
+        await asyncio.sleep(0.05)
+        assert not server.sessions
+        return game
+
+    game = play(run())
+    assert game() is None
+
+
+async def request(reader, writer, method, path, payload=None):
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n".encode()
+        + body
+    )
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while (line := await reader.readline()) != b"\r\n":
+        name, _, value = line.decode().partition(":")
+        headers[name.lower()] = value.strip()
+    return status, json.loads(await reader.readexactly(int(headers["content-length"])))
+
+
+def test_http_and_websocket():
+    async def run():
+        server = await GameServer().serve(port=0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+        status, state = await request(
+            reader, writer, "POST", "/games", {"players": 2, "max_rounds": 40}
+        )
+        assert status == 201
+        game_path = f"/games/{state['id']}"
+        if not state["over"]:
+            assert state["pending"]["seat"] == 0
+            status, _ = await request(
+                reader, writer, "POST", f"{game_path}/decisions", {"seat": 1}
+            )
+            assert status == 409
+            status, state = await request(
+                reader,
+                writer,
+                "POST",
+                f"{game_path}/decisions",
+                {"seat": 0, "buy": True},
+            )
+            assert status == 200
+        assert (await request(reader, writer, "GET", "/games/999"))[0] == 404
+        for payload in (
+            {"players": 9},
+            {"players": "four"},
+            {"max_rounds": [40]},
+            {"players": 2, "humans": [2]},
+            [2],
+        ):
+            status, error = await request(reader, writer, "POST", "/games", payload)
+            assert status == 400 and "error" in error
+
+        _, state = await request(
+            reader, writer, "POST", "/games", {"players": 2, "max_rounds": 40}
+        )
+        ws_reader, ws_writer = await asyncio.open_connection("127.0.0.1", port)
+        ws_writer.write(
+            f"GET /games/{state['id']}/ws HTTP/1.1\r\nUpgrade: websocket\r\n"
+            "Connection: Upgrade\r\nSec-WebSocket-Key: dGhlIHNhbXBsZSBub25jZQ==\r\n\r\n".encode()
+        )
+        assert b"101" in await ws_reader.readline()
+        while await ws_reader.readline() != b"\r\n":
+            pass
+        state = json.loads(await read_frame(ws_reader))
+        while not state["over"]:
+            ws_writer.write(
+                encode_frame(json.dumps({"seat": 0, "buy": True}), mask=os.urandom(4))
+            )
+            state = json.loads(await read_frame(ws_reader))
+        assert state["winner"] is not None
+
+        writer.close()
+        ws_writer.close()
+        server.close()
+        await server.wait_closed()
+
+    play(run())
@@ -0,0 +1,26 @@
+import os
+
+import numpy as np
+import pytest
+
+from buy_decision_algos import BuyEverything
+from result_cache import play
+from shared_results import play_shared
+
+ATTRS = ("get_rounds_played_per_player", "rounds")
+
+
+def test_workers_write_the_same_results_as_playing_inline():
+    with play_shared(
+        BuyEverything, 3, range(20), ATTRS, max_rounds=60, processes=2, chunk_size=3
+    ) as results:
+        expected = play(BuyEverything, 3, range(20), ATTRS, 60)
+        assert results.games_done == 20
+        for attr in ATTRS:
+            assert np.array_equal(results.get(attr), expected[attr])
+        count, mean, std_dev = results.get_summary()["rounds"]
+        assert count == 20
+        assert mean == pytest.approx(np.mean(expected["rounds"]))
+        assert std_dev == pytest.approx(np.std(expected["rounds"], ddof=1))
+        name = results.memory.name
+    assert not os.path.exists(f"/dev/shm/{name.lstrip('/')}")
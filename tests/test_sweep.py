@@ -0,0 +1,74 @@
+from buy_decision_algos import BuyEverything, BuyIfHaveThreeTimesPrice
+from sweep import Sweep
+import sweep
+
+
+def get_sweep(checkpoint_path, **kwargs):
+    return Sweep(str(checkpoint_path), chunk_size=2, max_rounds=50, **kwargs)
+
+
+def test_resumes_and_extends_without_redoing_work(tmp_path, monkeypatch):
+    full = get_sweep(tmp_path / "full.jsonl").run(
+        num_games=6, num_players=(2, 3), buy_decision_algorithms=(BuyEverything,)
+    )
+
+    checkpoint_path = tmp_path / "sweep.jsonl"
+    get_sweep(checkpoint_path).run(
+        num_games=4, num_players=(2, 3), buy_decision_algorithms=(BuyEverything,)
+    )
+    # a crash in the middle of an append
+    with open(checkpoint_path, "a") as f:
+        f.write('{"algorithm": "BuyEve')
+
+    played = []
+    play_unit = sweep.play_unit
+    monkeypatch.setattr(sweep, "play_unit", lambda task: played.append(task) or play_unit(task))
+    resumed = get_sweep(checkpoint_path).run(
+        num_games=6, num_players=(2, 3), buy_decision_algorithms=(BuyEverything,)
+    )
+
+    assert sorted((task[2], task[3]) for task in played) == [(2, 2), (3, 2)]
+    assert resumed == full
+
+
+def test_adding_an_algorithm_keeps_finished_cells(tmp_path):
+    checkpoint_path = tmp_path / "sweep.jsonl"
+    first = get_sweep(checkpoint_path).run(
+        num_games=2, num_players=(2,), buy_decision_algorithms=(BuyEverything,)
+    )
+    second = get_sweep(checkpoint_path, compact_every=1).run(
+        num_games=2,
+        num_players=(2,),
+        buy_decision_algorithms=(BuyEverything, BuyIfHaveThreeTimesPrice),
+    )
+    assert second[("BuyEverything", 2)] == first[("BuyEverything", 2)]
+    assert ("BuyIfHaveThreeTimesPrice", 2) in second
+    with open(checkpoint_path) as f:
+        assert len(f.read().splitlines()) == 3
+
+
+def test_resumes_twice_after_a_torn_write(tmp_path, monkeypatch):
+    checkpoint_path = tmp_path / "sweep.jsonl"
+    kwargs = dict(num_players=(2,), buy_decision_algorithms=(BuyEverything,))
+    get_sweep(checkpoint_path).run(num_games=2, **kwargs)
+    with open(checkpoint_path, "a") as f:
+        f.write('{"algorithm": "BuyEve')
+
+    # the resumed sweep crashes too, after recording a unit
+    play_unit = sweep.play_unit
+
+    def crash_on_the_second_unit(task):
+        if task[3] == 2:
+            raise KeyboardInterrupt
+        return play_unit(task)
+
+    monkeypatch.setattr(sweep, "play_unit", crash_on_the_second_unit)
+    try:
+        get_sweep(checkpoint_path).run(num_games=6, **kwargs)
+    except KeyboardInterrupt:
+        pass
+
+    resumed = get_sweep(checkpoint_path)
+    assert resumed.done[("BuyEverything", 2)] == {0, 1}
+    with open(checkpoint_path) as f:
+        assert all(line.startswith("{") for line in f.read().splitlines())
@@ -0,0 +1,28 @@
+from buy_decision_algos import BuyEverything
+from event_log import replay
+from sweep import Sweep
+from tail_capture import TailSampler
+
+
+def test_keeps_and_replays_the_longest_games(tmp_path):
+    tail = TailSampler(k=3)
+    sweep = Sweep(str(tmp_path / "sweep.jsonl"), chunk_size=4, max_rounds=80, tail=tail)
+    results = sweep.run(
+        num_games=12, num_players=(2, 3), buy_decision_algorithms=(BuyEverything,)
+    )
+    assert results[("BuyEverything", 2)]["get_rounds_played_per_player"][0] == 12
+    assert tail.offered <= 6 * 3 * 2
+
+    longest = tail.get_games("longest")
+    assert len(longest) == 3
+    assert [game.rounds for game in longest] == sorted(
+        (game.rounds for game in longest), reverse=True
+    )
+    assert all(game.rounds == 80 for game in longest)
+    assert len(tail.get_games("slowest")) == 3
+
+    games = tail.capture(tmp_path / "logs")
+    for game in games:
+        assert replay(game.log).turn >= game.rounds // game.num_players
+        assert (tmp_path / "logs").joinpath(game.path.split("/")[-1]).exists()
+    assert "cut off at max_rounds (80)" in longest[0].get_reasons()
@@ -0,0 +1,38 @@
+from contextlib import redirect_stdout
+from io import StringIO
+
+from buy_decision_algos import BuyIfNoOneOwnsTypeAndIsOfTheOneTypeOwned
+from buy_decision_algos import ParametricBuyDecision
+from monopoly import Game
+from result_cache import play
+from thread_runner import ThreadRunner, play_threaded
+
+ATTRS = ("get_rounds_played_per_player", "rounds")
+
+
+def test_threads_play_the_games_a_single_engine_does():
+    seeds = range(40)
+    with ThreadRunner(threads=3) as runner:
+        for algorithm in (
+            BuyIfNoOneOwnsTypeAndIsOfTheOneTypeOwned,
+            ParametricBuyDecision(reserve=100),
+        ):
+            with redirect_stdout(StringIO()):
+                expected = play(algorithm, 3, seeds, ATTRS, 200)
+            assert (
+                runner.play(algorithm, 3, seeds, ATTRS, 200, chunk_size=7) == expected
+            )
+    # the threads' engines are their own
+    assert Game.current is None
+
+
+def test_plays_on_processes_where_the_gil_is_on():
+    # and on threads where it isn't: the results are the same either way
+    with redirect_stdout(StringIO()):
+        expected = play(
+            BuyIfNoOneOwnsTypeAndIsOfTheOneTypeOwned, 2, range(10), ATTRS, 50
+        )
+    results = play_threaded(
+        BuyIfNoOneOwnsTypeAndIsOfTheOneTypeOwned, 2, range(10), ATTRS, 50, threads=2
+    )
+    assert results == expected
@@ -0,0 +1,37 @@
+import os
+import signal
+import threading
+
+from buy_decision_algos import BuyEverything, ParametricBuyDecision
+from result_cache import play
+from warm_pool import WarmPool
+
+
+def test_plays_the_same_games_as_playing_them_inline():
+    algorithm = ParametricBuyDecision(cash_multiple=1.5)
+    with WarmPool(processes=2) as pool:
+        results = pool.play(algorithm, 3, range(7), max_rounds=40, chunk_size=3)
+        assert results == play(
+            algorithm, 3, range(7), ("get_rounds_played_per_player",), 40
+        )
+        assert pool.play(BuyEverything, 2, range(5, 9), max_rounds=40) == play(
+            BuyEverything, 2, range(5, 9), ("get_rounds_played_per_player",), 40
+        )
+        assert pool.ping() < 0.1
+        assert len(pool.dispatch_latencies) == 5
+
+
+def test_jobs_of_a_worker_that_dies_are_played_again():
+    with WarmPool(processes=2) as pool:
+        first = pool.workers[0]
+        os.kill(first.pid, signal.SIGKILL)
+        first.join()
+        second = pool.workers[1]
+        # while it's playing
+        threading.Timer(0.05, os.kill, (second.pid, signal.SIGKILL)).start()
+        results = pool.play(BuyEverything, 4, range(40), max_rounds=100, chunk_size=20)
+        assert results == play(
+            BuyEverything, 4, range(40), ("get_rounds_played_per_player",), 100
+        )
+        assert first not in pool.workers and second not in pool.workers
+        assert all(worker.is_alive() for worker in pool.workers)
@@ -0,0 +1,49 @@
+import random
+
+import numpy as np
+
+from buy_decision_algos import BuyEverything
+from win_model import WinModel, evaluate, log_states, play_until_clear
+
+
+def test_trains_predicts_and_stops_games(tmp_path):
+    states = log_states(BuyEverything, 3, range(15), every=10, max_rounds=300)
+    features, alive, winners, rounds, final_rounds, games = states
+    assert features.shape == (len(winners), 3, 8)
+    assert (rounds <= final_rounds).all()
+    model = WinModel.fit(*states, iterations=100)
+
+    probabilities = model.predict_states(features, alive)
+    assert np.allclose(probabilities.sum(axis=1), 1)
+    assert (probabilities[~alive] == 0).all()
+    # more cash, better chances
+    assert model.weights[0] > 0
+
+    path = tmp_path / "model.json"
+    model.save(path)
+    loaded = WinModel.load(path)
+    assert np.allclose(loaded.predict_states(features, alive), probabilities)
+
+    random.seed(100)
+    game, predicted = play_until_clear(
+        3, BuyEverything, model, threshold=0, check_every=10
+    )
+    assert game.truncated and game.rounds < 20
+    assert game.predicted_rounds >= game.rounds
+    game.end()
+    random.seed(100)
+    game, winner = play_until_clear(
+        3, BuyEverything, model, threshold=2, max_rounds=300
+    )
+    assert not game.truncated and winner == game.winner.seat
+    game.end()
+
+    evaluation = evaluate(
+        model, BuyEverything, 3, range(100, 105), threshold=0.9, max_rounds=300
+    )
+    assert len(evaluation.correct) == 5
+    assert evaluation.turn_reduction >= 1
+    assert sum(count for _, _, count in evaluation.get_calibration()) == len(
+        evaluation.confidences
+    )
+    assert "fewer turns" in str(evaluation)
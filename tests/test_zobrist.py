@@ -0,0 +1,76 @@
+import random
+
+from buy_decision_algos import BuyEverything, BuyIfHaveThreeTimesPrice
+from monopoly import Game
+from zobrist import CachedBuyDecision, TranspositionCache, ZobristHash
+
+
+def test_updates_agree_with_the_hash_from_scratch():
+    random.seed(3)
+    game = Game(4, BuyEverything, max_rounds=300, autostart=False, hashing=True)
+    hashes = set()
+    for _ in game.turns():
+        assert game.zobrist.value == game.zobrist.compute(game)
+        hashes.add(game.zobrist.value)
+    assert game.zobrist.updates > game.rounds
+    assert len(hashes) > game.rounds // 2
+    game.end()
+
+
+def test_same_state_same_hash():
+    hashes = []
+    for _ in range(2):
+        random.seed(8)
+        game = Game(3, BuyEverything, max_rounds=100, hashing=True)
+        hashes.append(game.zobrist.value)
+        game.end()
+    assert hashes[0] == hashes[1]
+    random.seed(8)
+    game = Game(3, BuyEverything, max_rounds=100)
+    assert game.zobrist is None
+    assert ZobristHash(game).value == hashes[0]
+    game.end()
+
+
+def test_cache_evicts_the_least_recently_used_and_the_stale():
+    cache = TranspositionCache(max_entries=2, max_age=1)
+    cache.put(1, "a")
+    cache.put(2, "b")
+    assert cache.get(1) == "a"
+    cache.put(3, "c")
+    assert cache.get(2) is None
+    assert (cache.hits, cache.misses, cache.evictions) == (1, 1, 1)
+    cache.new_generation()
+    assert cache.get(3) == "c"
+    cache.new_generation()
+    cache.new_generation()
+    assert cache.get(3) is None
+    assert cache.expirations == 1
+    assert cache.get_stats()["bytes"] > 0
+
+
+def test_cached_decisions_are_the_same_decisions():
+    cache = TranspositionCache()
+    results = []
+    for seats in (None, [CachedBuyDecision(BuyEverything(), cache)] * 3):
+        random.seed(4)
+        game = Game(3, BuyEverything, seats=seats, max_rounds=300, hashing=True)
+        results.append((game.rounds, game.zobrist.value))
+        game.end()
+    assert results[0] == results[1]
+    assert cache.misses > 0
+
+
+def test_exact_cash_keeps_decisions_exact():
+    cache = TranspositionCache()
+    algorithm = BuyIfHaveThreeTimesPrice()
+    random.seed(6)
+    game = Game(3, BuyEverything, max_rounds=200, autostart=False, hashing=True)
+    game.zobrist = ZobristHash(game, cash_bucket=1)
+    decide = CachedBuyDecision(algorithm, cache)
+    for player in game.turns():
+        for property_ in game.properties:
+            assert decide(property_, player) == algorithm(property_, player)
+            assert decide(property_, player) == algorithm(property_, player)
+    assert cache.hits == cache.misses
+    game.end()
@@ -0,0 +1,215 @@
+"""
+Games played on threads instead of processes, for free-threaded builds of CPython (3.13t and
+later) where threads run Python in parallel: nothing is pickled and the workers share one
+interpreter's memory.
+
+The engine keeps the game being played in class attributes (see `Game.activate`), so two games
+can't be played at once on the same engine. Every thread gets an engine of its own instead: a
+private copy of monopoly/core.py and buy_decision_algos.py, loaded under a name of its own, with
+its own `Game.current`, board, bank and decks, its own random numbers (so a game played on a
+thread is the game `random.seed(seed)` would have given) and its `print` silenced, since
+`sys.stdout` can't be swapped for one thread. Everything the copies share is read-only or
+thread-safe: the editions they build their boards from (see editions.py), the liquidation
+solver's cache (an `lru_cache`) and the exceptions.
+
+    with ThreadRunner(threads=8) as runner:
+        results = runner.play(BuyEverything, 4, range(10_000))
+
+`play_threaded` does the same, and where the GIL is on, and threads can't play games any
+faster than one, it plays them on processes instead (see shared_results.py).
+
+Buy decision algorithms are swapped for the copy's; an algorithm from elsewhere is used as it
+is, so it mustn't look at the board through the monopoly module.
+"""
+import copy
+import importlib.util
+import itertools
+import random
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Sequence
+
+import buy_decision_algos
+import monopoly.core
+from monopoly import MAX_ROUNDS
+
+CHUNK_SIZE = 25
+
+
+def is_free_threaded() -> bool:
+    """
+    whether threads can run Python in parallel, i.e. the build is free-threaded and the GIL
+    hasn't been turned back on
+    """
+    return not getattr(sys, "_is_gil_enabled", lambda: True)()
+
+
+def silent_print(*_, **__):
+    pass
+
+
+def load_copy(name: str, module) -> object:
+    """
+    a fresh copy of `module`, run from its source under `name` without being registered
+    """
+    spec = importlib.util.spec_from_file_location(name, module.__file__)
+    copy_ = importlib.util.module_from_spec(spec)
+    copy_.print = silent_print
+    spec.loader.exec_module(copy_)
+    return copy_
+
+
+class Engine:
+    """
+    a private copy of the engine, for one thread
+    """
+
+    numbers = itertools.count()
+
+    def __init__(self):
+        number = next(self.numbers)
+        self.random = random.Random()
+        self.core = load_copy(f"monopoly.core_{number}", monopoly.core)
+        self.core.choice = self.random.choice
+        self.core.shuffle = self.random.shuffle
+        self.algorithms = load_copy(f"buy_decision_algos_{number}", buy_decision_algos)
+        self.algorithms.Property = self.core.Property
+        self.algorithms.Player = self.core.Player
+
+    def get_algorithm(self, algorithm):
+        """
+        the copy's class for a buy decision algorithm, or an instance of it with the same
+        parameters
+        """
+        class_ = algorithm if isinstance(algorithm, type) else type(algorithm)
+        if getattr(buy_decision_algos, class_.__name__, None) is not class_:
+            return algorithm
+        copy_class = getattr(self.algorithms, class_.__name__)
+        if isinstance(algorithm, type):
+            return copy_class
+        instance = copy.copy(algorithm)
+        instance.__class__ = copy_class
+        return instance
+
+    def play(
+        self,
+        buy_decision_algorithm,
+        num_players: int,
+        seeds: Sequence[int],
+        indexes: range,
+        attrs_to_get: Sequence[str],
+        max_rounds: int,
+        results: Dict[str, list],
+    ):
+        """
+        plays the games of `indexes`, writing their results into their place in `results`
+        """
+        buy_decision_algorithm = self.get_algorithm(buy_decision_algorithm)
+        seats = None
+        if not isinstance(buy_decision_algorithm, type):
+            seats = [buy_decision_algorithm] * num_players
+            buy_decision_algorithm = type(buy_decision_algorithm)
+        for index in indexes:
+            self.random.seed(seeds[index])
+            game = self.core.Game(
+                num_players, buy_decision_algorithm, seats=seats, max_rounds=max_rounds
+            )
+            for attr in attrs_to_get:
+                value = getattr(game, attr)
+                results[attr][index] = value() if callable(value) else value
+            game.end()
+
+
+class ThreadRunner:
+    """
+    a pool of threads, each with its engine, kept for as long as the runner is open
+    """
+
+    def __init__(self, threads=4):
+        self.threads = threads
+        self.local = threading.local()
+        self.executor = ThreadPoolExecutor(threads, initializer=self.start_thread)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def start_thread(self):
+        self.local.engine = Engine()
+
+    def play_chunk(self, *args):
+        self.local.engine.play(*args)
+
+    def play(
+        self,
+        buy_decision_algorithm,
+        num_players: int,
+        seeds: Sequence[int],
+        attrs_to_get=("get_rounds_played_per_player",),
+        max_rounds=MAX_ROUNDS,
+        chunk_size=CHUNK_SIZE,
+    ) -> Dict[str, List]:
+        """
+        attribute -> its value for every game, in the order of the seeds
+        """
+        results = {attr: [None] * len(seeds) for attr in attrs_to_get}
+        futures = [
+            self.executor.submit(
+                self.play_chunk,
+                buy_decision_algorithm,
+                num_players,
+                seeds,
+                range(first, min(first + chunk_size, len(seeds))),
+                attrs_to_get,
+                max_rounds,
+                results,
+            )
+            for first in range(0, len(seeds), chunk_size)
+        ]
+        for future in futures:
+            future.result()
+        return results
+
+    def close(self):
+        self.executor.shutdown()
+
+
+def play_threaded(
+    buy_decision_algorithm,
+    num_players: int,
+    seeds: Sequence[int],
+    attrs_to_get=("get_rounds_played_per_player",),
+    max_rounds=MAX_ROUNDS,
+    threads=4,
+    chunk_size=CHUNK_SIZE,
+    force_threads=False,
+) -> Dict[str, List]:
+    """
+    plays a game per seed on `threads` threads, or on as many processes where the GIL is on,
+    unless `force_threads`
+    """
+    if threads > 1 and not (force_threads or is_free_threaded()):
+        from shared_results import play_shared
+
+        with play_shared(
+            buy_decision_algorithm,
+            num_players,
+            seeds,
+            attrs_to_get,
+            max_rounds,
+            processes=threads,
+            chunk_size=chunk_size,
+        ) as results:
+            return {attr: results.get(attr).tolist() for attr in attrs_to_get}
+    with ThreadRunner(threads) as runner:
+        return runner.play(
+            buy_decision_algorithm,
+            num_players,
+            seeds,
+            attrs_to_get,
+            max_rounds,
+            chunk_size,
+        )
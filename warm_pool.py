@@ -0,0 +1,289 @@
+"""
+A pool of worker processes that stay up between jobs, for runs made of lots of short jobs (small
+cells of a sweep, evaluations for the optimizer...) where starting workers would cost more than
+the games.
+
+The pool imports the engine and builds the board once, in this process, then forks its workers,
+which start out with all of that already done. A job is a compact, fixed-size descriptor (which
+algorithm, number of players, a range of seeds, the round limit, and the parameters of a
+parametric algorithm) sent over a pipe, and the results come back as packed doubles, so sending
+one costs about as much as a system call.
+
+    with WarmPool(processes=4) as pool:
+        results = pool.play(BuyEverything, num_players=4, seeds=range(1_000))
+
+`dispatch_latencies` holds, for every job, the time between sending it and a worker starting on
+it; `ping` measures a round trip to a worker with no games in it.
+
+A worker that dies in the middle of a job (killed for memory, by a signal...) is replaced by a new
+one, and its job is sent again, up to `MAX_ATTEMPTS` times in all before `run` gives up with
+`WorkerDied`.
+"""
+import multiprocessing
+import os
+import random
+import statistics
+import struct
+from array import array
+from multiprocessing.connection import wait
+from time import perf_counter
+from typing import Dict, List, Sequence
+
+import buy_decision_algos
+from buy_decision_algos import BuyDecision
+from exceptions import Argument, WorkerDied
+from monopoly import Game, MAX_ROUNDS
+from simulate import get_results, silence
+
+MAX_PARAMETERS = 8
+# job id, algorithm, number of players, number of parameters, first seed, number of seeds,
+# round limit, parameters
+JOB = struct.Struct(f"<IHBBqII{MAX_PARAMETERS}d")
+# job id, when the worker started on it
+REPLY = struct.Struct("<Id")
+STOP = b""
+MAX_ATTEMPTS = 3
+
+ALGORITHMS = tuple(
+    sorted(
+        (
+            value
+            for value in vars(buy_decision_algos).values()
+            if isinstance(value, type)
+            and issubclass(value, BuyDecision)
+            and value is not BuyDecision
+        ),
+        key=lambda algorithm: algorithm.__name__,
+    )
+)
+
+
+def encode_job(
+    job_id: int, algorithm, num_players: int, seeds: range, max_rounds
+) -> bytes:
+    if seeds.step != 1:
+        raise Argument("seeds must be a range with a step of 1")
+    parameters = ()
+    if not isinstance(algorithm, type):
+        parameters = algorithm.vector
+        algorithm = type(algorithm)
+    if algorithm not in ALGORITHMS:
+        raise Argument(f"{algorithm.__name__} isn't in buy_decision_algos")
+    padded = tuple(parameters) + (0.0,) * (MAX_PARAMETERS - len(parameters))
+    return JOB.pack(
+        job_id,
+        ALGORITHMS.index(algorithm),
+        num_players,
+        len(parameters),
+        seeds.start,
+        len(seeds),
+        max_rounds,
+        *padded,
+    )
+
+
+def play_job(descriptor: bytes, attrs_to_get: Sequence[str]) -> array:
+    """
+    the job's results, attribute by attribute, each with a value per game
+    """
+    (
+        _,
+        algorithm_index,
+        num_players,
+        num_parameters,
+        first_seed,
+        num_seeds,
+        max_rounds,
+        *parameters,
+    ) = JOB.unpack(descriptor)
+    algorithm = ALGORITHMS[algorithm_index]
+    seats = None
+    if num_parameters:
+        seats = [algorithm.from_vector(parameters[:num_parameters])] * num_players
+    results = {attr: [] for attr in attrs_to_get}
+    for seed in range(first_seed, first_seed + num_seeds):
+        random.seed(seed)
+        game = Game(num_players, algorithm, seats=seats, max_rounds=max_rounds)
+        get_results(results, game, attrs_to_get)
+        game.end()
+    return array("d", (value for attr in attrs_to_get for value in results[attr]))
+
+
+def work(connection, attrs_to_get):
+    silence()
+    while True:
+        descriptor = connection.recv_bytes()
+        if descriptor == STOP:
+            break
+        started = perf_counter()
+        (job_id,) = struct.unpack_from("<I", descriptor)
+        results = play_job(descriptor, attrs_to_get)
+        connection.send_bytes(REPLY.pack(job_id, started) + results.tobytes())
+
+
+class WarmPool:
+    def __init__(self, processes=None, attrs_to_get=("get_rounds_played_per_player",)):
+        self.attrs_to_get = tuple(attrs_to_get)
+        self.dispatch_latencies: List[float] = []
+        self.job_ids = 0
+        self.context = multiprocessing.get_context("fork")
+        self.connections = []
+        self.workers = []
+        for _ in range(processes or os.cpu_count()):
+            connection, worker = self.start_worker()
+            self.connections.append(connection)
+            self.workers.append(worker)
+
+    def start_worker(self):
+        connection, worker_connection = self.context.Pipe()
+        worker = self.context.Process(
+            target=work, args=(worker_connection, self.attrs_to_get), daemon=True
+        )
+        worker.start()
+        worker_connection.close()
+        return connection, worker
+
+    def replace_worker(self, connection):
+        """
+        a new worker in the place of the one at the other end of `connection`, which died;
+        the new worker's connection
+        """
+        index = self.connections.index(connection)
+        self.workers[index].join()
+        connection.close()
+        self.connections[index], self.workers[index] = self.start_worker()
+        return self.connections[index]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        for connection, worker in zip(self.connections, self.workers):
+            try:
+                connection.send_bytes(STOP)
+            except OSError:
+                pass
+            worker.join()
+            connection.close()
+        self.connections = []
+        self.workers = []
+
+    def run(self, jobs: Sequence[tuple]) -> List[Dict[str, List[float]]]:
+        """
+        plays (algorithm, number of players, seeds, round limit) jobs, a job per worker at a time;
+        the results of each job, in the order of `jobs`
+        """
+        descriptors = []
+        for algorithm, num_players, seeds, max_rounds in jobs:
+            descriptors.append(
+                encode_job(self.job_ids, algorithm, num_players, seeds, max_rounds)
+            )
+            self.job_ids += 1
+        first_id = self.job_ids - len(descriptors)
+        sizes = [len(seeds) for _, _, seeds, _ in jobs]
+        results = [None] * len(jobs)
+        # the last is sent first
+        pending = descriptors[::-1]
+        attempts = [0] * len(jobs)
+        sent_at = {}
+        # connection -> the job it's playing
+        busy = {}
+        idle = list(self.connections)
+        remaining = len(jobs)
+        while remaining:
+            while idle and pending:
+                descriptor = pending.pop()
+                connection = idle.pop()
+                job_id = struct.unpack_from("<I", descriptor)[0]
+                sent_at[job_id] = perf_counter()
+                try:
+                    connection.send_bytes(descriptor)
+                except OSError:
+                    # the worker died idle: the job goes to the new one
+                    pending.append(descriptor)
+                    idle.append(self.replace_worker(connection))
+                    continue
+                attempts[job_id - first_id] += 1
+                busy[connection] = descriptor
+            for connection in wait(list(busy)):
+                try:
+                    reply = connection.recv_bytes()
+                except (EOFError, OSError):
+                    descriptor = busy.pop(connection)
+                    job_id = struct.unpack_from("<I", descriptor)[0]
+                    sent_at.pop(job_id)
+                    idle.append(self.replace_worker(connection))
+                    if attempts[job_id - first_id] >= MAX_ATTEMPTS:
+                        self.drain(busy)
+                        raise WorkerDied(
+                            f"job {job_id} killed its worker {MAX_ATTEMPTS} times"
+                        )
+                    pending.append(descriptor)
+                    continue
+                job_id, started = REPLY.unpack_from(reply)
+                self.dispatch_latencies.append(started - sent_at.pop(job_id))
+                values = array("d")
+                values.frombytes(reply[REPLY.size :])
+                index = job_id - first_id
+                size = sizes[index]
+                results[index] = {
+                    attr: values[i * size : (i + 1) * size].tolist()
+                    for i, attr in enumerate(self.attrs_to_get)
+                }
+                del busy[connection]
+                idle.append(connection)
+                remaining -= 1
+        return results
+
+    def drain(self, busy):
+        """
+        waits for the jobs still being played and drops their results, so that the next run
+        doesn't read them
+        """
+        for connection in busy:
+            try:
+                connection.recv_bytes()
+            except (EOFError, OSError):
+                self.replace_worker(connection)
+
+    def play(
+        self,
+        buy_decision_algorithm,
+        num_players: int,
+        seeds: range,
+        max_rounds=MAX_ROUNDS,
+        chunk_size=10,
+    ) -> Dict[str, List[float]]:
+        """
+        the per-game results of a cell, split into jobs of `chunk_size` games
+        """
+        jobs = [
+            (buy_decision_algorithm, num_players, seeds[i : i + chunk_size], max_rounds)
+            for i in range(0, len(seeds), chunk_size)
+        ]
+        results = {attr: [] for attr in self.attrs_to_get}
+        for job_results in self.run(jobs):
+            for attr, values in job_results.items():
+                results[attr].extend(values)
+        return results
+
+    def ping(self) -> float:
+        """
+        the time it takes to send a job with no games to a worker and get its reply
+        """
+        started = perf_counter()
+        self.run([(ALGORITHMS[0], 2, range(0), 0)])
+        return perf_counter() - started
+
+    def summary(self) -> str:
+        latencies = sorted(self.dispatch_latencies)
+        if not latencies:
+            return "no jobs dispatched"
+        p99 = latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))]
+        return (
+            f"{len(latencies)} jobs dispatched, median "
+            f"{statistics.median(latencies) * 1e6:.0f}us, p99 {p99 * 1e6:.0f}us"
+        )
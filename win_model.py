@@ -0,0 +1,460 @@
+"""
+Predict who's going to win a game from where it stands, so that simulations can stop once the
+result is clear instead of playing out the long endgame.
+
+The model is a conditional logit: every player still in the game gets a score, a weighted sum of
+their features (cash, what they own by type, monopolies, buildings, the rent they charge...), and
+their chance of winning is the softmax of the scores. It's trained on states logged every
+`every` turns of games played to the end, labelled with the game's winner.
+
+    model = WinModel.train(BuyEverything, num_players=4, seeds=range(2_000))
+    game, predicted = play_until_clear(4, BuyEverything, model, threshold=0.95)
+    print(evaluate(model, BuyEverything, 4, seeds=range(10_000, 10_500)))
+
+A stopped game has only played some of its rounds, so anything like
+`get_rounds_played_per_player` would come out far too low. The model also predicts how many
+rounds the game would have lasted, by least squares on a summary of the state (how many players
+are left, the rounds so far, the cash and rent on the table, how clear the favourite is), and
+`play_until_clear` sets `predicted_rounds` on the games it stops.
+
+`evaluate` plays games to the end, noting where each one would have been stopped: how often
+the predicted winner is the real one, how calibrated the predictions are, how many fewer turns
+get played, and how biased the number of rounds is, both as played and as predicted.
+"""
+import json
+import random
+from contextlib import contextmanager, redirect_stdout
+from os import devnull
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from monopoly import BuildableProperty, Game, MAX_ROUNDS, Railroad, Utility
+
+FEATURES = (
+    "cash",
+    "property_value",
+    "properties",
+    "railroads",
+    "utilities",
+    "monopolies",
+    "building_levels",
+    "rent",
+)
+CHECK_EVERY = 20
+# the rent of a utility, for a typical roll
+TYPICAL_ROLL = 7
+
+
+def get_features(game: Game) -> np.ndarray:
+    """
+    a row of `FEATURES` per player; money in thousands
+    """
+    features = np.zeros((len(game._players), len(FEATURES)))
+    group_sizes = {}
+    owned = {}
+    for property_ in game.properties:
+        group_sizes[property_.type] = group_sizes.get(property_.type, 0) + 1
+        if property_.owner is not None:
+            key = (property_.owner.seat, property_.type)
+            owned[key] = owned.get(key, 0) + 1
+    for property_ in game.properties:
+        owner = property_.owner
+        if owner is None:
+            continue
+        row = features[owner.seat]
+        row[2] += 1
+        if property_.mortgaged:
+            continue
+        row[1] += property_.mortgage_cost / 1000
+        num_owned = owned[(owner.seat, property_.type)]
+        if isinstance(property_, BuildableProperty):
+            level = property_.building_level
+            row[6] += level
+            if level:
+                rent = property_.rent[level if level < 5 else "hotel"]
+            elif num_owned == group_sizes[property_.type]:
+                rent = property_.rent["monopoly"]
+            else:
+                rent = property_.rent[0]
+        elif isinstance(property_, Railroad):
+            row[3] += 1
+            rent = property_.rent[num_owned]
+        elif isinstance(property_, Utility):
+            row[4] += 1
+            rent = property_.rent[num_owned] * TYPICAL_ROLL
+        else:
+            rent = 0
+        row[7] += rent / 1000
+    for (seat, type_), num_owned in owned.items():
+        if num_owned == group_sizes[type_] and type_ not in ("railroad", "utility"):
+            features[seat][5] += 1
+    for player in game._players:
+        features[player.seat][0] = player.money / 1000
+    return features
+
+
+def get_alive(game: Game) -> np.ndarray:
+    return np.array([not player.bankrupt for player in game._players])
+
+
+def softmax(scores: np.ndarray, alive: np.ndarray) -> np.ndarray:
+    scores = np.where(alive, scores, -np.inf)
+    scores = scores - scores.max(axis=-1, keepdims=True)
+    weights = np.exp(scores)
+    return weights / weights.sum(axis=-1, keepdims=True)
+
+
+@contextmanager
+def quiet():
+    with open(devnull, "w") as null, redirect_stdout(null):
+        yield
+
+
+def get_summary(
+    features: np.ndarray,
+    alive: np.ndarray,
+    probabilities: np.ndarray,
+    rounds: np.ndarray,
+) -> np.ndarray:
+    """
+    what the number of rounds left is predicted from, for every state
+    """
+    favourite = probabilities.argmax(axis=-1)
+    states = np.arange(len(favourite))
+    in_play = np.where(alive[..., None], features, 0)
+    return np.column_stack(
+        [
+            np.ones(len(favourite)),
+            alive.sum(axis=-1),
+            rounds / 1000,
+            in_play[..., 0].sum(axis=-1),
+            in_play[..., 7].sum(axis=-1),
+            probabilities.max(axis=-1),
+            features[states, favourite, 0],
+            features[states, favourite, 7],
+        ]
+    )
+
+
+def log_states(
+    buy_decision_algorithm,
+    num_players: int,
+    seeds: Sequence[int],
+    every=CHECK_EVERY,
+    max_rounds=MAX_ROUNDS,
+) -> Tuple[np.ndarray, ...]:
+    """
+    (features, who's still in, winner, rounds so far, rounds in the end, index of the game)
+    for a state every `every` turns of every game
+    """
+    features, alive, winners, rounds, final_rounds, games = [], [], [], [], [], []
+    with quiet():
+        for game_index, seed in enumerate(seeds):
+            random.seed(seed)
+            game = Game(
+                num_players,
+                buy_decision_algorithm,
+                max_rounds=max_rounds,
+                autostart=False,
+            )
+            game.activate()
+            states = []
+            for turn, _ in enumerate(game.turns(), 1):
+                if turn % every == 0:
+                    states.append((get_features(game), get_alive(game), game.rounds))
+            winner = game.winner.seat
+            game.end()
+            for state_features, state_alive, state_rounds in states:
+                features.append(state_features)
+                alive.append(state_alive)
+                winners.append(winner)
+                rounds.append(state_rounds)
+                final_rounds.append(game.rounds)
+                games.append(game_index)
+    return tuple(map(np.array, (features, alive, winners, rounds, final_rounds, games)))
+
+
+class WinModel:
+    def __init__(self, weights, mean, scale, rounds_weights):
+        self.weights = np.asarray(weights, dtype=float)
+        self.mean = np.asarray(mean, dtype=float)
+        self.scale = np.asarray(scale, dtype=float)
+        self.rounds_weights = np.asarray(rounds_weights, dtype=float)
+
+    @classmethod
+    def fit(
+        cls,
+        features: np.ndarray,
+        alive: np.ndarray,
+        winners: np.ndarray,
+        rounds: np.ndarray,
+        final_rounds: np.ndarray,
+        games: np.ndarray,
+        iterations=500,
+        learning_rate=0.5,
+        l2=1e-3,
+    ) -> "WinModel":
+        """
+        the chances of winning by maximum likelihood, with gradient descent on features
+        standardized over the players still in; then the rounds left by least squares, with
+        every game weighing the same however many states it has (otherwise the longest games
+        would drown out the rest and the predictions would come out too long)
+        """
+        mean = features[alive].mean(axis=0)
+        scale = features[alive].std(axis=0) + 1e-9
+        x = (features - mean) / scale
+        targets = np.zeros(alive.shape)
+        targets[np.arange(len(winners)), winners] = 1
+        weights = np.zeros(len(FEATURES))
+        for _ in range(iterations):
+            probabilities = softmax(x @ weights, alive)
+            residuals = np.where(alive, probabilities - targets, 0)
+            gradient = np.einsum("spf,sp->f", x, residuals) / len(winners)
+            weights -= learning_rate * (gradient + l2 * weights)
+        summary = get_summary(features, alive, softmax(x @ weights, alive), rounds)
+        sample_weights = np.sqrt(1 / np.bincount(games)[games])
+        rounds_weights, *_ = np.linalg.lstsq(
+            summary * sample_weights[:, None],
+            (final_rounds - rounds) * sample_weights,
+            rcond=None,
+        )
+        return cls(weights, mean, scale, rounds_weights)
+
+    @classmethod
+    def train(
+        cls,
+        buy_decision_algorithm,
+        num_players: int,
+        seeds: Sequence[int],
+        every=CHECK_EVERY,
+        max_rounds=MAX_ROUNDS,
+    ) -> "WinModel":
+        return cls.fit(
+            *log_states(buy_decision_algorithm, num_players, seeds, every, max_rounds)
+        )
+
+    def predict_states(self, features: np.ndarray, alive: np.ndarray) -> np.ndarray:
+        return softmax(((features - self.mean) / self.scale) @ self.weights, alive)
+
+    def predict(self, game: Game) -> np.ndarray:
+        """
+        each player's chance of winning
+        """
+        return self.predict_states(get_features(game), get_alive(game))
+
+    def predict_rounds(self, game: Game, probabilities: np.ndarray) -> float:
+        """
+        how many rounds the game will have lasted, given the chances from `predict`
+        """
+        summary = get_summary(
+            get_features(game)[None],
+            get_alive(game)[None],
+            probabilities[None],
+            np.array([game.rounds]),
+        )
+        return game.rounds + max(0.0, float(summary[0] @ self.rounds_weights))
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(
+                {
+                    "features": FEATURES,
+                    "weights": self.weights.tolist(),
+                    "mean": self.mean.tolist(),
+                    "scale": self.scale.tolist(),
+                    "rounds_weights": self.rounds_weights.tolist(),
+                },
+                f,
+            )
+
+    @classmethod
+    def load(cls, path) -> "WinModel":
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data["weights"], data["mean"], data["scale"], data["rounds_weights"])
+
+
+def play_until_clear(
+    num_players: int,
+    buy_decision_algorithm,
+    model: WinModel,
+    threshold=0.95,
+    check_every=CHECK_EVERY,
+    max_rounds=MAX_ROUNDS,
+    **kwargs,
+) -> Tuple[Game, int]:
+    """
+    plays a game until a player's chance of winning reaches `threshold` (or the game ends);
+    the game and the predicted winner's seat. A game that was stopped has `truncated` set,
+    and `predicted_rounds` is how many rounds it would have lasted
+    """
+    game = Game(
+        num_players,
+        buy_decision_algorithm,
+        max_rounds=max_rounds,
+        autostart=False,
+        **kwargs,
+    )
+    game.activate()
+    game.truncated = False
+    for turn, _ in enumerate(game.turns(), 1):
+        if turn % check_every == 0:
+            probabilities = model.predict(game)
+            if probabilities.max() >= threshold:
+                game.truncated = True
+                game.predicted_rounds = model.predict_rounds(game, probabilities)
+                return game, int(probabilities.argmax())
+    game.predicted_rounds = game.rounds
+    return game, game.winner.seat
+
+
+class Evaluation:
+    """
+    how truncating games at `threshold` compares with playing them out, over the same seeds
+    """
+
+    def __init__(self, threshold: float, num_bins=10):
+        self.threshold = threshold
+        self.num_bins = num_bins
+        # per game: rounds played in full, rounds when stopped, the rounds it was predicted to
+        # last, predicted winner was right
+        self.full_rounds: List[int] = []
+        self.truncated_rounds: List[int] = []
+        self.predicted_rounds: List[float] = []
+        self.correct: List[bool] = []
+        # every prediction made along the way: the favourite's chance, and whether they won
+        self.confidences: List[float] = []
+        self.outcomes: List[bool] = []
+
+    def add_game(
+        self, full_rounds, truncated_rounds, predicted_rounds, correct, predictions
+    ):
+        self.full_rounds.append(full_rounds)
+        self.truncated_rounds.append(truncated_rounds)
+        self.predicted_rounds.append(predicted_rounds)
+        self.correct.append(correct)
+        for confidence, outcome in predictions:
+            self.confidences.append(confidence)
+            self.outcomes.append(outcome)
+
+    @property
+    def accuracy(self) -> float:
+        return float(np.mean(self.correct))
+
+    @property
+    def turn_reduction(self) -> float:
+        """
+        how many times fewer turns get played
+        """
+        return sum(self.full_rounds) / sum(self.truncated_rounds)
+
+    @property
+    def rounds_bias(self) -> float:
+        """
+        the relative error in the mean number of rounds from stopping early
+        """
+        return float(np.mean(self.truncated_rounds) / np.mean(self.full_rounds) - 1)
+
+    @property
+    def predicted_rounds_bias(self) -> float:
+        """
+        the same, with the rounds the stopped games were predicted to last
+        """
+        return float(np.mean(self.predicted_rounds) / np.mean(self.full_rounds) - 1)
+
+    def get_calibration(self) -> List[Tuple[float, float, int]]:
+        """
+        (mean predicted chance, how often the favourite won, number of predictions) per bin
+        """
+        confidences = np.array(self.confidences)
+        outcomes = np.array(self.outcomes, dtype=float)
+        bins = np.minimum((confidences * self.num_bins).astype(int), self.num_bins - 1)
+        return [
+            (
+                float(confidences[bins == b].mean()),
+                float(outcomes[bins == b].mean()),
+                int((bins == b).sum()),
+            )
+            for b in range(self.num_bins)
+            if (bins == b).any()
+        ]
+
+    @property
+    def expected_calibration_error(self) -> float:
+        total = len(self.confidences)
+        return sum(
+            count / total * abs(predicted - observed)
+            for predicted, observed, count in self.get_calibration()
+        )
+
+    @property
+    def brier_score(self) -> float:
+        confidences = np.array(self.confidences)
+        return float(np.mean((confidences - np.array(self.outcomes)) ** 2))
+
+    def __str__(self):
+        lines = [
+            f"threshold {self.threshold}, {len(self.correct)} games: "
+            f"predicted winner right {self.accuracy:.1%}, "
+            f"{self.turn_reduction:.1f}x fewer turns",
+            f"mean rounds biased by {self.rounds_bias:+.1%} as played, "
+            f"{self.predicted_rounds_bias:+.1%} as predicted",
+            f"calibration of the favourite's chance: ECE {self.expected_calibration_error:.3f}, "
+            f"Brier {self.brier_score:.3f}",
+        ]
+        for predicted, observed, count in self.get_calibration():
+            lines.append(f"  predicted {predicted:.2f} -> won {observed:.2f} ({count})")
+        return "\n".join(lines)
+
+
+def evaluate(
+    model: WinModel,
+    buy_decision_algorithm,
+    num_players: int,
+    seeds: Sequence[int],
+    threshold=0.95,
+    check_every=CHECK_EVERY,
+    max_rounds=MAX_ROUNDS,
+) -> Evaluation:
+    """
+    plays every game to the end, noting where and on whom `play_until_clear` would have stopped
+    """
+    evaluation = Evaluation(threshold)
+    with quiet():
+        for seed in seeds:
+            random.seed(seed)
+            game = Game(
+                num_players,
+                buy_decision_algorithm,
+                max_rounds=max_rounds,
+                autostart=False,
+            )
+            game.activate()
+            # rounds, predicted rounds, favourite
+            stopped: Optional[Tuple[int, float, int]] = None
+            predictions = []
+            for turn, _ in enumerate(game.turns(), 1):
+                if turn % check_every:
+                    continue
+                probabilities = model.predict(game)
+                favourite = int(probabilities.argmax())
+                predictions.append((float(probabilities.max()), favourite))
+                if stopped is None and probabilities.max() >= threshold:
+                    predicted_rounds = model.predict_rounds(game, probabilities)
+                    stopped = game.rounds, predicted_rounds, favourite
+            winner = game.winner.seat
+            if stopped is None:
+                stopped = game.rounds, game.rounds, winner
+            evaluation.add_game(
+                game.rounds,
+                stopped[0],
+                stopped[1],
+                stopped[2] == winner,
+                [
+                    (confidence, favourite == winner)
+                    for confidence, favourite in predictions
+                ],
+            )
+            game.end()
+    return evaluation
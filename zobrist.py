@@ -0,0 +1,290 @@
+"""
+Zobrist hashing of the state of a game, and a transposition cache for the values of decisions
+that are expensive to make.
+
+A game played with `Game(hashing=True)` keeps `game.zobrist`, a `ZobristHash` of who owns each
+property, its building level and whether it's mortgaged, where each player is and how much
+cash they have, to the nearest `CASH_BUCKET` dollars. Each of those is a random 64 bit key, and
+the hash is the XOR of the keys of the state the game is in: every change to the state (in
+`Player.buy`, `buy_building`, `Player.advance`, `Player.pay` and so on) XORs the old key out
+and the new one in, so keeping it up to date costs a couple of XORs, however big the game.
+
+`TranspositionCache` keeps values by hash, so a decision that comes up again in the same state,
+in this game or in another, needn't be worked out again:
+
+    cache = TranspositionCache(max_entries=100_000)
+    seats = [CachedBuyDecision(ExpensiveBuyDecision(), cache) for _ in range(4)]
+    game = Game(4, BuyEverything, seats=seats, hashing=True)
+    print(cache)
+
+Cash is bucketed so that states that differ by a few dollars are the same state, which is what
+makes hits likely; a decision that turns on the exact amount of cash will sometimes get the
+value worked out for a player with a little more or less. `ZobristHash(cash_bucket=1)` keeps
+decisions exact.
+"""
+
+import random
+import sys
+from collections import OrderedDict
+from typing import Optional
+
+from buy_decision_algos import BuyDecision
+from monopoly import BANK_SEAT, Decision, Game
+
+SEED = 0x5EED
+MAX_SEATS = 8
+# no buildings, one to four houses, or a hotel (see `building_level`)
+NUM_LEVELS = 6
+CASH_BUCKET = 100
+MASK = (1 << 64) - 1
+MISSING = object()
+
+
+def mix(value: int) -> int:
+    """
+    splitmix64's finalizer: a random looking 64 bit key for every value
+    """
+    value = (value ^ (value >> 30)) * 0xBF58476D1CE4E5B9 & MASK
+    value = (value ^ (value >> 27)) * 0x94D049BB133111EB & MASK
+    return value ^ (value >> 31)
+
+
+class ZobristKeys:
+    """
+    the random keys of every part of the state; the same for every game on a board of
+    `num_spaces` spaces, so that the same state hashes the same in any game
+    """
+
+    _instances = {}
+
+    def __init__(self, num_spaces: int, seed=SEED):
+        stream = random.Random(f"{seed}:{num_spaces}")
+
+        def keys(*shape):
+            if len(shape) == 1:
+                return [stream.getrandbits(64) for _ in range(shape[0])]
+            return [keys(*shape[1:]) for _ in range(shape[0])]
+
+        self.num_spaces = num_spaces
+        self.owner = keys(num_spaces, MAX_SEATS)
+        # level 0 gets a key as well, so that an unbuilt property differs from nothing
+        self.level = keys(num_spaces, NUM_LEVELS)
+        self.mortgaged = keys(num_spaces)
+        self.position = keys(MAX_SEATS, num_spaces)
+        # cash isn't bounded, so its keys are mixed from one per seat (see `get_cash_key`)
+        self.cash = keys(MAX_SEATS)
+        # which player is deciding about which space (see `get_decision_key`)
+        self.deciding = keys(MAX_SEATS)
+        self.deciding_on = keys(num_spaces)
+
+    @classmethod
+    def get(cls, num_spaces: int) -> "ZobristKeys":
+        keys = cls._instances.get(num_spaces)
+        if keys is None:
+            keys = cls._instances[num_spaces] = cls(num_spaces)
+        return keys
+
+
+class ZobristHash:
+    """
+    the hash of a game's state, kept up to date by the game as it changes
+    """
+
+    def __init__(self, game: "Game", cash_bucket=CASH_BUCKET):
+        self.keys = ZobristKeys.get(len(game.spaces))
+        self.cash_bucket = cash_bucket
+        self.updates = 0
+        self.value = self.compute(game)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} {self.value:016x}>"
+
+    def get_cash_key(self, seat: int, money: int) -> int:
+        return mix(self.keys.cash[seat] + max(money, 0) // self.cash_bucket & MASK)
+
+    def compute(self, game: "Game") -> int:
+        """
+        the hash from scratch, which the updates must always agree with
+        """
+        keys = self.keys
+        value = 0
+        for property_ in game.properties:
+            index = property_.index
+            if property_.owner is not None:
+                value ^= keys.owner[index][property_.owner.seat]
+            value ^= keys.level[index][getattr(property_, "building_level", 0)]
+            if property_.mortgaged:
+                value ^= keys.mortgaged[index]
+        for player in game._players:
+            value ^= keys.position[player.seat][
+                player.current_space_index % keys.num_spaces
+            ]
+            value ^= self.get_cash_key(player.seat, player.money)
+        return value
+
+    def own(self, property_, previous_owner, owner):
+        index = property_.index
+        if previous_owner is not None:
+            self.value ^= self.keys.owner[index][previous_owner.seat]
+        if owner is not None:
+            self.value ^= self.keys.owner[index][owner.seat]
+        self.updates += 1
+
+    def build(self, property_, previous_level: int, level: int):
+        levels = self.keys.level[property_.index]
+        self.value ^= levels[previous_level] ^ levels[level]
+        self.updates += 1
+
+    def mortgage(self, property_):
+        """
+        the property was mortgaged or paid off
+        """
+        self.value ^= self.keys.mortgaged[property_.index]
+        self.updates += 1
+
+    def move(self, player, previous_index: int, index: int):
+        positions = self.keys.position[player.seat]
+        num_spaces = self.keys.num_spaces
+        self.value ^= (
+            positions[previous_index % num_spaces] ^ positions[index % num_spaces]
+        )
+        self.updates += 1
+
+    def transfer(self, payer, payee, amount: int):
+        """
+        `amount` went from `payer` to `payee`, whose money has already changed
+        """
+        for actor, change in ((payer, -amount), (payee, amount)):
+            if actor.seat is None or actor.seat == BANK_SEAT:
+                continue
+            seat, money = actor.seat, actor.money
+            if (money - change) // self.cash_bucket != money // self.cash_bucket:
+                self.value ^= self.get_cash_key(seat, money - change)
+                self.value ^= self.get_cash_key(seat, money)
+        self.updates += 1
+
+    def get_decision_key(self, player, property_) -> int:
+        """
+        the hash of `player` deciding about `property_` in this state
+        """
+        keys = self.keys
+        return (
+            self.value ^ keys.deciding[player.seat] ^ keys.deciding_on[property_.index]
+        )
+
+
+class TranspositionCache:
+    """
+    values by hash, evicting the least recently used once there are `max_entries` of them;
+    with `max_age`, values stored more than `max_age` generations ago (see `new_generation`)
+    count as missing, for values that go stale
+    """
+
+    def __init__(self, max_entries=65_536, max_age: Optional[int] = None):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.generation = 0
+        # hash -> (value, generation stored in)
+        self.entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __str__(self):
+        return (
+            f"{len(self)}/{self.max_entries} entries, {self.hit_rate:.1%} hits "
+            f"({self.hits} of {self.hits + self.misses}), {self.evictions} evicted, "
+            f"{self.expirations} expired, ~{self.get_memory() / 1024:.0f}KB"
+        )
+
+    def new_generation(self):
+        """
+        everything stored from now on is newer than what came before, e.g. for a new game
+        """
+        self.generation += 1
+
+    def get(self, key: int, default=None):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        value, generation = entry
+        if self.max_age is not None and self.generation - generation > self.max_age:
+            del self.entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return default
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: int, value):
+        entries = self.entries
+        if key in entries:
+            entries.move_to_end(key)
+        elif len(entries) >= self.max_entries:
+            entries.popitem(last=False)
+            self.evictions += 1
+        entries[key] = (value, self.generation)
+
+    def clear(self):
+        self.entries.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get_memory(self) -> int:
+        """
+        roughly how many bytes the cache takes, entries and all
+        """
+        size = sys.getsizeof(self.entries)
+        for key, entry in self.entries.items():
+            size += sys.getsizeof(key) + sys.getsizeof(entry)
+            size += sys.getsizeof(entry[0]) + sys.getsizeof(entry[1])
+        return size
+
+    def get_stats(self) -> dict:
+        return {
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "bytes": self.get_memory(),
+        }
+
+
+class CachedBuyDecision(BuyDecision):
+    """
+    `algorithm`'s decisions, looked up in `cache` by the state of the game when they're made;
+    in a game played without `hashing`, they're made every time
+    """
+
+    def __init__(self, algorithm: BuyDecision, cache: TranspositionCache):
+        self.algorithm = algorithm
+        self.cache = cache
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.algorithm!r})"
+
+    def __call__(self, property_, player):
+        game = Game.current
+        hasher = game.zobrist if game is not None else None
+        if hasher is None:
+            return self.algorithm(property_, player)
+        key = hasher.get_decision_key(player, property_)
+        buy = self.cache.get(key, MISSING)
+        if buy is MISSING:
+            buy = self.algorithm(property_, player)
+            # a pending decision is somebody else's to make
+            if not isinstance(buy, Decision):
+                self.cache.put(key, buy)
+        return buy